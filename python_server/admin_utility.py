@@ -12,6 +12,12 @@ from pathlib import Path
 from dotenv import load_dotenv
 from loguru import logger
 
+from archive import archive_history
+from data_transfer import TRANSFER_TABLES, export_table, import_table, iter_rows, read_file, upsert_rows
+from db_backup import backup, restore_backup
+from migrations import apply_migrations, audit_query_plans
+from rfid_provisioning import provision_cards
+
 # Load environment variables
 load_dotenv()
 
@@ -178,10 +184,14 @@ class AdminUtility:
             END;
         """)
         
-        # Commit changes and close connection
+        # Commit changes, apply schema migrations and close connection
         conn.commit()
+        version = apply_migrations(conn, logger)
+        audit_query_plans(conn, logger)
         conn.close()
         
+        logger.info(f"Database schema version {version}")
+        
         logger.info("Database initialization complete")
         
     def create_admin_user(self, username, password):
@@ -242,80 +252,35 @@ class AdminUtility:
                 return False
                 
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(games)")]
             
-            # Import each game
+            # Upsert the games in batches instead of a SELECT and UPDATE/INSERT per game
+            records = []
             for game in games:
                 if 'id' not in game or 'title' not in game:
                     logger.warning(f"Skipping game without id or title: {game}")
                     continue
+                records.append({
+                    'id': game['id'],
+                    'title': game.get('title'),
+                    'executable_path': game.get('executable_path'),
+                    'working_directory': game.get('working_directory'),
+                    'arguments': game.get('arguments'),
+                    'description': game.get('description'),
+                    'image_url': game.get('image_url'),
+                    'min_duration_seconds': game.get('min_duration_seconds', 300),
+                    'max_duration_seconds': game.get('max_duration_seconds', 1800),
+                    'is_active': 1,  # Active by default
+                    'trailer_url': game.get('trailer_url')
+                })
                     
-                # Check if game already exists
-                cursor.execute("SELECT id FROM games WHERE id = ?", (game['id'],))
-                existing = cursor.fetchone()
+            try:
+                written, _ = upsert_rows(conn, "games", "id", records, columns, logger)
+                conn.commit()
+            finally:
+                conn.close()
                 
-                if existing:
-                    # Update existing game
-                    cursor.execute(
-                        """
-                        UPDATE games SET
-                            title = ?,
-                            executable_path = ?,
-                            working_directory = ?,
-                            arguments = ?,
-                            description = ?,
-                            image_url = ?,
-                            min_duration_seconds = ?,
-                            max_duration_seconds = ?,
-                            is_active = ?,
-                            trailer_url = ?
-                        WHERE id = ?
-                        """,
-                        (
-                            game.get('title'),
-                            game.get('executable_path'),
-                            game.get('working_directory'),
-                            game.get('arguments'),
-                            game.get('description'),
-                            game.get('image_url'),
-                            game.get('min_duration_seconds', 300),
-                            game.get('max_duration_seconds', 1800),
-                            1,  # Active by default
-                            game.get('trailer_url'),
-                            game['id']
-                        )
-                    )
-                    logger.info(f"Updated existing game: {game['title']}")
-                else:
-                    # Insert new game
-                    cursor.execute(
-                        """
-                        INSERT INTO games (
-                            id, title, executable_path, working_directory, arguments,
-                            description, image_url, min_duration_seconds, max_duration_seconds,
-                            trailer_url
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            game['id'],
-                            game.get('title'),
-                            game.get('executable_path'),
-                            game.get('working_directory'),
-                            game.get('arguments'),
-                            game.get('description'),
-                            game.get('image_url'),
-                            game.get('min_duration_seconds', 300),
-                            game.get('max_duration_seconds', 1800),
-                            game.get('trailer_url')
-                        )
-                    )
-                    logger.info(f"Imported new game: {game['title']}")
-            
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"Successfully imported {len(games)} games from {json_file}")
+            logger.info(f"Successfully imported {written} games from {json_file}")
             return True
             
         except Exception as e:
@@ -326,36 +291,54 @@ class AdminUtility:
         """Export games from the database to a JSON file"""
         try:
             conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM games
-                WHERE is_active = 1
-            """)
-            
-            games = []
-            for row in cursor.fetchall():
-                game = dict(row)
-                # Convert datetime objects to strings
-                for key, value in game.items():
-                    if isinstance(value, datetime.datetime):
-                        game[key] = value.isoformat()
-                games.append(game)
-                
-            output = {"games": games}
+            columns, rows = iter_rows(conn, "SELECT * FROM games WHERE is_active = 1")
             
+            # Written game by game so the catalog never has to fit in memory
+            count = 0
             with open(output_file, 'w') as f:
-                json.dump(output, f, indent=2)
+                f.write('{\n  "games": [')
+                for row in rows:
+                    game = dict(zip(columns, row))
+                    # Convert datetime objects to strings
+                    for key, value in game.items():
+                        if isinstance(value, datetime.datetime):
+                            game[key] = value.isoformat()
+                    f.write(("," if count else "") + "\n    " + json.dumps(game))
+                    count += 1
+                f.write("\n  ]\n}\n")
                 
             conn.close()
-            logger.info(f"Successfully exported {len(games)} games to {output_file}")
+            logger.info(f"Successfully exported {count} games to {output_file}")
             return True
             
         except Exception as e:
             logger.exception(f"Error exporting games: {e}")
             return False
     
+    def export_table_data(self, table, output_file, fmt=None):
+        """Stream a table to an NDJSON or CSV file"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return export_table(conn, table, output_file, logger, fmt)
+            
+        except Exception as e:
+            logger.exception(f"Error exporting {table}: {e}")
+            return None
+        finally:
+            conn.close()
+    
+    def import_table_data(self, table, input_file, fmt=None):
+        """Stream an NDJSON or CSV file into a table, updating rows that already exist"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return import_table(conn, table, input_file, logger, fmt)
+            
+        except Exception as e:
+            logger.exception(f"Error importing {table}: {e}")
+            return None
+        finally:
+            conn.close()
+    
     def register_rfid_card(self, tag_id, name=None):
         """Register a new RFID card"""
         if not tag_id:
@@ -392,31 +375,75 @@ class AdminUtility:
         finally:
             conn.close()
     
-    def backup_database(self, backup_dir="backups"):
-        """Backup the SQLite database"""
+    def provision_rfid_cards(self, input_file, fmt=None, dry_run=False, report_file=None):
+        """Register RFID cards in bulk from an NDJSON or CSV file with tag_id, name, status and permission_level"""
+        conn = sqlite3.connect(self.db_path)
         try:
-            os.makedirs(backup_dir, exist_ok=True)
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(backup_dir, f"vr_kiosk_backup_{timestamp}.db")
-            
-            # Create a database connection
-            conn = sqlite3.connect(self.db_path)
+            result = provision_cards(conn, read_file(input_file, fmt), logger, dry_run)
+            conn.commit()
+            for row in result["rows"]:
+                if row.get("error"):
+                    logger.warning(f"Row {row['row']} ({row['tagId']}): {row['result']}, {row['error']}")
             
-            # Create a backup connection and backup the database
-            backup_conn = sqlite3.connect(backup_file)
-            conn.backup(backup_conn)
+            if report_file:
+                with open(report_file, "w") as f:
+                    for row in result["rows"]:
+                        f.write(json.dumps(row) + "\n")
+                logger.info(f"Wrote provisioning report for {result['total']} rows to {report_file}")
+            return result
             
-            # Close connections
-            backup_conn.close()
+        except Exception as e:
+            conn.rollback()
+            logger.exception(f"Error provisioning RFID cards: {e}")
+            return None
+        finally:
             conn.close()
-            
-            logger.info(f"Database backup created at {backup_file}")
-            return backup_file
+    
+    def backup_database(self, backup_dir="backups", incremental=False, keep=4, full_every=7):
+        """Backup the SQLite database while the server keeps running
+        
+        Pages are copied in small steps so the server is not blocked. An
+        incremental backup stores only the pages changed since the previous
+        backup of the newest chain; the oldest chains beyond keep are removed.
+        """
+        try:
+            result = backup(self.db_path, backup_dir, logger, incremental, full_every, keep)
+            logger.info(f"Database {result['type']} backup created at {result['path']}")
+            return result["path"]
             
         except Exception as e:
             logger.exception(f"Error backing up database: {e}")
             return None
     
+    def restore_database(self, output_path, backup_dir="backups"):
+        """Rebuild the newest backup chain into a database file"""
+        try:
+            if os.path.exists(output_path) and not self._confirm_overwrite(output_path):
+                logger.info(f"Skipping restore to preserve {output_path}")
+                return None
+            return restore_backup(backup_dir, output_path, logger)
+            
+        except Exception as e:
+            logger.exception(f"Error restoring database: {e}")
+            return None
+    
+    def archive_old_history(self, keep_months=3, archive_dir="archive"):
+        """Move closed sessions and access logs older than keep_months into monthly archive files"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            moved = archive_history(conn, archive_dir, keep_months, logger)
+            logger.info(
+                f"Archived {moved['sessions']} sessions and {moved['rfid_access_log']} access log rows "
+                f"into {archive_dir}"
+            )
+            return moved
+            
+        except Exception as e:
+            logger.exception(f"Error archiving history: {e}")
+            return None
+        finally:
+            conn.close()
+    
     def generate_env_file(self):
         """Generate a secure .env file with random secrets"""
         try:
@@ -479,10 +506,25 @@ if __name__ == "__main__":
     parser.add_argument('--password', help='Admin password')
     parser.add_argument('--import-games', help='Import games from JSON file')
     parser.add_argument('--export-games', help='Export games to JSON file')
+    parser.add_argument('--export-table', choices=sorted(TRANSFER_TABLES), help='Export a table as NDJSON or CSV')
+    parser.add_argument('--import-table', choices=sorted(TRANSFER_TABLES), help='Import a table from NDJSON or CSV')
+    parser.add_argument('--data-file', default='-', help='File for --export-table/--import-table (default: stdout/stdin)')
+    parser.add_argument('--data-format', choices=['ndjson', 'csv'], help='Data file format (default: from the file extension)')
     parser.add_argument('--register-rfid', help='Register an RFID card')
     parser.add_argument('--card-name', help='Name for the RFID card')
+    parser.add_argument('--provision-rfid', help='Register RFID cards in bulk from an NDJSON or CSV file')
+    parser.add_argument('--dry-run', action='store_true', help='Validate --provision-rfid input without registering cards')
+    parser.add_argument('--report', help='Write a per-row --provision-rfid report as NDJSON')
     parser.add_argument('--backup-db', action='store_true', help='Backup the database')
     parser.add_argument('--backup-dir', default='backups', help='Backup directory')
+    parser.add_argument('--incremental', action='store_true', help='Only store pages changed since the last backup')
+    parser.add_argument('--backup-keep', type=int, default=4, help='Number of backup chains to keep')
+    parser.add_argument('--full-every', type=int, default=7, help='Incremental backups before a new full backup')
+    parser.add_argument('--restore-db', help='Restore the newest backup chain to this file')
+    parser.add_argument('--archive-history', action='store_true', help='Move old sessions and access logs into monthly archives')
+    parser.add_argument('--keep-months', type=int, default=int(os.getenv("VR_ARCHIVE_KEEP_MONTHS", "3")),
+                        help='Months of history, including the current one, kept in the live database')
+    parser.add_argument('--archive-dir', default=os.getenv("VR_ARCHIVE_DIR", "archive"), help='Archive directory')
     parser.add_argument('--generate-env', action='store_true', help='Generate secure .env file')
     parser.add_argument('--cleanup-logs', action='store_true', help='Clean up old log files')
     parser.add_argument('--log-age', type=int, default=30, help='Max log age in days')
@@ -504,11 +546,26 @@ if __name__ == "__main__":
     if args.export_games:
         admin.export_games_to_json(args.export_games)
         
+    if args.export_table:
+        admin.export_table_data(args.export_table, args.data_file, args.data_format)
+        
+    if args.import_table:
+        admin.import_table_data(args.import_table, args.data_file, args.data_format)
+        
     if args.register_rfid:
         admin.register_rfid_card(args.register_rfid, args.card_name)
         
+    if args.provision_rfid:
+        admin.provision_rfid_cards(args.provision_rfid, args.data_format, args.dry_run, args.report)
+        
     if args.backup_db:
-        admin.backup_database(args.backup_dir)
+        admin.backup_database(args.backup_dir, args.incremental, args.backup_keep, args.full_every)
+        
+    if args.restore_db:
+        admin.restore_database(args.restore_db, args.backup_dir)
+        
+    if args.archive_history:
+        admin.archive_old_history(args.keep_months, args.archive_dir)
         
     if args.generate_env:
         admin.generate_env_file()
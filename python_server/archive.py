@@ -0,0 +1,218 @@
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.request import pathname2url
+
+# Tables moved into monthly archive files: table -> (time column, extra condition)
+ARCHIVED_TABLES: Dict[str, Tuple[str, str]] = {
+    "sessions": ("start_time", "status != 'active'"),
+    "rfid_access_log": ("timestamp", "1"),
+}
+
+# Indexes created in each archive file for the history queries
+ARCHIVE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS archive.idx_sessions_rfid_tag_start_time ON sessions (rfid_tag, start_time)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_rfid_access_log_tag_timestamp ON rfid_access_log (tag_id, timestamp)",
+)
+
+PARTITION_PATTERN = re.compile(r"^history_(\d{4}-\d{2})\.db$")
+
+
+def partition_path(archive_dir: str, month: str) -> str:
+    """Get the archive file for a month given as YYYY-MM"""
+    return os.path.join(archive_dir, f"history_{month}.db")
+
+
+def list_partitions(archive_dir: str) -> List[str]:
+    """Get the months that have an archive file, oldest first"""
+    if not os.path.isdir(archive_dir):
+        return []
+    
+    months = []
+    for name in os.listdir(archive_dir):
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            months.append(match.group(1))
+    return sorted(months)
+
+
+def archive_cutoff(keep_months: int, now: Optional[datetime] = None) -> str:
+    """Get the first month kept in the live database, as YYYY-MM
+    
+    keep_months counts the current month, so 1 archives everything before it.
+    """
+    now = now or datetime.now()
+    month_index = now.year * 12 + now.month - 1 - (max(keep_months, 1) - 1)
+    return f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+
+
+def _table_columns(conn: sqlite3.Connection, schema: str, table: str) -> List[Tuple[str, str, int]]:
+    """Get (name, declared type, primary key position) for each column of a table"""
+    return [(row[1], row[2], row[5]) for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _ensure_archive_table(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Create or extend the attached archive's copy of a live table; returns the live columns"""
+    columns = _table_columns(conn, "main", table)
+    existing = {name for name, _, _ in _table_columns(conn, "archive", table)}
+    
+    if not columns:
+        return []  # not in this database, e.g. one created by admin_utility --init-db
+    if not existing:
+        # Keep declared types so TIMESTAMP columns still parse, but no defaults or foreign keys
+        definitions = [
+            f"{name} {col_type} PRIMARY KEY" if pk else f"{name} {col_type}"
+            for name, col_type, pk in columns
+        ]
+        conn.execute(f"CREATE TABLE archive.{table} ({', '.join(definitions)})")
+    else:
+        # Columns added to the live table by later migrations
+        for name, col_type, _ in columns:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {col_type}")
+    
+    return [name for name, _, _ in columns]
+
+
+def _months_to_archive(conn: sqlite3.Connection, cutoff: str) -> List[str]:
+    """Get the months before the cutoff that still have rows in the live tables"""
+    months = set()
+    for table, (time_column, condition) in ARCHIVED_TABLES.items():
+        if not _table_columns(conn, "main", table):
+            continue
+        rows = conn.execute(
+            f"SELECT DISTINCT substr({time_column}, 1, 7) FROM main.{table} "
+            f"WHERE {time_column} < ? AND {condition}",
+            (f"{cutoff}-01",)
+        ).fetchall()
+        months.update(row[0] for row in rows if row[0])
+    return sorted(months)
+
+
+def _archive_month(conn: sqlite3.Connection, month: str) -> Dict[str, int]:
+    """Move one month of rows into the attached archive; returns rows moved per table"""
+    columns = {
+        table: ", ".join(_ensure_archive_table(conn, table))
+        for table in ("sessions", "session_resource_usage", "rfid_access_log")
+    }
+    for statement in ARCHIVE_INDEXES:
+        try:
+            conn.execute(statement)
+        except sqlite3.OperationalError:
+            pass  # the table is not archived in this database
+    conn.commit()
+    
+    month_sessions = "SELECT id FROM main.sessions WHERE substr(start_time, 1, 7) = ? AND status != 'active'"
+    copies = {
+        "sessions": f"WHERE id IN ({month_sessions})",
+        "session_resource_usage": f"WHERE session_id IN ({month_sessions})",
+        "rfid_access_log": "WHERE substr(timestamp, 1, 7) = ?",
+    }
+    removals = {
+        "session_resource_usage": "WHERE session_id IN (SELECT id FROM archive.sessions)",
+        "sessions": "WHERE id IN (SELECT id FROM archive.sessions) AND status != 'active'",
+        "rfid_access_log": "WHERE id IN (SELECT id FROM archive.rfid_access_log)",
+    }
+    
+    # Copy first and commit the archive, then delete from the live database.
+    # WAL commits are not atomic across attached files, so a crash between
+    # the two leaves copies that the next run skips instead of lost rows.
+    for table, where in copies.items():
+        if columns[table]:
+            conn.execute(
+                f"INSERT OR IGNORE INTO archive.{table} ({columns[table]}) "
+                f"SELECT {columns[table]} FROM main.{table} {where}",
+                (month,)
+            )
+    conn.commit()
+    
+    moved = {}
+    for table, where in removals.items():
+        moved[table] = conn.execute(f"DELETE FROM main.{table} {where}").rowcount if columns[table] else 0
+    conn.commit()
+    return moved
+
+
+def archive_history(conn: sqlite3.Connection, archive_dir: str, keep_months: int, logger,
+                    now: Optional[datetime] = None) -> Dict[str, int]:
+    """Move closed sessions and access log rows older than keep_months into monthly archive files
+    
+    Each month goes to its own SQLite file in archive_dir. Returns the number
+    of rows moved per table. Safe to re-run after an interruption.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    
+    cutoff = archive_cutoff(keep_months, now)
+    totals = {"sessions": 0, "session_resource_usage": 0, "rfid_access_log": 0}
+    months = _months_to_archive(conn, cutoff)
+    if not months:
+        return totals
+    
+    os.makedirs(archive_dir, exist_ok=True)
+    for month in months:
+        conn.execute("ATTACH DATABASE ? AS archive", (partition_path(archive_dir, month),))
+        try:
+            moved = _archive_month(conn, month)
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error archiving history for {month}: {e}")
+            raise
+        finally:
+            conn.execute("DETACH DATABASE archive")
+        
+        for table, count in moved.items():
+            totals[table] += count
+        logger.info(
+            f"Archived {month}: {moved['sessions']} sessions, "
+            f"{moved['rfid_access_log']} access log rows"
+        )
+    
+    return totals
+
+
+def query_partitions(archive_dir: str, table: str, conditions: Sequence[str] = (),
+                     params: Sequence[Any] = (), start: Optional[str] = None,
+                     end: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Query an archived table across the monthly files overlapping [start, end), newest first
+    
+    start and end are timestamps in the table's stored format; conditions are
+    extra SQL terms joined with AND and bound to params.
+    """
+    time_column = ARCHIVED_TABLES[table][0]
+    where = list(conditions)
+    bounds: List[Any] = list(params)
+    if start:
+        where.append(f"{time_column} >= ?")
+        bounds.append(start)
+    if end:
+        where.append(f"{time_column} < ?")
+        bounds.append(end)
+    
+    sql = f"SELECT * FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {time_column} DESC"
+    
+    rows: List[Dict[str, Any]] = []
+    for month in reversed(list_partitions(archive_dir)):
+        if limit is not None and len(rows) >= limit:
+            break
+        # Skip files entirely outside the requested range
+        if (start and month < start[:7]) or (end and month > end[:7]):
+            continue
+        
+        uri = f"file:{pathname2url(os.path.abspath(partition_path(archive_dir, month)))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row
+        try:
+            remaining = "" if limit is None else f" LIMIT {int(limit) - len(rows)}"
+            rows.extend(dict(row) for row in conn.execute(sql + remaining, bounds))
+        except sqlite3.OperationalError:
+            continue  # the month has no rows for this table
+        finally:
+            conn.close()
+    
+    return rows
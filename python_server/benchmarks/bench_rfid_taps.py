@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Replay an RFID tap trace against RFIDHandler and report latency percentiles and throughput
+
+Each tap reads the tag with simulate_tag_read, checks a game permission
+and, for valid cards, issues an auth token, like a kiosk does. Without
+--trace a trace is generated that mixes valid, deactivated and unknown
+cards. Trace tags starting with DEACT are registered and deactivated,
+tags starting with UNKNOWN are not registered and every other tag is
+registered as active, so saved and recorded traces replay the same way.
+
+Usage: python benchmarks/bench_rfid_taps.py [--taps N] [--rate TAPS_PER_MIN] [--realtime]
+       [--trace FILE | --save-trace FILE] [--max-p99-ms MS]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from rfid_handler import RFIDHandler
+from rfid_reader import read_trace, write_trace
+
+OPERATIONS = ("simulate_tag_read", "check_game_permission", "generate_auth_token")
+GAMES = [f"bench_game_{i}" for i in range(10)]
+
+
+def generate_trace(taps: int, rate: float, cards: int, invalid: float, deactivated: float, rng: random.Random):
+    """Generate taps at rate per minute with Poisson arrivals and the given mix of card kinds"""
+    trace = []
+    offset = 0.0
+    for _ in range(taps):
+        offset += rng.expovariate(rate / 60.0)
+        roll = rng.random()
+        if roll < invalid:
+            tag_id = f"UNKNOWN{rng.randrange(cards):06d}"
+        elif roll < invalid + deactivated:
+            tag_id = f"DEACT{rng.randrange(max(1, cards // 10)):06d}"
+        else:
+            tag_id = f"VALID{rng.randrange(cards):06d}"
+        trace.append((offset, tag_id))
+    return trace
+
+
+def setup_cards(handler: RFIDHandler, trace, rng: random.Random):
+    """Register the trace's cards and give some of them per-game permissions"""
+    tags = sorted({tag_id for _, tag_id in trace if not tag_id.startswith("UNKNOWN")})
+    result = handler.bulk_register_cards({"tag_id": tag_id} for tag_id in tags)
+    if not result["success"]:
+        raise RuntimeError(f"Could not register bench cards: {result['error']}")
+
+    for tag_id in tags:
+        if tag_id.startswith("DEACT"):
+            handler.deactivate_card(tag_id)
+        elif rng.random() < 0.2:
+            for game_id in rng.sample(GAMES, 3):
+                handler.set_game_permission(tag_id, game_id, rng.choice(("allow", "deny")))
+    handler.database.flush_writes()
+    return len(tags)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Get a percentile of sorted values by nearest rank"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def replay(handler: RFIDHandler, trace, realtime: bool, speed: float, rng: random.Random):
+    """Run the kiosk flow for every tap; returns per-operation latencies in seconds and the wall time"""
+    latencies = {operation: [] for operation in OPERATIONS}
+    start = time.perf_counter()
+
+    for offset, tag_id in trace:
+        if realtime:
+            delay = start + offset / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        t0 = time.perf_counter()
+        read = handler.simulate_tag_read(tag_id)
+        t1 = time.perf_counter()
+        handler.check_game_permission(tag_id, rng.choice(GAMES))
+        t2 = time.perf_counter()
+        latencies["simulate_tag_read"].append(t1 - t0)
+        latencies["check_game_permission"].append(t2 - t1)
+
+        if read["valid"]:
+            handler.generate_auth_token(tag_id)
+            latencies["generate_auth_token"].append(time.perf_counter() - t2)
+
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RFID tap path with a generated or recorded trace")
+    parser.add_argument("--taps", type=int, default=2000, help="Taps in a generated trace")
+    parser.add_argument("--rate", type=float, default=200.0, help="Taps per minute in a generated trace")
+    parser.add_argument("--cards", type=int, default=500, help="Distinct valid cards in a generated trace")
+    parser.add_argument("--invalid", type=float, default=0.1, help="Share of taps by unknown cards")
+    parser.add_argument("--deactivated", type=float, default=0.05, help="Share of taps by deactivated cards")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the trace and game choices")
+    parser.add_argument("--trace", help="Replay this '<seconds> <tag_id>' trace instead of generating one")
+    parser.add_argument("--save-trace", help="Write the generated trace to this file")
+    parser.add_argument("--realtime", action="store_true", help="Pace taps by the trace timing instead of back to back")
+    parser.add_argument("--speed", type=float, default=1.0, help="Timing scale for --realtime")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit with status 1 when any operation's p99 exceeds this")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    logging.basicConfig(level=logging.ERROR)
+    rng = random.Random(args.seed)
+
+    if args.trace:
+        trace = read_trace(args.trace)
+    else:
+        trace = generate_trace(args.taps, args.rate, args.cards, args.invalid, args.deactivated, rng)
+        if args.save_trace:
+            write_trace(args.save_trace, trace)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("VR_GAMES_CONFIG", os.path.join(tmp, "none.json"))
+        database = Database(os.path.join(tmp, "bench.db"), logger)
+        handler = RFIDHandler(database, logger)
+        cards = setup_cards(handler, trace, rng)
+
+        latencies, elapsed = replay(handler, trace, args.realtime, args.speed, rng)
+        flush_start = time.perf_counter()
+        database.flush_writes()
+        flush_time = time.perf_counter() - flush_start
+
+        span = trace[-1][0] if trace else 0.0
+        print(f"taps: {len(trace)} over {span:.0f}s of trace time ({len(trace) / max(span, 1e-9) * 60:.0f}/min), "
+              f"cards: {cards}, mode: {'realtime' if args.realtime else 'back to back'}")
+        print(f"{'operation':<24}{'calls':>8}{'ops/s':>12}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'max us':>10}")
+
+        failed = False
+        for operation in OPERATIONS:
+            values = sorted(latencies[operation])
+            busy = sum(values)
+            p99 = percentile(values, 0.99)
+            print(
+                f"{operation:<24}{len(values):>8}{len(values) / busy if busy else 0:>12,.0f}"
+                f"{percentile(values, 0.50) * 1e6:>10.1f}{percentile(values, 0.90) * 1e6:>10.1f}"
+                f"{p99 * 1e6:>10.1f}{(values[-1] if values else 0) * 1e6:>10.1f}"
+            )
+            if args.max_p99_ms is not None and p99 * 1000 > args.max_p99_ms:
+                failed = True
+
+        print(f"taps/s: {len(trace) / elapsed:,.0f} (wall {elapsed:.2f}s), "
+              f"write-behind flush after replay: {flush_time * 1000:.1f}ms")
+        database.close()
+
+    if failed:
+        print(f"p99 above {args.max_p99_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Compare RFIDHandler.verify_auth_token throughput with and without the token cache
+
+Usage: python benchmarks/bench_token_cache.py [--iterations N] [--tokens N]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from rfid_handler import RFIDHandler
+
+
+def run(handler: RFIDHandler, tokens, iterations: int) -> float:
+    """Verify the tokens round-robin and return verifications per second"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        result = handler.verify_auth_token(tokens[i % len(tokens)])
+        if not result["valid"]:
+            raise RuntimeError(f"Token failed verification: {result}")
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached and uncached auth token verification")
+    parser.add_argument("--iterations", type=int, default=50000, help="Verifications per run")
+    parser.add_argument("--tokens", type=int, default=100, help="Distinct cards and tokens in rotation")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("VR_GAMES_CONFIG", os.path.join(tmp, "none.json"))
+        database = Database(os.path.join(tmp, "bench.db"), logger)
+        handler = RFIDHandler(database, logger)
+
+        tokens = []
+        for i in range(args.tokens):
+            tag_id = f"BENCH{i:06d}"
+            handler.register_new_card(tag_id, f"Bench {i}")
+            tokens.append(handler.generate_auth_token(tag_id)["token"])
+
+        # Uncached: every call decodes and checks the HS256 signature
+        cache_size = handler.token_cache.max_entries
+        handler.token_cache.max_entries = 0
+        uncached = run(handler, tokens, args.iterations)
+
+        handler.token_cache.max_entries = cache_size
+        handler.token_cache.clear()
+        cached = run(handler, tokens, args.iterations)
+
+        print(f"tokens in rotation: {args.tokens}, iterations: {args.iterations}")
+        print(f"uncached: {uncached:12,.0f} verifications/s  ({1e6 / uncached:7.2f} us each)")
+        print(f"cached:   {cached:12,.0f} verifications/s  ({1e6 / cached:7.2f} us each)")
+        print(f"speedup:  {cached / uncached:.1f}x")
+        print(f"cache:    {handler.token_cache.get_stats()}")
+
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
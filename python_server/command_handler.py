@@ -1,13 +1,22 @@
-
 import asyncio
-import json
-import logging
-import uuid
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Sequence
 
 import websockets
+from jsonschema import Draft7Validator
+
+from command_middleware import TimingMiddleware, RateLimitMiddleware, AuthMiddleware
+
+DEFAULT_COMMAND_TIMEOUT = float(os.getenv("VR_COMMAND_TIMEOUT", "30"))  # seconds
+COMMAND_RATE_LIMIT = int(os.getenv("VR_COMMAND_RATE_LIMIT", "60"))  # rate-limited commands per minute per client
+AUTH_REQUIRED = os.getenv("VR_AUTH_REQUIRED", "false").lower() in ("1", "true", "yes")
+API_KEY = os.getenv("VR_API_KEY", "")
+BLOCKING_WORKERS = int(os.getenv("VR_BLOCKING_WORKERS", "4"))  # threads for blocking manager and database calls
 
 class CommandType(str, Enum):
     LAUNCH_GAME = "launchGame"
@@ -18,12 +27,45 @@ class CommandType(str, Enum):
     HEARTBEAT = "heartbeat"
     SUBMIT_RATING = "submitRating"
     GET_DIAGNOSTICS = "getDiagnostics"
+    SUBSCRIBE = "subscribe"
+    UNSUBSCRIBE = "unsubscribe"
+    PREPARE_GAME = "prepareGame"
+    REPORT_FIRST_FRAME = "reportFirstFrame"
 
 class ResponseStatus(str, Enum):
     SUCCESS = "success"
     ERROR = "error"
     PARTIAL = "partial"
 
+GAME_ID_SCHEMA = {
+    "type": "object",
+    "required": ["gameId"],
+    "properties": {
+        "gameId": {"type": "string", "minLength": 1}
+    }
+}
+
+TOPICS_SCHEMA = {
+    "type": "object",
+    "required": ["topics"],
+    "properties": {
+        "topics": {"type": "array", "items": {"type": "string"}, "minItems": 1}
+    }
+}
+
+class CommandRegistration:
+    """A command handler registered with its parameter schema, timeout and middleware"""
+    
+    def __init__(self, name: str, handler: Callable, schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None, middleware: Sequence[Callable] = (),
+                 error_label: Optional[str] = None):
+        self.name = name
+        self.handler = handler
+        self.validator = Draft7Validator(schema) if schema else None
+        self.timeout = timeout
+        self.middleware = tuple(middleware)
+        self.error_label = error_label or name
+
 class CommandHandler:
     """Handles commands received from WebSocket clients"""
     
@@ -34,45 +76,150 @@ class CommandHandler:
         self.database = database
         self.logger = logger
         self.current_session_id = None
+        self.status_provider = None
         
+        # Blocking manager and database calls run on a bounded thread pool so
+        # the event loop keeps answering heartbeats and broadcasting status
+        self.executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="vr-blocking")
+        self.game_lock = asyncio.Lock()  # serializes game launch/end commands
+        self.game_call_lock = threading.Lock()  # held by the pool thread until a launch/end call returns
+        
+        # Resource usage is stored when the session ends for any reason or the game exits
+        self.session_manager.set_end_callback(self._on_session_end)
+        self.game_manager.set_exit_callback(self._on_game_exit)
+        
+        # Command registry: name -> CommandRegistration
+        self.commands: Dict[str, CommandRegistration] = {}
+        self.timing = TimingMiddleware(logger)
+        self.rate_limit = RateLimitMiddleware(logger, COMMAND_RATE_LIMIT)
+        self.auth = AuthMiddleware(logger, API_KEY, AUTH_REQUIRED)
+        self.middleware: List[Callable] = [self.timing]  # applied to every command
+        self._register_commands()
+    
+    def _register_commands(self):
+        """Register the built-in commands"""
+        protected = (self.auth, self.rate_limit)
+        
+        self.register_command(
+            CommandType.LAUNCH_GAME, self.handle_launch_game,
+            schema={
+                "type": "object",
+                "required": ["gameId", "sessionDuration"],
+                "properties": {
+                    "gameId": {"type": "string", "minLength": 1},
+                    "sessionDuration": {"type": ["integer", "string"]}
+                }
+            },
+            middleware=protected, error_label="Launch"
+        )
+        self.register_command(CommandType.END_SESSION, self.handle_end_session,
+                              middleware=protected, error_label="End session")
+        self.register_command(CommandType.PAUSE_SESSION, self.handle_pause_session,
+                              middleware=protected, error_label="Pause")
+        self.register_command(CommandType.RESUME_SESSION, self.handle_resume_session,
+                              middleware=protected, error_label="Resume")
+        self.register_command(CommandType.GET_STATUS, self.handle_get_status, error_label="Status")
+        self.register_command(CommandType.HEARTBEAT, self.handle_heartbeat, error_label="Heartbeat")
+        self.register_command(
+            CommandType.SUBMIT_RATING, self.handle_submit_rating,
+            schema={
+                "type": "object",
+                "required": ["gameId", "rating"],
+                "properties": {
+                    "gameId": {"type": "string", "minLength": 1},
+                    "rating": {"type": ["integer", "string"]}
+                }
+            },
+            middleware=(self.rate_limit,), error_label="Rating"
+        )
+        self.register_command(CommandType.GET_DIAGNOSTICS, self.handle_get_diagnostics,
+                              middleware=(self.auth,), error_label="Diagnostics")
+        self.register_command(CommandType.SUBSCRIBE, self.handle_subscribe,
+                              schema=TOPICS_SCHEMA, middleware=(self.rate_limit,), error_label="Subscribe")
+        self.register_command(CommandType.UNSUBSCRIBE, self.handle_unsubscribe,
+                              schema=TOPICS_SCHEMA, middleware=(self.rate_limit,), error_label="Unsubscribe")
+        self.register_command(CommandType.PREPARE_GAME, self.handle_prepare_game,
+                              schema=GAME_ID_SCHEMA, middleware=(self.rate_limit,), error_label="Prepare")
+        self.register_command(CommandType.REPORT_FIRST_FRAME, self.handle_report_first_frame,
+                              schema=GAME_ID_SCHEMA, error_label="First frame")
+    
+    def register_command(self, name: str, handler: Callable, schema: Optional[Dict[str, Any]] = None,
+                         timeout: Optional[float] = DEFAULT_COMMAND_TIMEOUT, middleware: Sequence[Callable] = (),
+                         error_label: Optional[str] = None):
+        """Register a command handler
+        
+        The handler is awaited as handler(websocket, params, command_id) and must
+        return a response dict. Params are validated against the JSON schema
+        before the middleware chain runs.
+        """
+        name = str(name.value if isinstance(name, Enum) else name)
+        if name in self.commands:
+            self.logger.warning(f"Replacing handler for command {name}")
+        self.commands[name] = CommandRegistration(name, handler, schema, timeout, middleware, error_label)
+    
+    async def run_blocking(self, func: Callable, *args, **kwargs):
+        """Run a blocking call on the executor and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    async def run_game_call(self, func: Callable, *args):
+        """Run a game launch or end on the executor, serialized with any earlier one still running
+        
+        A command that times out releases game_lock while its pool thread is
+        still in launch_game or end_game; the thread lock keeps the next call
+        waiting until that thread finishes.
+        """
+        def locked_call():
+            with self.game_call_lock:
+                return func(*args)
+        
+        return await self.run_blocking(locked_call)
+    
+    def shutdown(self):
+        """Wait for in-flight blocking calls and stop the executor"""
+        self.executor.shutdown(wait=True)
+    
+    def set_status_provider(self, provider):
+        """Set the server object that produces status snapshots for clients"""
+        self.status_provider = provider
+    
     async def handle_command(self, websocket, command_type, params, command_id):
         """Process a command from a client and return a response"""
+        command = self.commands.get(command_type) if isinstance(command_type, str) else None
+        if command is None:
+            return self.create_error_response(
+                command_id, f"Unknown command type: {command_type}"
+            )
+        
+        params = params or {}
+        if command.validator:
+            error = next(iter(command.validator.iter_errors(params)), None)
+            if error is not None:
+                return self.create_error_response(command_id, f"Invalid parameters: {error.message}")
+        
+        # Build the chain from the innermost call outwards
+        call_next = functools.partial(self._run_handler, command, websocket, params, command_id)
+        for middleware in reversed(self.middleware + list(command.middleware)):
+            call_next = functools.partial(middleware, command, websocket, params, command_id, call_next)
+        
+        return await call_next()
+    
+    async def _run_handler(self, command: CommandRegistration, websocket, params, command_id):
+        """Run a command handler with its timeout and shared error handling"""
         try:
-            if command_type == CommandType.LAUNCH_GAME:
-                return await self.handle_launch_game(websocket, params, command_id)
-            elif command_type == CommandType.END_SESSION:
-                return await self.handle_end_session(websocket, command_id)
-            elif command_type == CommandType.PAUSE_SESSION:
-                return await self.handle_pause_session(websocket, command_id)
-            elif command_type == CommandType.RESUME_SESSION:
-                return await self.handle_resume_session(websocket, command_id)
-            elif command_type == CommandType.GET_STATUS:
-                return await self.handle_get_status(websocket, command_id)
-            elif command_type == CommandType.HEARTBEAT:
-                return await self.handle_heartbeat(websocket, command_id)
-            elif command_type == CommandType.SUBMIT_RATING:
-                return await self.handle_submit_rating(websocket, params, command_id)
-            elif command_type == CommandType.GET_DIAGNOSTICS:
-                return await self.handle_get_diagnostics(websocket, command_id)
-            else:
-                return self.create_error_response(
-                    command_id, f"Unknown command type: {command_type}"
-                )
+            return await asyncio.wait_for(command.handler(websocket, params, command_id), command.timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Command {command.name} timed out after {command.timeout}s")
+            return self.create_error_response(command_id, f"{command.error_label} error: timed out")
         except Exception as e:
-            self.logger.exception(f"Error handling command {command_type}: {e}")
-            return self.create_error_response(command_id, f"Command error: {str(e)}")
-            
+            self.logger.exception(f"Error handling command {command.name}: {e}")
+            return self.create_error_response(command_id, f"{command.error_label} error: {str(e)}")
+    
     async def handle_launch_game(self, websocket, params, command_id):
         """Launch a VR game"""
-        if not params:
-            return self.create_error_response(command_id, "Missing parameters")
-            
         game_id = params.get('gameId')
         session_duration = params.get('sessionDuration')
         
-        if not game_id:
-            return self.create_error_response(command_id, "Missing gameId parameter")
-            
         # Ensure session_duration is valid
         try:
             session_duration = int(session_duration)
@@ -81,175 +228,194 @@ class CommandHandler:
         except (TypeError, ValueError) as e:
             return self.create_error_response(command_id, f"Invalid session duration: {str(e)}")
         
-        try:
-            # Get game data
-            game = self.database.get_game(game_id)
-            if not game:
-                return self.create_error_response(command_id, f"Game with ID {game_id} not found")
-            
-            # Validate session duration
-            min_duration = game.get('min_duration_seconds', 300)
-            max_duration = game.get('max_duration_seconds', 1800)
-            
-            if session_duration < min_duration:
-                session_duration = min_duration
-                self.logger.warning(f"Session duration adjusted to minimum: {min_duration}")
-            elif session_duration > max_duration:
-                session_duration = max_duration
-                self.logger.warning(f"Session duration adjusted to maximum: {max_duration}")
-            
+        # Get game data
+        game = await self.run_blocking(self.database.get_game, game_id)
+        if not game:
+            return self.create_error_response(command_id, f"Game with ID {game_id} not found")
+        
+        # Validate session duration
+        min_duration = game.get('min_duration_seconds', 300)
+        max_duration = game.get('max_duration_seconds', 1800)
+        
+        if session_duration < min_duration:
+            session_duration = min_duration
+            self.logger.warning(f"Session duration adjusted to minimum: {min_duration}")
+        elif session_duration > max_duration:
+            session_duration = max_duration
+            self.logger.warning(f"Session duration adjusted to maximum: {max_duration}")
+        
+        async with self.game_lock:
             # Launch the game
-            success, _ = self.game_manager.launch_game(game_id)
+            success, result = await self.run_game_call(self.game_manager.launch_game, game_id)
             if not success:
-                return self.create_error_response(command_id, f"Failed to launch game {game_id}")
+                reason = result.get("error")
+                message = f"Failed to launch game {game_id}" + (f": {reason}" if reason else "")
+                return self.create_error_response(command_id, message)
             
             # Start a session timer
-            self.session_manager.start_timer(session_duration)
+            await self.run_blocking(self.session_manager.start_session, game_id, session_duration)
             
             # Record in database
-            self.current_session_id = self.database.start_session(
-                game_id, 
+            await self._finish_resource_tracking()
+            self.current_session_id = await self.run_blocking(
+                self.database.start_session,
+                game_id,
                 session_duration
             )
             
-            return {
-                "id": command_id,
-                "status": ResponseStatus.SUCCESS,
-                "data": {
-                    "gameId": game_id,
-                    "gameTitle": game.get('title'),
-                    "sessionId": self.current_session_id,
-                    "sessionDuration": session_duration,
-                    "message": f"Game {game.get('title')} launched successfully"
-                },
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            }
-        except Exception as e:
-            self.logger.exception(f"Error launching game {game_id}: {e}")
-            return self.create_error_response(command_id, f"Launch error: {str(e)}")
+            # Account the game's process tree against this session
+            pid = self.game_manager.get_current_pid()
+            if pid is not None:
+                self.system_monitor.track_process(pid, self.current_session_id, game_id)
+        
+        return self.create_success_response(command_id, {
+            "gameId": game_id,
+            "gameTitle": game.get('title'),
+            "sessionId": self.current_session_id,
+            "sessionDuration": session_duration,
+            "message": f"Game {game.get('title')} launched successfully"
+        })
+    
+    async def handle_prepare_game(self, websocket, params, command_id):
+        """Stage a game's launch and report whether it is ready to start"""
+        game_id = params['gameId']
+        success, readiness = await self.run_blocking(self.game_manager.prepare_game, game_id)
+        if not success:
+            return self.create_error_response(command_id, f"Game with ID {game_id} not found")
+        
+        return self.create_success_response(command_id, {
+            "gameId": game_id,
+            "ready": readiness["ready"],
+            "demoMode": readiness["demo_mode"],
+            "runtimeRunning": readiness["runtime"],
+            "issues": readiness["issues"]
+        })
+    
+    async def handle_report_first_frame(self, websocket, params, command_id):
+        """Record that the running game has rendered its first frame"""
+        game_id = params['gameId']
+        elapsed_ms = self.game_manager.record_first_frame(game_id)
+        if elapsed_ms is None:
+            return self.create_error_response(command_id, f"No pending launch for game {game_id}")
+        
+        return self.create_success_response(command_id, {
+            "gameId": game_id,
+            "timeToFirstFrameMs": elapsed_ms
+        })
     
-    async def handle_end_session(self, websocket, command_id):
+    async def handle_end_session(self, websocket, params, command_id):
         """End the current game session"""
-        try:
-            # End the current game
-            success = self.game_manager.end_current_game()
+        async with self.game_lock:
+            # End the current game; terminating a stubborn process can take seconds
+            success = await self.run_game_call(self.game_manager.end_game)
             if not success:
                 self.logger.warning("No active game to end")
             
             # Stop the session timer
-            self.session_manager.stop_timer()
+            await self.run_blocking(self.session_manager.end_session)
             
             # Update database record
+            await self._finish_resource_tracking()
             if self.current_session_id:
-                self.database.end_session(self.current_session_id)
+                await self.run_blocking(self.database.end_session, self.current_session_id)
                 self.current_session_id = None
-            
-            return {
-                "id": command_id,
-                "status": ResponseStatus.SUCCESS,
-                "data": {
-                    "message": "Session ended successfully"
-                },
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            }
-        except Exception as e:
-            self.logger.exception(f"Error ending session: {e}")
-            return self.create_error_response(command_id, f"End session error: {str(e)}")
+        
+        return self.create_success_response(command_id, {
+            "message": "Session ended successfully"
+        })
     
-    async def handle_pause_session(self, websocket, command_id):
-        """Pause the current session"""
+    async def _finish_resource_tracking(self):
+        """Stop accounting the game process tree and store its usage for the session"""
+        usage = self.system_monitor.untrack_process()
+        if usage:
+            await self.run_blocking(self._store_resource_usage, usage)
+    
+    def _store_resource_usage(self, usage: Optional[Dict[str, Any]]):
+        """Write a usage summary for its session; blocking"""
+        if not usage or not usage['session_id']:
+            return
         try:
-            success = self.session_manager.pause_timer()
-            if not success:
-                return self.create_error_response(command_id, "No active session to pause")
-            
-            return {
-                "id": command_id,
-                "status": ResponseStatus.SUCCESS,
-                "data": {
-                    "message": "Session paused successfully"
-                },
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            }
+            self.database.record_session_resource_usage(usage['session_id'], usage['game_id'], usage)
         except Exception as e:
-            self.logger.exception(f"Error pausing session: {e}")
-            return self.create_error_response(command_id, f"Pause error: {str(e)}")
+            self.logger.exception(f"Error storing resource usage for session {usage['session_id']}: {e}")
+    
+    def _on_session_end(self, session_id: str):
+        """Store resource usage when a session ends, e.g. on the session timer's thread"""
+        self._store_resource_usage(self.system_monitor.untrack_process())
+    
+    def _on_game_exit(self, game_id: str, pid: int, return_code: int):
+        """Store resource usage when the tracked game process exits; runs on the event loop"""
+        usage = self.system_monitor.untrack_process(pid)
+        if usage:
+            asyncio.get_running_loop().run_in_executor(self.executor, self._store_resource_usage, usage)
+    
+    async def handle_pause_session(self, websocket, params, command_id):
+        """Pause the current session"""
+        success = self.session_manager.pause_session()
+        if not success:
+            return self.create_error_response(command_id, "No active session to pause")
+        
+        return self.create_success_response(command_id, {
+            "message": "Session paused successfully"
+        })
     
-    async def handle_resume_session(self, websocket, command_id):
+    async def handle_resume_session(self, websocket, params, command_id):
         """Resume the current session"""
-        try:
-            success = self.session_manager.resume_timer()
-            if not success:
-                return self.create_error_response(command_id, "No paused session to resume")
-            
-            return {
-                "id": command_id,
-                "status": ResponseStatus.SUCCESS,
-                "data": {
-                    "message": "Session resumed successfully"
-                },
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            }
-        except Exception as e:
-            self.logger.exception(f"Error resuming session: {e}")
-            return self.create_error_response(command_id, f"Resume error: {str(e)}")
+        success = self.session_manager.resume_session()
+        if not success:
+            return self.create_error_response(command_id, "No paused session to resume")
+        
+        return self.create_success_response(command_id, {
+            "message": "Session resumed successfully"
+        })
     
-    async def handle_get_status(self, websocket, command_id):
-        """Get current system status"""
-        try:
-            game_status = self.game_manager.get_status()
-            session_status = self.session_manager.get_status()
-            system_metrics = self.system_monitor.get_metrics()
-            
-            status = {
-                "connected": True,
-                "gameRunning": game_status.get("running", False),
-                "activeGame": game_status.get("current_game"),
-                "isPaused": session_status.get("paused", False),
-                "timeRemaining": session_status.get("time_remaining", 0),
-                "cpuUsage": system_metrics.get("cpu_percent", 0),
-                "memoryUsage": system_metrics.get("memory_percent", 0),
-                "diskSpace": system_metrics.get("disk_percent", 0),
-                "serverUptime": system_metrics.get("uptime", 0),
-                "connectedClients": len(websocket.clients) if hasattr(websocket, 'clients') else 1,
-                "alerts": system_metrics.get("alerts", [])
-            }
-            
-            return {
-                "id": command_id,
-                "status": ResponseStatus.SUCCESS,
-                "data": {
-                    "status": status
-                },
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            }
-        except Exception as e:
-            self.logger.exception(f"Error getting status: {e}")
-            return self.create_error_response(command_id, f"Status error: {str(e)}")
+    async def handle_get_status(self, websocket, params, command_id):
+        """Get current system status
+        
+        When a status provider is set, the reply is a full snapshot and also
+        resets the client's delta baseline for status broadcasts.
+        """
+        if self.status_provider:
+            snapshot = self.status_provider.get_status_snapshot(websocket)
+            return self.create_success_response(command_id, {
+                "status": snapshot["status"],
+                "statusSeq": snapshot["statusSeq"],
+                "delta": False
+            })
+        
+        game_status = self.game_manager.get_status()
+        session_status = self.session_manager.get_status()
+        
+        status = {
+            "connected": True,
+            "gameRunning": game_status.get("running", False),
+            "activeGame": game_status.get("current_game"),
+            "isPaused": session_status.get("is_paused", False),
+            "timeRemaining": session_status.get("time_remaining", 0),
+            "cpuUsage": self.system_monitor.get_cpu_usage(),
+            "memoryUsage": self.system_monitor.get_memory_usage(),
+            "diskSpace": self.system_monitor.get_disk_space(),
+            "serverUptime": self.system_monitor.get_system_uptime(),
+            "connectedClients": len(websocket.clients) if hasattr(websocket, 'clients') else 1,
+            "alerts": self.system_monitor.get_recent_alerts()
+        }
+        
+        return self.create_success_response(command_id, {
+            "status": status
+        })
     
-    async def handle_heartbeat(self, websocket, command_id):
+    async def handle_heartbeat(self, websocket, params, command_id):
         """Handle heartbeat ping"""
-        return {
-            "id": command_id,
-            "status": ResponseStatus.SUCCESS,
-            "data": {
-                "message": "pong",
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            },
+        return self.create_success_response(command_id, {
+            "message": "pong",
             "timestamp": int(datetime.now().timestamp() * 1000)
-        }
+        })
     
     async def handle_submit_rating(self, websocket, params, command_id):
         """Submit a game rating"""
-        if not params:
-            return self.create_error_response(command_id, "Missing parameters")
-        
         game_id = params.get('gameId')
         rating = params.get('rating')
         
-        if not game_id or rating is None:
-            return self.create_error_response(command_id, "Missing gameId or rating")
-        
         try:
             rating = int(rating)
             if rating < 1 or rating > 5:
@@ -257,39 +423,58 @@ class CommandHandler:
         except (TypeError, ValueError):
             return self.create_error_response(command_id, "Invalid rating value")
         
-        try:
-            # Record rating in database
-            if self.current_session_id:
-                self.database.end_session(self.current_session_id, rating)
-            
-            return {
-                "id": command_id,
-                "status": ResponseStatus.SUCCESS,
-                "data": {
-                    "message": "Rating submitted successfully",
-                    "gameId": game_id,
-                    "rating": rating
-                },
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            }
-        except Exception as e:
-            self.logger.exception(f"Error submitting rating: {e}")
-            return self.create_error_response(command_id, f"Rating error: {str(e)}")
+        # Record rating in database
+        if self.current_session_id:
+            await self.run_blocking(self.database.end_session, self.current_session_id, rating)
+        
+        return self.create_success_response(command_id, {
+            "message": "Rating submitted successfully",
+            "gameId": game_id,
+            "rating": rating
+        })
     
-    async def handle_get_diagnostics(self, websocket, command_id):
+    async def handle_get_diagnostics(self, websocket, params, command_id):
         """Get system diagnostics"""
+        diagnostics = self.system_monitor.get_all_metrics()
+        diagnostics["commands"] = self.timing.get_stats()
+        diagnostics["games"] = self.game_manager.get_process_stats()
+        diagnostics["gameResources"] = await self.run_blocking(self.database.get_game_resource_summary)
+        diagnostics["writeQueue"] = self.database.write_queue.get_stats()
+        
+        return self.create_success_response(command_id, diagnostics)
+    
+    async def handle_subscribe(self, websocket, params, command_id):
+        """Subscribe the client to status topics"""
+        if not self.status_provider:
+            return self.create_error_response(command_id, "Status subscriptions are not available")
+        
         try:
-            diagnostics = self.system_monitor.get_detailed_metrics()
-            
-            return {
-                "id": command_id,
-                "status": ResponseStatus.SUCCESS,
-                "data": diagnostics,
-                "timestamp": int(datetime.now().timestamp() * 1000)
-            }
-        except Exception as e:
-            self.logger.exception(f"Error getting diagnostics: {e}")
-            return self.create_error_response(command_id, f"Diagnostics error: {str(e)}")
+            data = self.status_provider.subscribe_client(websocket, params['topics'])
+        except ValueError as e:
+            return self.create_error_response(command_id, str(e))
+        
+        return self.create_success_response(command_id, data)
+    
+    async def handle_unsubscribe(self, websocket, params, command_id):
+        """Unsubscribe the client from status topics"""
+        if not self.status_provider:
+            return self.create_error_response(command_id, "Status subscriptions are not available")
+        
+        try:
+            data = self.status_provider.unsubscribe_client(websocket, params['topics'])
+        except ValueError as e:
+            return self.create_error_response(command_id, str(e))
+        
+        return self.create_success_response(command_id, data)
+    
+    def create_success_response(self, command_id: str, data: Any) -> dict:
+        """Create a standardized success response"""
+        return {
+            "id": command_id,
+            "status": ResponseStatus.SUCCESS,
+            "data": data,
+            "timestamp": int(datetime.now().timestamp() * 1000)
+        }
     
     def create_error_response(self, command_id: str, error_message: str) -> dict:
         """Create a standardized error response"""
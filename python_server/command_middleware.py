@@ -0,0 +1,114 @@
+import hmac
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Middleware are awaited as middleware(command, websocket, params, command_id, call_next)
+# and return a response dict. call_next() runs the rest of the chain and the handler.
+
+
+def _error_response(command_id: str, error_message: str) -> Dict[str, Any]:
+    """Create a standardized error response"""
+    return {
+        "id": command_id,
+        "status": "error",
+        "error": error_message,
+        "timestamp": int(datetime.now().timestamp() * 1000)
+    }
+
+
+class TimingMiddleware:
+    """Measures per-command latency and error counts"""
+    
+    def __init__(self, logger, slow_command_ms: float = 500.0):
+        self.logger = logger
+        self.slow_command_ms = slow_command_ms
+        self.stats: Dict[str, Dict[str, Any]] = {}
+    
+    async def __call__(self, command, websocket, params, command_id, call_next: Callable[[], Awaitable[dict]]):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await call_next()
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            failed = response is None or response.get("status") == "error"
+            self._record(command.name, elapsed_ms, failed)
+            if elapsed_ms > self.slow_command_ms:
+                self.logger.warning(f"Slow command {command.name}: {elapsed_ms:.1f}ms")
+    
+    def _record(self, name: str, elapsed_ms: float, failed: bool):
+        stats = self.stats.setdefault(name, {
+            "count": 0,
+            "errors": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "last_ms": 0.0
+        })
+        stats["count"] += 1
+        stats["errors"] += 1 if failed else 0
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["last_ms"] = elapsed_ms
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get latency statistics for every command that has run"""
+        return {
+            name: {
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "last_ms": round(stats["last_ms"], 3)
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+class RateLimitMiddleware:
+    """Limits how many rate-limited commands each client can send per minute"""
+    
+    def __init__(self, logger, max_per_minute: int = 60):
+        self.logger = logger
+        self.max_per_minute = max_per_minute
+        self.windows: "weakref.WeakKeyDictionary[Any, deque]" = weakref.WeakKeyDictionary()
+    
+    async def __call__(self, command, websocket, params, command_id, call_next):
+        if self.max_per_minute > 0:
+            now = time.monotonic()
+            window = self.windows.setdefault(websocket, deque())
+            while window and now - window[0] > 60:
+                window.popleft()
+            if len(window) >= self.max_per_minute:
+                self.logger.warning(f"Rate limit exceeded for command {command.name}")
+                return _error_response(command_id, "Rate limit exceeded, try again later")
+            window.append(now)
+        
+        return await call_next()
+
+
+class AuthMiddleware:
+    """Requires an API key before a client may run protected commands
+    
+    A client authenticates by sending ``apiKey`` in the params of any protected
+    command; the connection stays authenticated afterwards.
+    """
+    
+    def __init__(self, logger, api_key: Optional[str], required: bool = False):
+        self.logger = logger
+        self.api_key = api_key or ""
+        self.required = required
+        self.authenticated: "weakref.WeakSet[Any]" = weakref.WeakSet()
+    
+    async def __call__(self, command, websocket, params, command_id, call_next):
+        if self.required and websocket not in self.authenticated:
+            supplied = params.get("apiKey", "") if params else ""
+            if not self.api_key or not hmac.compare_digest(str(supplied), self.api_key):
+                self.logger.warning(f"Unauthorized {command.name} command rejected")
+                return _error_response(command_id, "Authentication required")
+            self.authenticated.add(websocket)
+        
+        return await call_next()
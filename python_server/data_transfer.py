@@ -0,0 +1,217 @@
+import csv
+import datetime
+import json
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Tables that can be exported and imported: table -> key column used for upserts
+TRANSFER_TABLES: Dict[str, str] = {
+    "games": "id",
+    "sessions": "id",
+    "rfid_cards": "tag_id",
+}
+
+BATCH_SIZE = 1000  # rows fetched and written per batch
+FORMATS = ("ndjson", "csv")
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Get the transfer format from an explicit choice or the file extension"""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format {fmt}, expected one of {', '.join(FORMATS)}")
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def _json_value(value: Any) -> Any:
+    """Convert values json cannot encode"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Get the column names of a table"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _check_table(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Make sure a table can be transferred; returns its columns"""
+    if table not in TRANSFER_TABLES:
+        raise ValueError(f"Unsupported table {table}, expected one of {', '.join(TRANSFER_TABLES)}")
+    columns = _table_columns(conn, table)
+    if not columns:
+        raise ValueError(f"Table {table} does not exist in this database")
+    return columns
+
+
+def _open_output(path: str) -> TextIO:
+    """Open an export destination; "-" writes to stdout"""
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _open_input(path: str) -> TextIO:
+    """Open an import source; "-" reads from stdin"""
+    if path == "-":
+        return sys.stdin
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_rows(conn: sqlite3.Connection, sql: str, params: Iterable[Any] = (),
+              batch_size: int = BATCH_SIZE) -> Tuple[List[str], Iterator[Tuple[Any, ...]]]:
+    """Run a query and get its column names and a row iterator that fetches in batches"""
+    cursor = conn.execute(sql, tuple(params))
+    columns = [description[0] for description in cursor.description]
+    
+    def rows():
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield from batch
+    
+    return columns, rows()
+
+
+def export_table(conn: sqlite3.Connection, table: str, path: str, logger, fmt: Optional[str] = None,
+                 batch_size: int = BATCH_SIZE) -> int:
+    """Stream a table to an NDJSON or CSV file in constant memory; returns the number of rows"""
+    _check_table(conn, table)
+    fmt = detect_format(path, fmt)
+    columns, rows = iter_rows(conn, f"SELECT * FROM {table} ORDER BY {TRANSFER_TABLES[table]}",
+                              batch_size=batch_size)
+    
+    count = 0
+    output = _open_output(path)
+    try:
+        if fmt == "csv":
+            writer = csv.writer(output)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(["" if value is None else value for value in row])
+                count += 1
+        else:
+            for row in rows:
+                output.write(json.dumps(dict(zip(columns, row)), default=_json_value))
+                output.write("\n")
+                count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    logger.info(f"Exported {count} rows from {table} to {path} as {fmt}")
+    return count
+
+
+def _read_records(source: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Read records one at a time from an NDJSON or CSV stream"""
+    if fmt == "csv":
+        for record in csv.DictReader(source):
+            # CSV cannot tell empty strings from NULL; empty cells become NULL
+            yield {key: (None if value == "" else value) for key, value in record.items()}
+        return
+    
+    for line_number, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number} is not valid JSON: {e}") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object")
+        yield record
+
+
+def read_file(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Read records one at a time from an NDJSON or CSV file; "-" reads from stdin"""
+    fmt = detect_format(path, fmt)
+    if path != "-" and not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    
+    source = _open_input(path)
+    try:
+        yield from _read_records(source, fmt)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def upsert_rows(conn: sqlite3.Connection, table: str, key: str, records: Iterable[Dict[str, Any]],
+                columns: List[str], logger, batch_size: int = BATCH_SIZE) -> Tuple[int, int]:
+    """Insert or update records in batches with executemany; returns (written, skipped)
+    
+    Fields that are not columns of the table are ignored, and records without
+    the key are skipped. Consecutive records with the same fields share one
+    executemany, so records are applied in file order.
+    """
+    known = set(columns)
+    written = skipped = 0
+    fields: Tuple[str, ...] = ()
+    batch: List[Tuple[Any, ...]] = []
+    
+    def flush():
+        if not batch:
+            return
+        updates = [field for field in fields if field != key]
+        sql = (
+            f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)}) "
+            f"ON CONFLICT({key}) DO "
+            + (f"UPDATE SET {', '.join(f'{field} = excluded.{field}' for field in updates)}"
+               if updates else "NOTHING")
+        )
+        conn.executemany(sql, batch)
+        batch.clear()
+    
+    for record in records:
+        if record.get(key) in (None, ""):
+            skipped += 1
+            continue
+        
+        record_fields = tuple(field for field in record if field in known)
+        if record_fields != fields or len(batch) >= batch_size:
+            flush()
+            fields = record_fields
+        batch.append(tuple(record[field] for field in fields))
+        written += 1
+    
+    flush()
+    if skipped:
+        logger.warning(f"Skipped {skipped} {table} records without {key}")
+    return written, skipped
+
+
+def import_table(conn: sqlite3.Connection, table: str, path: str, logger, fmt: Optional[str] = None,
+                 batch_size: int = BATCH_SIZE) -> int:
+    """Stream an NDJSON or CSV file into a table with batched upserts; returns the number of rows
+    
+    The whole file is imported in one transaction, so a bad record leaves the
+    table unchanged.
+    """
+    columns = _check_table(conn, table)
+    fmt = detect_format(path, fmt)
+    if path != "-" and not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    
+    source = _open_input(path)
+    try:
+        written, _ = upsert_rows(conn, table, TRANSFER_TABLES[table], _read_records(source, fmt),
+                                 columns, logger, batch_size)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    
+    logger.info(f"Imported {written} rows into {table} from {path}")
+    return written
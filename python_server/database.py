@@ -3,10 +3,28 @@
 import os
 import logging
 import sqlite3
-from typing import Dict, Any, List, Optional, Union
+from typing import Callable, Dict, Any, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 from datetime import datetime
+import hashlib
 import json
 import threading
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+from archive import ARCHIVED_TABLES, archive_history, query_partitions
+from game_catalog import GameCatalog
+from migrations import apply_migrations, audit_query_plans
+from settings_store import SettingsStore
+from write_behind import WriteBehindQueue
+
+BUSY_TIMEOUT_MS = int(os.getenv("VR_DB_BUSY_TIMEOUT_MS", "5000"))  # wait this long for a locked database
+WRITE_BEHIND_MS = int(os.getenv("VR_WRITE_BEHIND_MS", "50"))  # max age of a queued access-log row before it is written
+WRITE_BEHIND_BATCH = int(os.getenv("VR_WRITE_BEHIND_BATCH", "500"))  # write as soon as this many rows are queued
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("VR_WRITE_BEHIND_MAX_PENDING", "10000"))  # queue bound before writes fall back to direct
+CHANGE_POLL_MS = int(os.getenv("VR_DB_CHANGE_POLL_MS", "250"))  # how often commits by other processes are looked for, 0 disables
+ARCHIVE_DIR = os.getenv("VR_ARCHIVE_DIR", "archive")  # monthly history files
+ARCHIVE_KEEP_MONTHS = int(os.getenv("VR_ARCHIVE_KEEP_MONTHS", "3"))  # months of history, including the current one, kept live
+GAMES_IMPORT_STATE_KEY = "games_import_state"  # settings key holding the last imported config file's mtime and hash
 
 class Database:
     """SQLite database manager for persistent storage"""
@@ -14,88 +32,255 @@ class Database:
     def __init__(self, db_path: str, logger):
         self.logger = logger
         self.db_path = db_path
-        self.connection = None
+        self.connection = None  # the single writer connection
         self._connection_lock = threading.Lock()
+        self._write_lock = threading.RLock()  # serializes every write transaction
+        self._write_depth = 0
+        self._writer_thread: Optional[int] = None
+        self._local = threading.local()  # per-thread read-only connections
+        self._readers: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._readers_lock = threading.Lock()
+        self.schema_version = 0
+        self.archive_dir = ARCHIVE_DIR
+        
+        # Read-through cache of the games table, rebuilt when the version moves
+        self._catalog: Optional[GameCatalog] = None
+        self._catalog_version = 0
+        self._catalog_lock = threading.Lock()
+        self._data_version = 0
+        
+        # Settings are served from memory and written through
+        self.settings = SettingsStore(self, logger)
         self._initialize_db()
+        
+        # Append-only log writes are batched instead of committed one by one
+        self.write_queue = WriteBehindQueue(self, logger, WRITE_BEHIND_MS, WRITE_BEHIND_BATCH, WRITE_BEHIND_MAX_PENDING)
+        self.write_queue.start()
+        
+        # Commits by other processes are looked for in the background, off the request path
+        self._change_callbacks: List[Callable[[], None]] = [self.invalidate_catalog]
+        self._change_lock = threading.Lock()
+        self._seen_data_version = self.data_version()
+        self._change_stop = threading.Event()
+        self._change_thread: Optional[threading.Thread] = None
+        if CHANGE_POLL_MS > 0:
+            self._change_thread = threading.Thread(target=self._change_loop, name="db-change-poll")
+            self._change_thread.daemon = True
+            self._change_thread.start()
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a thread-safe database connection"""
+        """Get the shared writer connection; use writer() or reader() to access it safely"""
         if self.connection is None:
             with self._connection_lock:
                 if self.connection is None:
-                    self.connection = sqlite3.connect(
+                    connection = sqlite3.connect(
                         self.db_path, 
                         check_same_thread=False,
-                        detect_types=sqlite3.PARSE_DECLTYPES
+                        detect_types=sqlite3.PARSE_DECLTYPES,
+                        timeout=BUSY_TIMEOUT_MS / 1000.0
                     )
-                    self.connection.row_factory = sqlite3.Row
+                    connection.row_factory = sqlite3.Row
+                    
+                    # WAL lets readers run while the writer commits
+                    mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+                    if mode.lower() != "wal":
+                        self.logger.warning(f"SQLite journal mode is {mode}, WAL not available for {self.db_path}")
+                    connection.execute("PRAGMA synchronous=NORMAL")
+                    self.connection = connection
         return self.connection
     
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction on the writer connection
+        
+        Writers are serialized by a lock. The outermost block commits on success
+        and rolls back on error; nested blocks join the outer transaction.
+        """
+        with self._write_lock:
+            conn = self._get_connection()
+            self._write_depth += 1
+            self._writer_thread = threading.get_ident()
+            try:
+                yield conn
+                if self._write_depth == 1:
+                    conn.commit()
+            except BaseException:
+                if self._write_depth == 1:
+                    conn.rollback()
+                raise
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer_thread = None
+    
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Get this thread's read-only connection, which does not block on writes"""
+        if self.db_path == ":memory:" or self._writer_thread == threading.get_ident():
+            # In-memory databases cannot be shared, and a writer must see its own changes
+            with self._write_lock:
+                yield self._get_connection()
+            return
+        
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._open_reader()
+            self._local.connection = conn
+        yield conn
+    
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open a read-only connection for the calling thread"""
+        self._get_connection()  # make sure the file exists and is in WAL mode
+        uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,  # only used by its thread, but closed from close()
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=BUSY_TIMEOUT_MS / 1000.0
+        )
+        conn.row_factory = sqlite3.Row
+        
+        with self._readers_lock:
+            # Drop connections of threads that have exited
+            for thread, reader in self._readers:
+                if not thread.is_alive():
+                    reader.close()
+            self._readers = [(t, r) for t, r in self._readers if t.is_alive()]
+            self._readers.append((threading.current_thread(), conn))
+        return conn
+    
+    def data_version(self) -> int:
+        """Get a counter that moves whenever another process commits to the database
+        
+        PRAGMA data_version is read on the writer connection, which sees the
+        commits of every other connection but not its own, so this process's
+        writes leave it unchanged while admin_utility's writes move it.
+        """
+        with self._write_lock:
+            try:
+                self._data_version = self._get_connection().execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error as e:
+                self.logger.error(f"Error reading database data version: {e}")
+        return self._data_version
+    
+    def add_change_callback(self, callback: Callable[[], None]):
+        """Call callback from the polling thread after another process commits to the database"""
+        self._change_callbacks.append(callback)
+    
+    def check_for_changes(self) -> bool:
+        """Look for commits by other processes now and run the change callbacks; returns whether there were any"""
+        with self._change_lock:
+            version = self.data_version()
+            changed = version != self._seen_data_version
+            self._seen_data_version = version
+        
+        if changed:
+            for callback in list(self._change_callbacks):
+                try:
+                    callback()
+                except Exception as e:
+                    self.logger.exception(f"Error in database change callback: {e}")
+        return changed
+    
+    def _change_loop(self):
+        """Background thread that checks for other processes' commits every CHANGE_POLL_MS"""
+        while not self._change_stop.wait(CHANGE_POLL_MS / 1000.0):
+            try:
+                self.check_for_changes()
+            except Exception as e:
+                self.logger.exception(f"Error checking for database changes: {e}")
+    
     def _initialize_db(self):
         """Initialize the database schema"""
         try:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
             
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Create games table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS games (
-                    id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    executable_path TEXT,
-                    working_directory TEXT,
-                    arguments TEXT,
-                    description TEXT,
-                    image_url TEXT,
-                    min_duration_seconds INTEGER NOT NULL,
-                    max_duration_seconds INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create sessions table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id TEXT PRIMARY KEY,
-                    game_id TEXT NOT NULL,
-                    start_time TIMESTAMP NOT NULL,
-                    end_time TIMESTAMP,
-                    duration_seconds INTEGER,
-                    rfid_tag TEXT,
-                    rating INTEGER,
-                    status TEXT NOT NULL,
-                    FOREIGN KEY (game_id) REFERENCES games(id)
-                )
-            ''')
-            
-            # Create rfid_cards table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS rfid_cards (
-                    tag_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    status TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_used_at TIMESTAMP
-                )
-            ''')
+            with self.writer() as conn:
+                cursor = conn.cursor()
+                
+                # Create games table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS games (
+                        id TEXT PRIMARY KEY,
+                        title TEXT NOT NULL,
+                        executable_path TEXT,
+                        working_directory TEXT,
+                        arguments TEXT,
+                        description TEXT,
+                        image_url TEXT,
+                        min_duration_seconds INTEGER NOT NULL,
+                        max_duration_seconds INTEGER NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Create sessions table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sessions (
+                        id TEXT PRIMARY KEY,
+                        game_id TEXT NOT NULL,
+                        start_time TIMESTAMP NOT NULL,
+                        end_time TIMESTAMP,
+                        duration_seconds INTEGER,
+                        rfid_tag TEXT,
+                        rating INTEGER,
+                        status TEXT NOT NULL,
+                        FOREIGN KEY (game_id) REFERENCES games(id)
+                    )
+                ''')
+                
+                # Create rfid_cards table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS rfid_cards (
+                        tag_id TEXT PRIMARY KEY,
+                        name TEXT,
+                        status TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_used_at TIMESTAMP
+                    )
+                ''')
+                
+                # Create per-session resource usage table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS session_resource_usage (
+                        session_id TEXT PRIMARY KEY,
+                        game_id TEXT NOT NULL,
+                        samples INTEGER NOT NULL,
+                        avg_cpu_percent REAL,
+                        peak_cpu_percent REAL,
+                        avg_rss_mb REAL,
+                        peak_rss_mb REAL,
+                        peak_threads INTEGER,
+                        peak_processes INTEGER,
+                        io_read_bytes INTEGER,
+                        io_write_bytes INTEGER,
+                        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (session_id) REFERENCES sessions(id)
+                    )
+                ''')
+                
+                # Create settings table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS settings (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
             
-            # Create settings table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            # Bring older databases up to date, then check the hot queries use indexes
+            with self._write_lock:
+                conn = self._get_connection()
+                self.schema_version = apply_migrations(conn, self.logger)
+                audit_query_plans(conn, self.logger)
+            self.settings.load()
             
-            conn.commit()
-            self.logger.info("Database schema initialized successfully")
+            self.logger.info(f"Database schema initialized successfully (version {self.schema_version})")
             
-            # Always reimport games from JSON to ensure they're up to date
+            # Import games from JSON when the file changed since the last import
             games_config_path = os.environ.get("VR_GAMES_CONFIG", "games.json")
             if os.path.exists(games_config_path):
                 self._import_games_from_json(games_config_path)
@@ -106,117 +291,203 @@ class Database:
             self.logger.error(f"Database initialization error: {e}")
             raise
     
-    def _import_games_from_json(self, config_path: str):
-        """Import games from JSON configuration file"""
+    def _import_games_from_json(self, config_path: str) -> bool:
+        """Import games from JSON configuration file
+        
+        The import is incremental: the file is skipped when its mtime and
+        content hash match the last import, and otherwise only games whose
+        record hash changed are upserted. Games removed from the file are
+        deleted.
+        """
         try:
-            with open(config_path, 'r') as f:
-                config_data = json.load(f)
+            with open(config_path, 'rb') as f:
+                content = f.read()
+            file_state = {
+                "path": os.path.abspath(config_path),
+                "mtime": os.path.getmtime(config_path),
+                "sha256": hashlib.sha256(content).hexdigest()
+            }
+            
+            if self.get_setting(GAMES_IMPORT_STATE_KEY) == file_state:
+                self.logger.info(f"Games config {config_path} unchanged since last import")
+                return True
+            
+            config_data = json.loads(content)
             
             if 'games' in config_data:
-                conn = self._get_connection()
-                cursor = conn.cursor()
-                
-                # Clear existing games to ensure fresh import
-                cursor.execute("DELETE FROM games")
-                
+                rows = []
                 for game in config_data['games']:
-                    cursor.execute(
+                    row = (
+                        game['id'], 
+                        game['title'], 
+                        game.get('executable_path', ''),
+                        game.get('working_directory', ''),
+                        game.get('arguments', ''),
+                        game.get('description', ''),
+                        game.get('image_url', ''),
+                        game.get('min_duration_seconds', 300),
+                        game.get('max_duration_seconds', 1800)
+                    )
+                    row_hash = hashlib.sha256(json.dumps(row).encode('utf-8')).hexdigest()
+                    rows.append(row + (row_hash,))
+                
+                with self.writer() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT id, content_hash FROM games")
+                    existing = {row['id']: row['content_hash'] for row in cursor.fetchall()}
+                    
+                    changed = [row for row in rows if existing.get(row[0]) != row[-1]]
+                    imported_ids = {row[0] for row in rows}
+                    removed = [(game_id,) for game_id in existing if game_id not in imported_ids]
+                    
+                    cursor.executemany(
                         """
                         INSERT INTO games (
                             id, title, executable_path, working_directory, 
                             arguments, description, image_url, 
-                            min_duration_seconds, max_duration_seconds
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            min_duration_seconds, max_duration_seconds, content_hash
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            title = excluded.title,
+                            executable_path = excluded.executable_path,
+                            working_directory = excluded.working_directory,
+                            arguments = excluded.arguments,
+                            description = excluded.description,
+                            image_url = excluded.image_url,
+                            min_duration_seconds = excluded.min_duration_seconds,
+                            max_duration_seconds = excluded.max_duration_seconds,
+                            content_hash = excluded.content_hash,
+                            updated_at = CURRENT_TIMESTAMP
                         """,
-                        (
-                            game['id'], 
-                            game['title'], 
-                            game.get('executable_path', ''),
-                            game.get('working_directory', ''),
-                            game.get('arguments', ''),
-                            game.get('description', ''),
-                            game.get('image_url', ''),
-                            game.get('min_duration_seconds', 300),
-                            game.get('max_duration_seconds', 1800)
-                        )
+                        changed
                     )
+                    cursor.executemany("DELETE FROM games WHERE id = ?", removed)
+                    
+                    # Recorded in the same transaction, so a failed import is retried next boot
+                    self.settings.write_row(conn, GAMES_IMPORT_STATE_KEY, file_state)
                 
-                conn.commit()
-                self.logger.info(f"Imported {len(config_data['games'])} games from {config_path}")
+                self.settings.update_cache(GAMES_IMPORT_STATE_KEY, file_state)
+                if changed or removed:
+                    self.invalidate_catalog()
+                
+                self.logger.info(
+                    f"Imported games from {config_path}: {len(changed)} added or updated, "
+                    f"{len(removed)} removed, {len(rows) - len(changed)} unchanged"
+                )
+            return True
                 
-        except (json.JSONDecodeError, FileNotFoundError, KeyError) as e:
+        except (json.JSONDecodeError, FileNotFoundError, KeyError, sqlite3.Error) as e:
             self.logger.error(f"Error importing games from JSON: {e}")
+            return False
+    
+    def import_games(self, config_path: str) -> bool:
+        """Import games from a JSON configuration file; returns False if the import failed"""
+        return self._import_games_from_json(config_path)
     
-    # ... keep existing code (close, get_games, get_game, start_session, end_session, validate_rfid, get_setting, set_setting methods)
+    def enqueue_write(self, sql: str, params: Sequence[Any]) -> bool:
+        """Queue an append-only write for the next batch; returns False when the queue is full"""
+        return self.write_queue.enqueue(sql, params)
+    
+    def flush_writes(self) -> int:
+        """Write all queued rows now; returns the number written"""
+        return self.write_queue.flush()
     
     def close(self):
-        """Close the database connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Flush queued writes, then close the writer and all reader connections"""
+        if getattr(self, "_change_thread", None):
+            self._change_stop.set()
+            self._change_thread.join(timeout=5.0)
+            self._change_thread = None
+        
+        if getattr(self, "write_queue", None):
+            self.write_queue.close()
+        
+        with self._readers_lock:
+            for _, reader in self._readers:
+                reader.close()
+            self._readers = []
+        self._local = threading.local()
+        
+        with self._write_lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
     
-    def get_games(self) -> List[Dict[str, Any]]:
-        """Get all available games"""
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM games ORDER BY title")
+    def get_catalog(self) -> GameCatalog:
+        """Get the cached game catalog, loading it from the games table when stale
+        
+        The cache is versioned: imports bump the version after they commit, and
+        the next read rebuilds the catalog. Writes by other processes, such as
+        admin_utility --import-games, invalidate it from the change polling
+        thread. Records are read-only mappings.
+        """
+        catalog = self._catalog
+        if catalog is not None and catalog.version == self._catalog_version:
+            return catalog
+        
+        with self._catalog_lock:
+            catalog = self._catalog
+            version = self._catalog_version
+            if catalog is not None and catalog.version == version:
+                return catalog  # another thread rebuilt it
             
-            games = []
-            for row in cursor.fetchall():
-                games.append(dict(row))
+            try:
+                with self.reader() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT * FROM games ORDER BY title")
+                    catalog = GameCatalog((dict(row) for row in cursor.fetchall()), version)
+            except sqlite3.Error as e:
+                self.logger.error(f"Error loading game catalog: {e}")
+                return self._catalog or GameCatalog([], -1)
             
-            return games
-        except sqlite3.Error as e:
-            self.logger.error(f"Error getting games: {e}")
-            return []
+            self._catalog = catalog
+            return catalog
+    
+    def invalidate_catalog(self):
+        """Mark the cached game catalog stale after the games table changed"""
+        with self._catalog_lock:
+            self._catalog_version += 1
     
-    def get_game(self, game_id: str) -> Optional[Dict[str, Any]]:
+    def get_games(self) -> List[Mapping[str, Any]]:
+        """Get all available games"""
+        return list(self.get_catalog().list())
+    
+    def get_game(self, game_id: str) -> Optional[Mapping[str, Any]]:
         """Get a game by ID"""
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM games WHERE id = ?", (game_id,))
-            
-            row = cursor.fetchone()
-            return dict(row) if row else None
-        except sqlite3.Error as e:
-            self.logger.error(f"Error getting game {game_id}: {e}")
-            return None
+        return self.get_catalog().get(game_id)
     
     def start_session(self, game_id: str, duration_seconds: int, rfid_tag: Optional[str] = None) -> str:
         """Start a new game session"""
         try:
             session_id = f"{int(datetime.now().timestamp())}-{os.urandom(4).hex()}"
             
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT INTO sessions (
-                    id, game_id, start_time, duration_seconds, rfid_tag, status
-                ) VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    session_id,
-                    game_id,
-                    datetime.now(),
-                    duration_seconds,
-                    rfid_tag,
-                    "active"
-                )
-            )
-            
-            # Update RFID card last_used_at if provided
-            if rfid_tag:
+            with self.writer() as conn:
+                cursor = conn.cursor()
+                
                 cursor.execute(
-                    "UPDATE rfid_cards SET last_used_at = ? WHERE tag_id = ?",
-                    (datetime.now(), rfid_tag)
+                    """
+                    INSERT INTO sessions (
+                        id, game_id, start_time, duration_seconds, rfid_tag, status
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        session_id,
+                        game_id,
+                        datetime.now(),
+                        duration_seconds,
+                        rfid_tag,
+                        "active"
+                    )
                 )
                 
-            conn.commit()
-            return session_id
+                # Update RFID card last_used_at if provided
+                if rfid_tag:
+                    cursor.execute(
+                        "UPDATE rfid_cards SET last_used_at = ? WHERE tag_id = ?",
+                        (datetime.now(), rfid_tag)
+                    )
+                
+                return session_id
             
         except sqlite3.Error as e:
             self.logger.error(f"Error starting session: {e}")
@@ -225,113 +496,209 @@ class Database:
     def end_session(self, session_id: str, rating: Optional[int] = None) -> bool:
         """End a game session"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Get current session
-            cursor.execute(
-                "SELECT * FROM sessions WHERE id = ? AND status = 'active'",
-                (session_id,)
-            )
-            
-            session = cursor.fetchone()
-            if not session:
-                self.logger.warning(f"No active session found with ID {session_id}")
-                return False
-            
-            # Calculate actual duration
-            start_time = datetime.fromisoformat(session['start_time'])
-            end_time = datetime.now()
-            actual_duration = int((end_time - start_time).total_seconds())
-            
-            # Update session
-            cursor.execute(
-                """
-                UPDATE sessions SET 
-                    end_time = ?,
-                    status = 'completed',
-                    rating = ?,
-                    duration_seconds = ?
-                WHERE id = ?
-                """,
-                (
-                    end_time,
-                    rating,
-                    actual_duration,
-                    session_id
+            with self.writer() as conn:
+                cursor = conn.cursor()
+                
+                # Get current session
+                cursor.execute(
+                    "SELECT * FROM sessions WHERE id = ? AND status = 'active'",
+                    (session_id,)
                 )
-            )
-            
-            conn.commit()
-            return True
+                
+                session = cursor.fetchone()
+                if not session:
+                    self.logger.warning(f"No active session found with ID {session_id}")
+                    return False
+                
+                # Calculate actual duration
+                start_time = session['start_time']
+                if isinstance(start_time, str):  # PARSE_DECLTYPES already converts TIMESTAMP columns
+                    start_time = datetime.fromisoformat(start_time)
+                end_time = datetime.now()
+                actual_duration = int((end_time - start_time).total_seconds())
+                
+                # Update session
+                cursor.execute(
+                    """
+                    UPDATE sessions SET 
+                        end_time = ?,
+                        status = 'completed',
+                        rating = ?,
+                        duration_seconds = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        end_time,
+                        rating,
+                        actual_duration,
+                        session_id
+                    )
+                )
+                
+                return True
             
         except (sqlite3.Error, ValueError) as e:
             self.logger.error(f"Error ending session: {e}")
             return False
     
+    def record_session_resource_usage(self, session_id: str, game_id: str, usage: Dict[str, Any]) -> bool:
+        """Store the game process tree's resource usage for a session"""
+        try:
+            with self.writer() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO session_resource_usage (
+                        session_id, game_id, samples, avg_cpu_percent, peak_cpu_percent,
+                        avg_rss_mb, peak_rss_mb, peak_threads, peak_processes,
+                        io_read_bytes, io_write_bytes, recorded_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        session_id,
+                        game_id,
+                        usage['samples'],
+                        usage['avg_cpu_percent'],
+                        usage['peak_cpu_percent'],
+                        usage['avg_rss_mb'],
+                        usage['peak_rss_mb'],
+                        usage['peak_threads'],
+                        usage['peak_processes'],
+                        usage['io_read_bytes'],
+                        usage['io_write_bytes'],
+                        datetime.now()
+                    )
+                )
+                
+                return True
+        
+        except sqlite3.Error as e:
+            self.logger.error(f"Error recording resource usage for session {session_id}: {e}")
+            return False
+    
+    def get_game_resource_summary(self) -> List[Dict[str, Any]]:
+        """Get per-title resource usage across all recorded sessions, heaviest first"""
+        try:
+            with self.reader() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    """
+                    SELECT u.game_id, g.title,
+                           COUNT(*) AS sessions,
+                           ROUND(AVG(u.avg_cpu_percent), 1) AS avg_cpu_percent,
+                           MAX(u.peak_cpu_percent) AS peak_cpu_percent,
+                           ROUND(AVG(u.avg_rss_mb), 1) AS avg_rss_mb,
+                           MAX(u.peak_rss_mb) AS peak_rss_mb,
+                           MAX(u.peak_threads) AS peak_threads,
+                           SUM(u.io_read_bytes) AS io_read_bytes,
+                           SUM(u.io_write_bytes) AS io_write_bytes
+                    FROM session_resource_usage u
+                    LEFT JOIN games g ON g.id = u.game_id
+                    WHERE u.samples > 0
+                    GROUP BY u.game_id
+                    ORDER BY peak_rss_mb DESC
+                    """
+                )
+                
+                return [dict(row) for row in cursor.fetchall()]
+        
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting game resource summary: {e}")
+            return []
+    
     def validate_rfid(self, tag_id: str) -> Optional[Dict[str, Any]]:
         """Validate an RFID tag"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT * FROM rfid_cards WHERE tag_id = ? AND status = 'active'",
-                (tag_id,)
-            )
-            
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            with self.reader() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    "SELECT * FROM rfid_cards WHERE tag_id = ? AND status = 'active'",
+                    (tag_id,)
+                )
+                
+                row = cursor.fetchone()
+                return dict(row) if row else None
             
         except sqlite3.Error as e:
             self.logger.error(f"Error validating RFID tag: {e}")
             return None
     
-    def get_setting(self, key: str, default_value: Any = None) -> Any:
-        """Get a setting value"""
+    def roll_over_history(self) -> Dict[str, int]:
+        """Move closed sessions and access log rows older than ARCHIVE_KEEP_MONTHS into monthly archive files"""
+        self.flush_writes()
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return default_value
-            
-            try:
-                # Try to parse as JSON
-                return json.loads(row[0])
-            except json.JSONDecodeError:
-                # Return as string
-                return row[0]
-                
-        except sqlite3.Error as e:
-            self.logger.error(f"Error getting setting {key}: {e}")
-            return default_value
+            # Holds the write lock for the whole move; the archive step manages its own commits
+            with self._write_lock:
+                return archive_history(self._get_connection(), self.archive_dir, ARCHIVE_KEEP_MONTHS, self.logger)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error(f"Error rolling over history: {e}")
+            return {}
+    
+    def _history(self, table: str, conditions: List[str], params: List[Any], start: Optional[str],
+                 end: Optional[str], limit: Optional[int]) -> List[Dict[str, Any]]:
+        """Query a history table newest first, reading only the monthly archives that can hold rows for the page"""
+        time_column = ARCHIVED_TABLES[table][0]
+        where = list(conditions)
+        bounds = list(params)
+        if start:
+            where.append(f"{time_column} >= ?")
+            bounds.append(start)
+        if end:
+            where.append(f"{time_column} < ?")
+            bounds.append(end)
+        
+        sql = f"SELECT * FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {time_column} DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            bounds.append(limit)
+        
+        with self.reader() as conn:
+            rows = [dict(row) for row in conn.execute(sql, bounds)]
+        
+        # Active sessions stay live past the cutoff, so archived rows can be newer
+        # than live ones; with a full page only those newer than its last row matter
+        archive_start = start
+        if limit is not None and len(rows) >= limit:
+            archive_start = max(start or "", str(rows[-1][time_column]))
+        
+        rows.extend(query_partitions(self.archive_dir, table, conditions, params, archive_start, end, limit))
+        rows.sort(key=lambda row: str(row[time_column]), reverse=True)
+        return rows if limit is None else rows[:limit]
+    
+    def get_session_history(self, rfid_tag: Optional[str] = None, game_id: Optional[str] = None,
+                            start: Optional[str] = None, end: Optional[str] = None,
+                            limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Get sessions newest first across the live database and the archives
+        
+        start and end bound start_time as "YYYY-MM-DD[ HH:MM:SS]" strings.
+        """
+        conditions, params = [], []
+        if rfid_tag:
+            conditions.append("rfid_tag = ?")
+            params.append(rfid_tag)
+        if game_id:
+            conditions.append("game_id = ?")
+            params.append(game_id)
+        return self._history("sessions", conditions, params, start, end, limit)
+    
+    def get_access_history(self, tag_id: Optional[str] = None, start: Optional[str] = None,
+                           end: Optional[str] = None, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Get RFID access log rows newest first across the live database and the archives"""
+        self.flush_writes()
+        conditions, params = (["tag_id = ?"], [tag_id]) if tag_id else ([], [])
+        return self._history("rfid_access_log", conditions, params, start, end, limit)
+    
+    def get_setting(self, key: str, default_value: Any = None) -> Any:
+        """Get a setting value from the in-memory settings store"""
+        return self.settings.get(key, default_value)
     
     def set_setting(self, key: str, value: Any) -> bool:
-        """Set a setting value"""
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            else:
-                value = str(value)
-            
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO settings (key, value, updated_at)
-                VALUES (?, ?, ?)
-                """,
-                (key, value, datetime.now())
-            )
-            
-            conn.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            self.logger.error(f"Error setting setting {key}: {e}")
-            return False
+        """Set a setting value, writing it through to the database"""
+        return self.settings.set(key, value)
+                
\ No newline at end of file
@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKUP_PAGES = int(os.getenv("VR_BACKUP_PAGES", "256"))  # pages copied per backup step
+BACKUP_SLEEP_MS = int(os.getenv("VR_BACKUP_SLEEP_MS", "20"))  # pause between steps so the server can write
+BACKUP_MAX_RESTARTS = 5  # concurrent writes restart a paged backup; after this many, copy in one step
+
+# Chains get their own prefix so rotation never touches the plain vr_kiosk_backup_*.db
+# copies taken before chains existed. Names carry microseconds, plus a sequence number on a collision
+CHAIN_PREFIX = "vr_kiosk_chain_"
+FULL_PATTERN = re.compile(rf"^{CHAIN_PREFIX}(\d{{8}}_\d{{6}}_\d{{6}})(_\d+)?\.db$")
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S_%f"
+INCREMENT_MAGIC = b"VRINCR1\n"
+PAGE_HASH_SIZE = 16
+
+
+class _BackupRestarted(Exception):
+    """Raised from the progress callback to stop a paged backup that keeps restarting"""
+
+
+def online_backup(source_path: str, target_path: str, logger, pages: int = BACKUP_PAGES,
+                  sleep_ms: int = BACKUP_SLEEP_MS) -> str:
+    """Copy a live database to target_path a few pages at a time
+    
+    Locks are released between steps, so the server keeps writing. SQLite
+    restarts the copy when another connection writes to the source; after
+    BACKUP_MAX_RESTARTS the copy is finished in a single step, which in WAL
+    mode only holds a read snapshot and does not block writers either.
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    last_remaining = None
+    restarts = 0
+    
+    def progress(status, remaining, total):
+        nonlocal last_remaining, restarts
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > BACKUP_MAX_RESTARTS:
+                raise _BackupRestarted()
+        last_remaining = remaining
+    
+    try:
+        start = time.perf_counter()
+        try:
+            source.backup(target, pages=pages, progress=progress, sleep=sleep_ms / 1000.0)
+        except _BackupRestarted:
+            logger.info(f"Backup of {source_path} restarted {restarts} times, finishing in one step")
+            source.backup(target)
+        
+        logger.debug(f"Copied {source_path} to {target_path} in {time.perf_counter() - start:.2f}s")
+        return target_path
+    finally:
+        target.close()
+        source.close()
+
+
+def _page_size(path: str) -> int:
+    """Read the page size from a database file header"""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    size = struct.unpack(">H", header[16:18])[0]
+    return 65536 if size == 1 else size
+
+
+def _page_hashes(path: str, page_size: int) -> List[bytes]:
+    """Hash every page of a database file"""
+    hashes = []
+    with open(path, "rb") as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            hashes.append(hashlib.blake2b(page, digest_size=PAGE_HASH_SIZE).digest())
+    return hashes
+
+
+def _chain_paths(backup_dir: str, base_name: str) -> Tuple[str, str]:
+    """Get the manifest and page hash files of a backup chain"""
+    stem = os.path.join(backup_dir, base_name[:-len(".db")])
+    return f"{stem}.chain.json", f"{stem}.hashes"
+
+
+def _read_hashes(path: str) -> List[bytes]:
+    """Read a page hash file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return [data[i:i + PAGE_HASH_SIZE] for i in range(0, len(data), PAGE_HASH_SIZE)]
+
+
+def _write_hashes(path: str, hashes: List[bytes]):
+    """Write a page hash file"""
+    with open(path, "wb") as f:
+        f.write(b"".join(hashes))
+
+
+def _unused_name(backup_dir: str, stem: str, extension: str) -> str:
+    """Get stem + extension, or stem_N + extension when that file already exists"""
+    name = f"{stem}{extension}"
+    sequence = 1
+    while os.path.exists(os.path.join(backup_dir, name)):
+        sequence += 1
+        name = f"{stem}_{sequence}{extension}"
+    return name
+
+
+def _chain_key(base_name: str) -> Tuple[str, int]:
+    """Get the (timestamp, sequence number) a chain's full backup file is ordered by"""
+    match = FULL_PATTERN.match(base_name)
+    return match.group(1), int(match.group(2)[1:]) if match.group(2) else 1
+
+
+def list_chains(backup_dir: str) -> List[str]:
+    """Get the full backup files of the chains in backup_dir, oldest first"""
+    if not os.path.isdir(backup_dir):
+        return []
+    return sorted((name for name in os.listdir(backup_dir) if FULL_PATTERN.match(name)), key=_chain_key)
+
+
+def _new_chain_name(backup_dir: str, timestamp: str) -> str:
+    """Name a new chain so it sorts after every remaining chain taken at the same time"""
+    sequence = max(
+        (number for stamp, number in map(_chain_key, list_chains(backup_dir)) if stamp == timestamp),
+        default=0
+    ) + 1
+    return f"{CHAIN_PREFIX}{timestamp}.db" if sequence == 1 else f"{CHAIN_PREFIX}{timestamp}_{sequence}.db"
+
+
+def _load_manifest(backup_dir: str, base_name: str) -> Optional[Dict[str, Any]]:
+    """Load a chain's manifest, or None for a plain full backup without one"""
+    manifest_path, hashes_path = _chain_paths(backup_dir, base_name)
+    if not os.path.exists(manifest_path) or not os.path.exists(hashes_path):
+        return None
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def _save_manifest(backup_dir: str, base_name: str, manifest: Dict[str, Any]):
+    """Write a chain's manifest"""
+    manifest_path, _ = _chain_paths(backup_dir, base_name)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def _write_increment(path: str, snapshot_path: str, page_size: int, changed: List[int],
+                     page_count: int, base_name: str):
+    """Write the changed pages of a snapshot as an increment file"""
+    header = json.dumps({
+        "base": base_name,
+        "page_size": page_size,
+        "page_count": page_count,
+        "pages": len(changed)
+    }).encode()
+    with open(snapshot_path, "rb") as snapshot, open(path + ".tmp", "wb") as out:
+        out.write(INCREMENT_MAGIC)
+        out.write(struct.pack(">I", len(header)))
+        out.write(header)
+        for page_no in changed:
+            snapshot.seek(page_no * page_size)
+            out.write(struct.pack(">I", page_no))
+            out.write(snapshot.read(page_size))
+    os.replace(path + ".tmp", path)
+
+
+def backup(db_path: str, backup_dir: str, logger, incremental: bool = False, full_every: int = 7,
+           keep_chains: int = 4) -> Dict[str, Any]:
+    """Back up a live database, optionally as a page increment on the latest full backup
+    
+    A full backup starts a new chain. An incremental backup stores only the
+    pages that changed since the previous backup in the chain; a new full
+    backup is taken instead when there is no chain yet, the page size changed
+    or the chain already has full_every increments. Only the newest
+    keep_chains chains are kept.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+    snapshot_path = os.path.join(backup_dir, f".snapshot_{timestamp}.db")
+    online_backup(db_path, snapshot_path, logger)
+    
+    try:
+        page_size = _page_size(snapshot_path)
+        hashes = _page_hashes(snapshot_path, page_size)
+        
+        chains = list_chains(backup_dir)
+        base_name = chains[-1] if chains else None
+        manifest = _load_manifest(backup_dir, base_name) if base_name else None
+        if incremental and manifest and manifest["page_size"] == page_size \
+                and len(manifest["increments"]) < full_every:
+            _, hashes_path = _chain_paths(backup_dir, base_name)
+            previous = _read_hashes(hashes_path)
+            changed = [
+                page_no for page_no, digest in enumerate(hashes)
+                if page_no >= len(previous) or previous[page_no] != digest
+            ]
+            
+            increment_name = _unused_name(backup_dir, f"{base_name[:-len('.db')]}.incr_{timestamp}", ".pages")
+            _write_increment(os.path.join(backup_dir, increment_name), snapshot_path, page_size,
+                             changed, len(hashes), base_name)
+            _write_hashes(hashes_path, hashes)
+            manifest["increments"].append(increment_name)
+            _save_manifest(backup_dir, base_name, manifest)
+            
+            logger.info(
+                f"Incremental backup {increment_name}: {len(changed)} of {len(hashes)} pages changed"
+            )
+            return {"type": "incremental", "path": os.path.join(backup_dir, increment_name),
+                    "pages": len(changed), "total_pages": len(hashes)}
+        
+        base_name = _new_chain_name(backup_dir, timestamp)
+        base_path = os.path.join(backup_dir, base_name)
+        os.replace(snapshot_path, base_path)
+        _, hashes_path = _chain_paths(backup_dir, base_name)
+        _write_hashes(hashes_path, hashes)
+        _save_manifest(backup_dir, base_name, {"page_size": page_size, "increments": []})
+        
+        logger.info(f"Full backup {base_path}: {len(hashes)} pages")
+        rotate_backups(backup_dir, keep_chains, logger)
+        return {"type": "full", "path": base_path, "pages": len(hashes), "total_pages": len(hashes)}
+    finally:
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+
+def rotate_backups(backup_dir: str, keep_chains: int, logger) -> int:
+    """Delete the oldest backup chains beyond keep_chains; returns the number removed"""
+    chains = list_chains(backup_dir)
+    expired = chains[:-keep_chains] if keep_chains > 0 else []
+    for base_name in expired:
+        stem = base_name[:-len(".db")]
+        for name in os.listdir(backup_dir):
+            if name == base_name or name.startswith(f"{stem}."):
+                os.remove(os.path.join(backup_dir, name))
+        logger.info(f"Removed expired backup chain {base_name}")
+    return len(expired)
+
+
+def _apply_increment(path: str, target, expected_base: str):
+    """Write an increment's pages into an open database file"""
+    with open(path, "rb") as f:
+        if f.read(len(INCREMENT_MAGIC)) != INCREMENT_MAGIC:
+            raise ValueError(f"{path} is not a backup increment")
+        header_length = struct.unpack(">I", f.read(4))[0]
+        header = json.loads(f.read(header_length))
+        if header["base"] != expected_base:
+            raise ValueError(f"{path} belongs to {header['base']}, not {expected_base}")
+        
+        page_size = header["page_size"]
+        for _ in range(header["pages"]):
+            page_no = struct.unpack(">I", f.read(4))[0]
+            target.seek(page_no * page_size)
+            target.write(f.read(page_size))
+        target.truncate(header["page_count"] * page_size)
+
+
+def restore_backup(backup_dir: str, output_path: str, logger, base_name: Optional[str] = None,
+                   upto: Optional[str] = None) -> str:
+    """Rebuild a database file from a full backup and its increments
+    
+    Uses the newest chain unless base_name is given, applying increments up
+    to and including upto (default: all of them).
+    """
+    chains = list_chains(backup_dir)
+    base_name = base_name or (chains[-1] if chains else None)
+    if not base_name or base_name not in chains:
+        raise FileNotFoundError(f"No full backup {base_name or ''} found in {backup_dir}")
+    
+    manifest = _load_manifest(backup_dir, base_name) or {"increments": []}
+    increments = manifest["increments"]
+    if upto:
+        if upto not in increments:
+            raise FileNotFoundError(f"Increment {upto} is not part of {base_name}")
+        increments = increments[:increments.index(upto) + 1]
+    
+    shutil.copyfile(os.path.join(backup_dir, base_name), output_path + ".tmp")
+    with open(output_path + ".tmp", "r+b") as target:
+        for increment in increments:
+            _apply_increment(os.path.join(backup_dir, increment), target, base_name)
+    
+    conn = sqlite3.connect(output_path + ".tmp")
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise sqlite3.DatabaseError(f"Restored database failed its integrity check: {result}")
+    
+    os.replace(output_path + ".tmp", output_path)
+    logger.info(f"Restored {base_name} with {len(increments)} increments to {output_path}")
+    return output_path
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class CatalogValidationError(ValueError):
+    """Raised when a games configuration fails validation"""
+
+
+def validate_catalog_config(config_data: Any) -> List[Dict[str, Any]]:
+    """Validate a parsed games configuration and return its game entries"""
+    if not isinstance(config_data, dict) or not isinstance(config_data.get('games'), list):
+        raise CatalogValidationError("Games configuration must be an object with a 'games' list")
+
+    problems = []
+    seen = set()
+    for index, game in enumerate(config_data['games']):
+        if not isinstance(game, dict):
+            problems.append(f"entry {index} is not an object")
+            continue
+
+        game_id = game.get('id')
+        label = f"game {game_id!r}" if game_id else f"entry {index}"
+        if not isinstance(game_id, str) or not game_id:
+            problems.append(f"{label} has no id")
+        elif game_id in seen:
+            problems.append(f"{label} is defined more than once")
+        seen.add(game_id)
+
+        if not isinstance(game.get('title'), str) or not game['title']:
+            problems.append(f"{label} has no title")
+
+        min_duration = game.get('min_duration_seconds', 300)
+        max_duration = game.get('max_duration_seconds', 1800)
+        if not isinstance(min_duration, int) or not isinstance(max_duration, int) \
+                or min_duration <= 0 or max_duration < min_duration:
+            problems.append(f"{label} has invalid session durations ({min_duration}, {max_duration})")
+
+    if problems:
+        raise CatalogValidationError("; ".join(problems))
+    return config_data['games']
+
+
+def load_catalog_config(config_path: str) -> List[Dict[str, Any]]:
+    """Read and validate a games configuration file"""
+    try:
+        with open(config_path, 'r') as f:
+            config_data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise CatalogValidationError(f"Invalid JSON in {config_path}: {e}") from e
+    return validate_catalog_config(config_data)
+
+
+class GameCatalog:
+    """Immutable snapshot of the game catalog
+
+    A new catalog is built for every reload and swapped in as a whole, so
+    readers always see one consistent version.
+    """
+
+    def __init__(self, games: Iterable[Mapping[str, Any]], version: int = 0):
+        self.version = version
+        self.games: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+            game['id']: MappingProxyType(dict(game)) for game in games
+        })
+        self.ordered: Tuple[Mapping[str, Any], ...] = tuple(
+            sorted(self.games.values(), key=lambda game: game.get('title') or '')
+        )
+
+    def get(self, game_id: str) -> Optional[Mapping[str, Any]]:
+        """Get a game record by ID"""
+        return self.games.get(game_id)
+
+    def list(self) -> Tuple[Mapping[str, Any], ...]:
+        """Get all game records ordered by title"""
+        return self.ordered
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self.games
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def to_client(self) -> List[Dict[str, Any]]:
+        """Get the catalog as sent to clients, without launch details"""
+        return [
+            {
+                "id": game['id'],
+                "title": game.get('title'),
+                "description": game.get('description'),
+                "imageUrl": game.get('image_url'),
+                "minDuration": game.get('min_duration_seconds'),
+                "maxDuration": game.get('max_duration_seconds')
+            }
+            for game in self.ordered
+        ]
+
+
+class CatalogWatcher:
+    """Polls the games configuration file and reports when it changes
+
+    The file's mtime and size are checked on the event loop; the change
+    callback is awaited after the file has been stable for one interval, so
+    a half-written file is not picked up.
+    """
+
+    def __init__(self, config_path: str, logger, interval: float = 2.0):
+        self.config_path = config_path
+        self.logger = logger
+        self.interval = interval
+        self.last_signature: Optional[Tuple[float, int]] = self._signature()
+
+    def _signature(self) -> Optional[Tuple[float, int]]:
+        """Get the file's mtime and size, or None when it does not exist"""
+        try:
+            stat = os.stat(self.config_path)
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+    async def run(self, on_change: Callable[[], Awaitable[Any]]):
+        """Watch the file until cancelled, awaiting on_change() after each change"""
+        pending: Optional[Tuple[float, int]] = None
+        while True:
+            await asyncio.sleep(self.interval)
+            signature = self._signature()
+            if signature is None or signature == self.last_signature:
+                pending = None
+                continue
+
+            if signature != pending:
+                pending = signature  # wait one more interval for the write to finish
+                continue
+
+            self.last_signature = signature
+            pending = None
+            self.logger.info(f"Games configuration {self.config_path} changed, reloading catalog")
+            try:
+                await on_change()
+            except Exception as e:
+                self.logger.exception(f"Error reloading game catalog: {e}")
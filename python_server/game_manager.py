@@ -1,10 +1,23 @@
-import json
-import logging
+import asyncio
 import os
-import subprocess
-import time
 import threading
-from typing import Dict, Any, Tuple, Optional, List
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, Mapping, Tuple, Optional, List
+
+import psutil
+
+from game_catalog import CatalogValidationError, GameCatalog, load_catalog_config
+from process_supervisor import ProcessSupervisor
+
+SUPERVISOR_CALL_TIMEOUT = 15  # seconds to wait for a spawn or terminate on the event loop
+# Process names of the VR runtime that must be alive before a game launches (empty disables the probe)
+VR_RUNTIME_PROCESSES = [
+    name.strip().lower() for name in os.getenv("VR_RUNTIME_PROCESSES", "vrserver").split(",") if name.strip()
+]
+PREWARM_READ_LIMIT = 16 * 1024 * 1024  # bytes of the executable read into the page cache when staging
+PREWARM_CHUNK_SIZE = 1024 * 1024
+STAGED_READINESS_MAX_AGE = 10.0  # seconds a staged readiness probe is trusted at launch
 
 class GameManager:
     """Manages VR games and their processes"""
@@ -14,12 +27,24 @@ class GameManager:
         self.config_path = config_path
         self.database = database
         self.current_game_id: Optional[str] = None
-        self.current_game_process: Optional[subprocess.Popen] = None
-        self.games_cache: Dict[str, Dict[str, Any]] = {}
+        self.current_game_pid: Optional[int] = None
+        self.games_cache: Dict[str, Mapping[str, Any]] = {}  # games launched since startup
+        self.catalog: GameCatalog = GameCatalog([])  # snapshot from the database's catalog cache
         self.status_callback: Optional[callable] = None
-        self.process_monitor_thread: Optional[threading.Thread] = None
-        self.process_monitor_running = False
+        self.exit_callback: Optional[Callable[[str, int, int], None]] = None
         self.game_launch_status = "idle"  # idle, launching, running, failed
+        self.state_lock = threading.RLock()  # launch/end run on worker threads, exits arrive on the event loop
+        self.last_launch_error: Optional[str] = None
+        
+        # Launch plan staged for the game on the selection screen
+        self.staged_launch: Optional[Dict[str, Any]] = None
+        self.launch_requested_at: Optional[float] = None
+        self.launch_timings: Dict[str, Dict[str, Any]] = {}
+        self.warmed_executables: Dict[str, int] = {}  # path -> mtime_ns when it was last pre-warmed
+        
+        # Game processes are spawned and watched on the event loop
+        self.supervisor = ProcessSupervisor(logger)
+        self.supervisor.set_exit_callback(self._on_process_exit)
         
         # Load game configurations from database
         self.load_games()
@@ -28,29 +53,187 @@ class GameManager:
         """Set callback for status updates"""
         self.status_callback = callback
     
+    def set_exit_callback(self, callback: Callable[[str, int, int], None]):
+        """Set callback(game_id, pid, return_code), called on the event loop when the current game exits"""
+        self.exit_callback = callback
+    
+    def set_event_loop(self, loop: asyncio.AbstractEventLoop):
+        """Set the event loop that supervises game processes"""
+        self.supervisor.bind(loop)
+    
     def load_games(self):
         """Load game configurations from database"""
         try:
-            games = self.database.get_games()
-            self.games_cache = {game['id']: game for game in games}
-            self.logger.info(f"Loaded {len(self.games_cache)} games from database")
+            self.catalog = self.database.get_catalog()
+            self.logger.info(f"Loaded {len(self.catalog)} games from database (catalog version {self.catalog.version})")
         except Exception as e:
             self.logger.exception(f"Error loading game configurations: {e}")
     
-    def launch_game(self, game_id: str) -> Tuple[bool, Dict[str, Any]]:
-        """Launch a game by ID"""
-        # End any currently running game first
-        if self.is_game_running():
-            self.end_game()
+    def reload_catalog(self) -> Tuple[bool, Dict[str, Any]]:
+        """Validate the games config, import it and swap in the new catalog
         
-        self.game_launch_status = "launching"
+        An invalid file leaves the database and the current catalog untouched.
+        Running games and sessions are not affected.
+        """
+        try:
+            games = load_catalog_config(self.config_path)
+        except (CatalogValidationError, OSError) as e:
+            self.logger.error(f"Rejected games configuration {self.config_path}: {e}")
+            return False, {"error": str(e)}
         
+        if not self.database.import_games(self.config_path):
+            return False, {"error": "Failed to import games configuration"}
+        
+        self.load_games()
+        self.logger.info(f"Game catalog reloaded: {len(games)} games, version {self.catalog.version}")
+        return True, {"version": self.catalog.version, "games": len(self.catalog)}
+    
+    def _build_launch_plan(self, game: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve the command line and working directory for a game"""
+        executable = game.get('executable_path', '') or ''
+        working_dir = game.get('working_directory', '') or ''
+        arguments = game.get('arguments', '') or ''
+        
+        # Build command with arguments if provided
+        command = [executable]
+        if arguments:
+            command.extend(arguments.split())
+        
+        return {
+            "game_id": game['id'],
+            "executable": executable,
+            "working_dir": working_dir,
+            "command": command
+        }
+    
+    def check_runtime(self) -> Tuple[bool, List[str]]:
+        """Check that the VR runtime processes are alive; returns (ready, missing names)"""
+        if not VR_RUNTIME_PROCESSES:
+            return True, []
+        
+        running = set()
+        for proc in psutil.process_iter(['name']):
+            name = (proc.info.get('name') or '').lower()
+            running.add(name[:-4] if name.endswith('.exe') else name)
+        
+        missing = [name for name in VR_RUNTIME_PROCESSES if name not in running]
+        return not missing, missing
+    
+    def check_readiness(self, game: Dict[str, Any], plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Probe whether a game can launch: executable, working directory and VR runtime"""
+        plan = plan or self._build_launch_plan(game)
+        executable = plan["executable"]
+        working_dir = plan["working_dir"]
+        issues = []
+        
+        if not os.path.isfile(executable):
+            # Missing executables run in demo mode, which needs no runtime
+            return {"ready": True, "demo_mode": True, "executable": False, "runtime": None, "issues": []}
+        
+        if not os.access(executable, os.X_OK):
+            issues.append(f"Game executable is not executable: {executable}")
+        if working_dir and not os.path.isdir(working_dir):
+            issues.append(f"Working directory not found: {working_dir}")
+        
+        runtime_ready, missing = self.check_runtime()
+        if not runtime_ready:
+            issues.append(f"VR runtime not running (missing: {', '.join(missing)})")
+        
+        return {
+            "ready": not issues,
+            "demo_mode": False,
+            "executable": True,
+            "runtime": runtime_ready,
+            "issues": issues
+        }
+    
+    def _warm_executable(self, path: str) -> int:
+        """Read the start of the executable into the page cache, once per version of the file"""
+        mtime_ns = os.stat(path).st_mtime_ns
+        if self.warmed_executables.get(path) == mtime_ns:
+            return 0
+        
+        warmed = 0
+        with open(path, 'rb') as f:
+            while warmed < PREWARM_READ_LIMIT:
+                chunk = f.read(PREWARM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                warmed += len(chunk)
+        self.warmed_executables[path] = mtime_ns
+        return warmed
+    
+    def prepare_game(self, game_id: str) -> Tuple[bool, Dict[str, Any]]:
+        """Stage the launch plan for a game shown on the selection screen and probe readiness"""
         game = self.database.get_game(game_id)
         if not game:
             self.logger.error(f"Game ID {game_id} not found")
-            self.game_launch_status = "failed"
             return False, {}
         
+        self.games_cache[game_id] = game
+        plan = self._build_launch_plan(game)
+        readiness = self.check_readiness(game, plan)
+        
+        warmed = 0
+        if readiness["executable"]:
+            try:
+                warmed = self._warm_executable(plan["executable"])
+            except OSError as e:
+                self.logger.warning(f"Could not pre-warm {plan['executable']}: {e}")
+        
+        plan["staged_at"] = time.monotonic()
+        plan["readiness"] = readiness
+        self.staged_launch = plan
+        
+        if readiness["issues"]:
+            self.logger.warning(f"Game {game['title']} is not ready to launch: {'; '.join(readiness['issues'])}")
+        else:
+            self.logger.info(f"Staged launch for {game['title']} ({warmed} bytes pre-warmed)")
+        
+        return True, {**readiness, "prewarmed_bytes": warmed}
+    
+    def launch_game(self, game_id: str) -> Tuple[bool, Dict[str, Any]]:
+        """Launch a game by ID
+        
+        The readiness probe runs before anything is started, so a missing VR
+        runtime fails the launch instead of the session. On failure the result
+        dict carries an ``error`` message.
+        """
+        self.launch_requested_at = time.monotonic()
+        
+        game = self.database.get_game(game_id)
+        if not game:
+            self.logger.error(f"Game ID {game_id} not found")
+            self.last_launch_error = f"Game ID {game_id} not found"
+            return False, {"error": self.last_launch_error}
+        
+        # Reuse the plan staged from the selection screen when it still matches,
+        # and its readiness probe when it passed recently
+        plan = self._build_launch_plan(game)
+        readiness = None
+        staged = self.staged_launch
+        if staged and staged["game_id"] == game_id and staged["command"] == plan["command"] \
+                and staged["working_dir"] == plan["working_dir"]:
+            plan = staged
+            if staged["readiness"]["ready"] and time.monotonic() - staged["staged_at"] < STAGED_READINESS_MAX_AGE:
+                readiness = staged["readiness"]
+            self.logger.info(f"Using staged launch for {game['title']}")
+        self.staged_launch = None
+        
+        if readiness is None:
+            readiness = self.check_readiness(game, plan)
+        if not readiness["ready"]:
+            self.last_launch_error = "; ".join(readiness["issues"])
+            self.logger.error(f"Game {game['title']} is not ready to launch: {self.last_launch_error}")
+            return False, {"error": self.last_launch_error}
+        
+        # End any currently running game first
+        if self.is_game_running():
+            self.end_game()
+        
+        self.game_launch_status = "launching"
+        self.last_launch_error = None
+        
         # Cache the game data
         self.games_cache[game_id] = game
         
@@ -61,33 +244,29 @@ class GameManager:
             self.status_callback()
         
         try:
-            executable = game.get('executable_path', '')
-            working_dir = game.get('working_directory', '')
-            arguments = game.get('arguments', '')
-            
-            if os.path.exists(executable):
-                # Build command with arguments if provided
-                command = [executable]
-                if arguments:
-                    command.extend(arguments.split())
+            if not readiness["demo_mode"]:
+                command = plan["command"]
                 
-                # Launch the game process
+                # Launch the game process on the event loop
                 self.logger.info(f"Executing: {' '.join(command)}")
-                self.current_game_process = subprocess.Popen(
-                    command,
-                    cwd=working_dir if working_dir else None,
-                    shell=True,
-                    stdin=subprocess.DEVNULL,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    start_new_session=True
+                pid = self.supervisor.call(
+                    self.supervisor.spawn(game_id, command, plan["working_dir"]),
+                    SUPERVISOR_CALL_TIMEOUT
                 )
-                self.logger.info(f"Game process started with PID: {self.current_game_process.pid}")
+                self._record_launch_timing(game_id, "spawn_ms")
+                self.logger.info(f"Game process started with PID: {pid}")
                 
-                # Start monitoring the process
-                self.current_game_id = game_id
-                self.game_launch_status = "running"
-                self._start_process_monitor()
+                # The supervisor reports the exit through _on_process_exit
+                with self.state_lock:
+                    self.current_game_id = game_id
+                    self.current_game_pid = pid
+                    self.game_launch_status = "running"
+                    if self.supervisor.get_pid() != pid:
+                        # Exited before the state was recorded; the exit callback ignored it
+                        self.logger.warning(f"Game process {pid} exited immediately after launch")
+                        self.current_game_id = None
+                        self.current_game_pid = None
+                        self.game_launch_status = "idle"
                 
                 # Notify clients immediately
                 if self.status_callback:
@@ -96,7 +275,7 @@ class GameManager:
                 return True, game
             else:
                 # For testing when executable doesn't exist - enter demo mode
-                self.logger.warning(f"Game executable not found: {executable}")
+                self.logger.warning(f"Game executable not found: {plan['executable']}")
                 self.logger.info("Entering demo mode - session will continue without actual game")
                 
                 self.current_game_id = game_id
@@ -107,91 +286,85 @@ class GameManager:
                     self.status_callback()
                 
                 return True, {**game, 'demo_mode': True}
-            
+        
         except Exception as e:
             self.logger.exception(f"Error launching game {game_id}: {e}")
             self.game_launch_status = "failed"
+            self.last_launch_error = str(e)
             if self.status_callback:
                 self.status_callback()
-            return False, {}
+            return False, {"error": self.last_launch_error}
     
-    def _start_process_monitor(self):
-        """Start monitoring the game process in a separate thread"""
-        if self.process_monitor_thread and self.process_monitor_thread.is_alive():
-            self.process_monitor_running = False
-            self.process_monitor_thread.join(timeout=1)
-        
-        self.process_monitor_running = True
-        self.process_monitor_thread = threading.Thread(target=self._monitor_process, daemon=True)
-        self.process_monitor_thread.start()
+    def _record_launch_timing(self, game_id: str, key: str) -> Optional[float]:
+        """Record milliseconds since the launch was requested under the given key"""
+        if self.launch_requested_at is None:
+            return None
+        
+        elapsed_ms = round((time.monotonic() - self.launch_requested_at) * 1000, 1)
+        timings = self.launch_timings.setdefault(game_id, {"first_frame_samples": 0, "avg_first_frame_ms": None})
+        timings[f"last_{key}"] = elapsed_ms
+        
+        if key == "first_frame_ms":
+            samples = timings["first_frame_samples"]
+            average = timings["avg_first_frame_ms"] or 0.0
+            timings["avg_first_frame_ms"] = round((average * samples + elapsed_ms) / (samples + 1), 1)
+            timings["first_frame_samples"] = samples + 1
+            timings["last_first_frame_at"] = datetime.now().isoformat()
+        
+        return elapsed_ms
     
-    def _monitor_process(self):
-        """Monitor the game process and notify on exit"""
-        while self.process_monitor_running and self.current_game_process:
-            try:
-                # Check if process is still running
-                return_code = self.current_game_process.poll()
-                
-                if return_code is not None:
-                    # Process has exited
-                    self.logger.info(f"Game process exited with code {return_code}")
-                    
-                    # Check for common VR runtime errors
-                    if return_code == 53:
-                        self.logger.warning("Exit code 53: VR runtime not available (SteamVR may not be running)")
-                    
-                    # Clean up
-                    self.current_game_process = None
-                    
-                    # Notify clients of process exit
-                    if self.status_callback:
-                        self.status_callback()
-                    
-                    break
-                
-                # Sleep for a short interval before checking again
-                time.sleep(0.5)
-                
-            except Exception as e:
-                self.logger.exception(f"Error monitoring game process: {e}")
-                break
+    def record_first_frame(self, game_id: str) -> Optional[float]:
+        """Record time-to-first-frame for the running game; returns milliseconds or None"""
+        with self.state_lock:
+            if game_id != self.current_game_id or self.launch_requested_at is None:
+                return None
+            elapsed_ms = self._record_launch_timing(game_id, "first_frame_ms")
+            self.launch_requested_at = None  # one sample per launch
         
-        self.process_monitor_running = False
+        game_title = self.games_cache.get(game_id, {}).get('title', game_id)
+        self.logger.info(f"First frame of {game_title} after {elapsed_ms}ms")
+        return elapsed_ms
+    
+    def _on_process_exit(self, game_id: str, pid: int, return_code: int):
+        """Handle a game process exit reported by the supervisor"""
+        # Check for common VR runtime errors
+        if return_code == 53:
+            self.logger.warning("Exit code 53: VR runtime not available (SteamVR may not be running)")
+        
+        with self.state_lock:
+            if self.current_game_pid != pid:
+                return  # An older process, already replaced or ended
+            self.current_game_id = None
+            self.current_game_pid = None
+            self.game_launch_status = "idle"
+        
+        if self.exit_callback:
+            self.exit_callback(game_id, pid, return_code)
+        
+        # Notify clients of process exit
+        if self.status_callback:
+            self.status_callback()
     
     def end_game(self) -> bool:
         """End the current game"""
         if not self.current_game_id:
             return False
-            
+        
         game_title = self.games_cache.get(self.current_game_id, {}).get('title', 'Unknown Game')
         self.logger.info(f"Ending game: {game_title}")
         
-        # Stop process monitoring
-        self.process_monitor_running = False
-        
         # Terminate the process if it exists
-        if self.current_game_process:
+        if self.current_game_pid is not None:
             try:
-                # Try to terminate the process gracefully first
-                self.current_game_process.terminate()
-                try:
-                    # Give it 5 seconds to terminate
-                    self.current_game_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    # If it doesn't terminate, kill it
-                    self.logger.warning("Game process did not terminate gracefully, killing it")
-                    self.current_game_process.kill()
-                    try:
-                        self.current_game_process.wait(timeout=2)
-                    except subprocess.TimeoutExpired:
-                        self.logger.error("Failed to kill game process")
+                self.supervisor.call(self.supervisor.terminate(timeout=5, kill_timeout=2), SUPERVISOR_CALL_TIMEOUT)
             except Exception as e:
                 self.logger.exception(f"Error terminating game process: {e}")
         
         # Reset game state
-        self.current_game_id = None
-        self.current_game_process = None
-        self.game_launch_status = "idle"
+        with self.state_lock:
+            self.current_game_id = None
+            self.current_game_pid = None
+            self.game_launch_status = "idle"
         
         # Notify clients
         if self.status_callback:
@@ -201,30 +374,13 @@ class GameManager:
     
     def is_game_running(self) -> bool:
         """Check if a game is currently running"""
-        # If we have a process, check if it's still running
-        if self.current_game_process:
-            return_code = self.current_game_process.poll()
-            # If return_code is None, the process is still running
-            if return_code is not None:
-                # Process has exited, clean up
-                self.logger.info(f"Game process exited with code {return_code}")
-                self.current_game_process = None
-                self.game_launch_status = "idle"
-                if not self.current_game_id:  # Don't clear if we're in demo mode
-                    self.current_game_id = None
-                    
-                # Notify clients of status change
-                if self.status_callback:
-                    self.status_callback()
-                return False
-        
-        # Return True if we have a game ID and status is running
+        # Process exits are reported by the supervisor, so the state is always current
         return self.current_game_id is not None and self.game_launch_status == "running"
     
     def is_demo_mode(self) -> bool:
         """Check if we're running in demo mode (game ID set but no process)"""
         return (self.current_game_id is not None and 
-                self.current_game_process is None and 
+                self.current_game_pid is None and 
                 self.game_launch_status == "running")
     
     def get_current_game_id(self) -> Optional[str]:
@@ -235,14 +391,14 @@ class GameManager:
         """Get the title of the currently running game"""
         if not self.is_game_running() or not self.current_game_id:
             return None
-            
+        
         game = self.games_cache.get(self.current_game_id)
         if not game:
             # Try to load from database if not in cache
             game = self.database.get_game(self.current_game_id)
             if game:
                 self.games_cache[self.current_game_id] = game
-                
+        
         return game.get('title', 'Unknown Game') if game else None
     
     def get_status(self) -> Dict[str, Any]:
@@ -252,10 +408,26 @@ class GameManager:
             "demo_mode": self.is_demo_mode(),
             "current_game": self.get_current_game_title(),
             "game_id": self.current_game_id,
-            "process_running": self.current_game_process is not None and self.current_game_process.poll() is None,
-            "launch_status": self.game_launch_status
+            "process_running": self.current_game_pid is not None and self.supervisor.is_running(),
+            "launch_status": self.game_launch_status,
+            "last_launch_error": self.last_launch_error
         }
     
+    def get_current_pid(self) -> Optional[int]:
+        """Get the PID of the running game process"""
+        return self.current_game_pid
+    
+    def get_process_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get launch time, exit code, run duration, restart count and launch latency per game"""
+        stats = self.supervisor.get_stats()
+        for game_id, timings in self.launch_timings.items():
+            stats.setdefault(game_id, {}).update(timings)
+        return stats
+    
     def get_available_games(self) -> List[Dict[str, Any]]:
         """Get all available games"""
-        return list(self.database.get_games())
+        return [dict(game) for game in self.catalog.list()]
+    
+    def get_catalog(self) -> GameCatalog:
+        """Get the current catalog snapshot"""
+        return self.catalog
@@ -0,0 +1,90 @@
+import json
+from typing import Any, Dict, Optional, Union
+
+# Binary encodings are optional; the server only offers the ones that are installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class MessageDecodeError(ValueError):
+    """Raised when a received frame cannot be decoded"""
+
+
+class JsonCodec:
+    """Default text codec using JSON"""
+
+    name = "json"
+    subprotocol = "vr-json"
+
+    def encode(self, message: Dict[str, Any]) -> str:
+        return json.dumps(message)
+
+    def decode(self, frame: Union[str, bytes]) -> Any:
+        try:
+            return json.loads(frame)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise MessageDecodeError(str(e)) from e
+
+
+class MessagePackCodec:
+    """Binary codec using MessagePack"""
+
+    name = "msgpack"
+    subprotocol = "vr-msgpack"
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, frame: Union[str, bytes]) -> Any:
+        if isinstance(frame, str):
+            raise MessageDecodeError("Expected a binary frame")
+        try:
+            return msgpack.unpackb(frame, raw=False)
+        except Exception as e:
+            raise MessageDecodeError(str(e)) from e
+
+
+class CborCodec:
+    """Binary codec using CBOR"""
+
+    name = "cbor"
+    subprotocol = "vr-cbor"
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return cbor2.dumps(message)
+
+    def decode(self, frame: Union[str, bytes]) -> Any:
+        if isinstance(frame, str):
+            raise MessageDecodeError("Expected a binary frame")
+        try:
+            return cbor2.loads(frame)
+        except Exception as e:
+            raise MessageDecodeError(str(e)) from e
+
+
+JSON_CODEC = JsonCodec()
+
+
+def get_available_codecs() -> Dict[str, Any]:
+    """Get the installed codecs keyed by WebSocket subprotocol, in order of preference"""
+    codecs = {}
+    if msgpack is not None:
+        codecs[MessagePackCodec.subprotocol] = MessagePackCodec()
+    if cbor2 is not None:
+        codecs[CborCodec.subprotocol] = CborCodec()
+    codecs[JsonCodec.subprotocol] = JSON_CODEC
+    return codecs
+
+
+def get_codec(subprotocol: Optional[str], codecs: Optional[Dict[str, Any]] = None):
+    """Get the codec for a negotiated subprotocol, falling back to JSON"""
+    if codecs is None:
+        codecs = get_available_codecs()
+    return codecs.get(subprotocol, JSON_CODEC) if subprotocol else JSON_CODEC
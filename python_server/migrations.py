@@ -0,0 +1,152 @@
+import sqlite3
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+
+def _table_exists(cursor: sqlite3.Cursor, table: str) -> bool:
+    """Check whether a table exists"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+
+def _columns(cursor: sqlite3.Cursor, table: str) -> Set[str]:
+    """Get the column names of a table"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _add_rfid_tables(cursor: sqlite3.Cursor):
+    """Bring the RFID tables up to the schema RFIDHandler expects"""
+    # Older server databases created rfid_cards without these columns
+    columns = _columns(cursor, "rfid_cards")
+    if "permission_level" not in columns:
+        cursor.execute("ALTER TABLE rfid_cards ADD COLUMN permission_level TEXT DEFAULT 'user'")
+    if "updated_at" not in columns:
+        cursor.execute("ALTER TABLE rfid_cards ADD COLUMN updated_at TIMESTAMP")
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rfid_access_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tag_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            success BOOLEAN NOT NULL,
+            details TEXT,
+            FOREIGN KEY (tag_id) REFERENCES rfid_cards (tag_id)
+        )
+    """)
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rfid_game_permissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tag_id TEXT NOT NULL,
+            game_id TEXT NOT NULL,
+            permission_type TEXT NOT NULL DEFAULT 'allow',
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(tag_id, game_id),
+            FOREIGN KEY (tag_id) REFERENCES rfid_cards (tag_id)
+        )
+    """)
+
+
+def _add_history_indexes(cursor: sqlite3.Cursor):
+    """Index the per-card history lookups so they stop scanning the logs"""
+    # Equality on the tag then the sort key, so ORDER BY ... DESC LIMIT reads the index backwards
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_rfid_tag_start_time ON sessions (rfid_tag, start_time)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_rfid_access_log_tag_timestamp ON rfid_access_log (tag_id, timestamp)")
+    
+    if _table_exists(cursor, "session_resource_usage"):
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_session_resource_usage_game ON session_resource_usage (game_id)")
+
+
+def _add_game_content_hash(cursor: sqlite3.Cursor):
+    """Store a hash of each imported game record so unchanged games are not rewritten"""
+    if _table_exists(cursor, "games") and "content_hash" not in _columns(cursor, "games"):
+        cursor.execute("ALTER TABLE games ADD COLUMN content_hash TEXT")
+
+
+# Ordered schema migrations: (version, description, migration function).
+# The database's PRAGMA user_version records the last one applied.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "add RFID card columns and tables", _add_rfid_tables),
+    (2, "index session and RFID access history", _add_history_indexes),
+    (3, "add game content hash for incremental imports", _add_game_content_hash),
+]
+
+# Queries on hot paths that must be served by an index: name -> (sql, sample params)
+HOT_QUERIES: Dict[str, Tuple[str, Tuple[Any, ...]]] = {
+    "card_session_history": (
+        "SELECT * FROM sessions WHERE rfid_tag = ? ORDER BY start_time DESC LIMIT ?",
+        ("", 10)
+    ),
+    "card_access_history": (
+        "SELECT * FROM rfid_access_log WHERE tag_id = ? ORDER BY timestamp DESC LIMIT ?",
+        ("", 10)
+    ),
+    "validate_rfid": (
+        "SELECT * FROM rfid_cards WHERE tag_id = ? AND status = 'active'",
+        ("",)
+    ),
+    "game_permission": (
+        "SELECT permission_type FROM rfid_game_permissions WHERE tag_id = ? AND game_id = ?",
+        ("", "")
+    ),
+    "get_game": (
+        "SELECT * FROM games WHERE id = ?",
+        ("",)
+    ),
+}
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection, logger) -> int:
+    """Apply pending migrations, each in its own transaction; returns the schema version"""
+    if conn.in_transaction:
+        conn.commit()
+    
+    version = get_schema_version(conn)
+    for target, description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            migrate(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(target)}")
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Schema migration {target} ({description}) failed: {e}")
+            raise
+        
+        logger.info(f"Applied schema migration {target}: {description}")
+        version = target
+    
+    return version
+
+
+def audit_query_plans(conn: sqlite3.Connection, logger) -> List[Dict[str, Any]]:
+    """Run EXPLAIN QUERY PLAN on the hot queries and warn about table scans and sorts"""
+    findings = []
+    for name, (sql, params) in HOT_QUERIES.items():
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Skipping query plan check for {name}: {e}")
+            continue
+        
+        # "SCAN t" is a full table scan; "SCAN t USING INDEX" walks an index in order
+        problems = [
+            step for step in plan
+            if (step.upper().startswith("SCAN ") and " USING " not in step.upper())
+            or "TEMP B-TREE" in step.upper()
+        ]
+        if problems:
+            logger.warning(f"Query {name} is not served by an index: {'; '.join(problems)}")
+        findings.append({"query": name, "plan": plan, "indexed": not problems})
+    
+    return findings
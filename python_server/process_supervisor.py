@@ -0,0 +1,157 @@
+import asyncio
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+
+class ProcessSupervisor:
+    """Runs game processes on the event loop and reports their exit immediately
+    
+    Exits are delivered by asyncio's child watcher as soon as the process ends,
+    so no thread has to poll the process. Per-game run statistics (launch time,
+    exit code, run duration and restart count) are kept for diagnostics. A
+    restart is a launch that follows a crash, i.e. an exit with a non-zero code
+    that terminate() did not ask for.
+    """
+    
+    def __init__(self, logger):
+        self.logger = logger
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.game_id: Optional[str] = None
+        self.exit_callback: Optional[Callable[[str, int, int], None]] = None
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.waiters: Dict[int, asyncio.Task] = {}
+        self.stopping: Set[int] = set()  # PIDs terminate() was asked to stop
+    
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the supervisor to the event loop that owns the child processes"""
+        self.loop = loop
+    
+    def set_exit_callback(self, callback: Callable[[str, int, int], None]):
+        """Set callback(game_id, pid, return_code), called on the event loop when a process exits"""
+        self.exit_callback = callback
+    
+    def call(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a supervisor coroutine from a worker thread and wait for its result"""
+        if self.loop is None or self.loop.is_closed():
+            coro.close()
+            raise RuntimeError("Process supervisor is not bound to a running event loop")
+        if self._on_loop_thread():
+            coro.close()
+            raise RuntimeError("Blocking supervisor calls must not run on the event loop thread")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+    
+    def _on_loop_thread(self) -> bool:
+        """Check whether the caller is running on the supervisor's event loop"""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+    
+    async def spawn(self, game_id: str, command: List[str], cwd: Optional[str] = None) -> int:
+        """Start a game process and begin waiting for its exit; returns the PID"""
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd or None,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        
+        self.process = process
+        self.game_id = game_id
+        
+        stats = self.stats.setdefault(game_id, {
+            "launches": 0,
+            "restarts": 0,
+            "crashes": 0,
+            "crashed": False,  # the last run crashed, so the next launch is a restart
+            "last_launch_at": None,
+            "last_exit_code": None,
+            "last_run_seconds": None,
+            "total_run_seconds": 0.0
+        })
+        stats["launches"] += 1
+        if stats["crashed"]:
+            stats["restarts"] += 1
+            stats["crashed"] = False
+        stats["last_launch_at"] = datetime.now().isoformat()
+        
+        self.waiters[process.pid] = asyncio.create_task(
+            self._wait_for_exit(game_id, process, time.monotonic())
+        )
+        return process.pid
+    
+    async def _wait_for_exit(self, game_id: str, process: asyncio.subprocess.Process, started: float):
+        """Wait for a process to exit and record its run statistics"""
+        try:
+            return_code = await process.wait()
+        except asyncio.CancelledError:
+            return
+        finally:
+            self.waiters.pop(process.pid, None)
+        
+        requested = process.pid in self.stopping
+        self.stopping.discard(process.pid)
+        run_seconds = time.monotonic() - started
+        stats = self.stats[game_id]
+        stats["last_exit_code"] = return_code
+        if return_code != 0 and not requested:
+            stats["crashes"] += 1
+            stats["crashed"] = True
+        stats["last_run_seconds"] = round(run_seconds, 3)
+        stats["total_run_seconds"] = round(stats["total_run_seconds"] + run_seconds, 3)
+        
+        self.logger.info(f"Game process {process.pid} exited with code {return_code} after {run_seconds:.1f}s")
+        
+        if self.process is process:
+            self.process = None
+            self.game_id = None
+        
+        if self.exit_callback:
+            try:
+                self.exit_callback(game_id, process.pid, return_code)
+            except Exception as e:
+                self.logger.exception(f"Error in process exit callback: {e}")
+    
+    async def terminate(self, timeout: float = 5.0, kill_timeout: float = 2.0) -> bool:
+        """Terminate the current process, killing it if it does not exit in time"""
+        process = self.process
+        if process is None or process.returncode is not None:
+            return False
+        
+        self.stopping.add(process.pid)
+        try:
+            process.terminate()
+            # Give it time to terminate gracefully
+            await asyncio.wait_for(process.wait(), timeout)
+        except ProcessLookupError:
+            pass
+        except asyncio.TimeoutError:
+            # If it doesn't terminate, kill it
+            self.logger.warning("Game process did not terminate gracefully, killing it")
+            try:
+                process.kill()
+                await asyncio.wait_for(process.wait(), kill_timeout)
+            except ProcessLookupError:
+                pass
+            except asyncio.TimeoutError:
+                self.logger.error("Failed to kill game process")
+                return False
+        
+        return True
+    
+    def is_running(self) -> bool:
+        """Check if the supervised process is still running"""
+        return self.process is not None and self.process.returncode is None
+    
+    def get_pid(self) -> Optional[int]:
+        """Get the PID of the running process"""
+        return self.process.pid if self.is_running() else None
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get run statistics for every game launched since startup"""
+        return {game_id: dict(stats) for game_id, stats in self.stats.items()}
@@ -2,82 +2,130 @@
 #!/usr/bin/env python3
 import logging
 import threading
-import time
 import bcrypt
 import jwt
 import os
-from typing import Optional, Callable, Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Optional, Callable, Dict, Any, Iterable, List, Mapping
+from datetime import datetime, timedelta, timezone
+
+from rfid_index import RFIDCardIndex
+from rfid_provisioning import provision_cards
+from rfid_reader import ReaderDriver, TagDebouncer, create_driver
+from token_cache import TokenCache
+
+# Access log rows carry the tap time, since queued rows are written a little later
+ACCESS_LOG_SQL = """
+    INSERT INTO rfid_access_log (tag_id, action, success, details, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+"""
 
 class RFIDHandler:
     """
     Handles RFID card detection and management with enhanced robustness and security.
     """
     
-    def __init__(self, database, logger):
+    def __init__(self, database, logger, driver: Optional[ReaderDriver] = None):
         self.database = database
         self.logger = logger
         self.running = False
         self.reader_thread: Optional[threading.Thread] = None
+        self.driver = driver if driver is not None else create_driver(os.getenv("RFID_READER", ""), logger)
+        self.debouncer = TagDebouncer(int(os.getenv("RFID_DEBOUNCE_MS", "1000")))
+        self._stop_event = threading.Event()
         self.callback: Optional[Callable[[str], None]] = None
         self.last_read_tag: Optional[str] = None
         self.last_read_time = None
         self.read_count = 0
         self.jwt_secret = os.getenv("RFID_JWT_SECRET", os.urandom(32).hex())
         self.token_expiry = int(os.getenv("RFID_TOKEN_EXPIRY", "3600"))  # 1 hour default
+        self.token_cache = TokenCache(int(os.getenv("RFID_TOKEN_CACHE_SIZE", "1024")))  # 0 disables
         self._setup_database()
         
+        # Taps and permission checks are answered from memory
+        self.card_index = RFIDCardIndex(logger)
+        self.card_index.load(database)
+        
+        # Cards changed by another process, e.g. admin_utility, are reloaded in the background
+        database.add_change_callback(self.reload_card_index)
+        
     def _setup_database(self):
         """Ensure database tables exist for RFID operations"""
         try:
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            
-            # Create RFID cards table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS rfid_cards (
-                    tag_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    status TEXT NOT NULL DEFAULT 'active',
-                    permission_level TEXT DEFAULT 'user',
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    last_used_at TIMESTAMP
-                )
-            """)
-            
-            # Create RFID access log table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS rfid_access_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tag_id TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    success BOOLEAN NOT NULL,
-                    details TEXT,
-                    FOREIGN KEY (tag_id) REFERENCES rfid_cards (tag_id)
-                )
-            """)
-            
-            # Create game permissions table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS rfid_game_permissions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tag_id TEXT NOT NULL,
-                    game_id TEXT NOT NULL,
-                    permission_type TEXT NOT NULL DEFAULT 'allow',
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(tag_id, game_id),
-                    FOREIGN KEY (tag_id) REFERENCES rfid_cards (tag_id)
-                )
-            """)
-            
-            conn.commit()
-            self.logger.info("RFID database tables initialized successfully")
+            with self.database.writer() as conn:
+                cursor = conn.cursor()
+                
+                # Create RFID cards table if not exists
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS rfid_cards (
+                        tag_id TEXT PRIMARY KEY,
+                        name TEXT,
+                        status TEXT NOT NULL DEFAULT 'active',
+                        permission_level TEXT DEFAULT 'user',
+                        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        last_used_at TIMESTAMP
+                    )
+                """)
+                
+                # Create RFID access log table if not exists
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS rfid_access_log (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        tag_id TEXT NOT NULL,
+                        action TEXT NOT NULL,
+                        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        success BOOLEAN NOT NULL,
+                        details TEXT,
+                        FOREIGN KEY (tag_id) REFERENCES rfid_cards (tag_id)
+                    )
+                """)
+                
+                # Create game permissions table if not exists
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS rfid_game_permissions (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        tag_id TEXT NOT NULL,
+                        game_id TEXT NOT NULL,
+                        permission_type TEXT NOT NULL DEFAULT 'allow',
+                        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(tag_id, game_id),
+                        FOREIGN KEY (tag_id) REFERENCES rfid_cards (tag_id)
+                    )
+                """)
+                
+                self.logger.info("RFID database tables initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize RFID database tables: {e}")
             raise
             
+    def reload_card_index(self):
+        """Reload the card index, e.g. after cards were changed outside the server"""
+        self.card_index.load(self.database)
+        self.token_cache.clear()  # cards may have been deactivated
+    
+    def _get_card(self, tag_id: str) -> Optional[Mapping[str, Any]]:
+        """Get a card from the index, falling back to the database for tags it does not hold"""
+        card = self.card_index.get(tag_id)
+        if card is None and not self.card_index.is_missing(tag_id):
+            card = self.card_index.load_card(self.database, tag_id)
+        return card
+    
+    def _get_active_card(self, tag_id: str) -> Optional[Mapping[str, Any]]:
+        """Get a card only if it is active"""
+        card = self._get_card(tag_id)
+        return card if card is not None and card["status"] == "active" else None
+            
+    def _db_timestamp(self) -> str:
+        """Current UTC time in the format of SQLite's CURRENT_TIMESTAMP"""
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    
+    def _write_behind(self, sql: str, params: tuple):
+        """Queue a log write, writing it directly when the queue pushes back"""
+        if not self.database.enqueue_write(sql, params):
+            self.logger.warning("Write-behind queue full, writing access log directly")
+            with self.database.writer() as conn:
+                conn.execute(sql, params)
+            
     def start(self, callback: Callable[[str], None] = None):
         """Start the RFID reader with enhanced error handling"""
         if self.running:
@@ -86,6 +134,13 @@ class RFIDHandler:
             
         try:
             self.callback = callback
+            if self.driver is None:
+                self.running = True
+                self.logger.info("No RFID reader configured, tags arrive through simulate_tag_read")
+                return
+            
+            self.driver.open()
+            self._stop_event.clear()
             self.running = True
             self.reader_thread = threading.Thread(target=self._reader_loop)
             self.reader_thread.daemon = True
@@ -104,25 +159,38 @@ class RFIDHandler:
             
         try:
             self.running = False
+            self._stop_event.set()
+            if self.driver:
+                self.driver.interrupt()
             if self.reader_thread:
                 self.reader_thread.join(timeout=2.0)
                 if self.reader_thread.is_alive():
                     self.logger.warning("RFID reader thread did not terminate cleanly")
+                self.reader_thread = None
+            if self.driver:
+                self.driver.close()
             self.logger.info("RFID reader stopped")
         except Exception as e:
             self.logger.error(f"Error stopping RFID reader: {e}")
     
     def _reader_loop(self):
-        """Background thread that simulates RFID reading with improved error handling"""
+        """Background thread that blocks on the reader driver and handles each tap"""
         retry_count = 0
         max_retries = 5
         
         while self.running:
             try:
-                # In a real implementation, this would read from hardware
-                # For now, we just sleep and do nothing
-                time.sleep(0.1)
-                retry_count = 0  # Reset retry count on successful iteration
+                tag_id = self.driver.read_tag()
+                if tag_id is None:
+                    if self.running:
+                        self.logger.info(f"RFID {self.driver.name} reader has no more input")
+                    break
+                
+                if self.debouncer.accept(tag_id):
+                    self.simulate_tag_read(tag_id)
+                else:
+                    self.logger.debug(f"Ignored repeat read of RFID tag {tag_id}")
+                retry_count = 0  # Reset retry count on successful read
             except Exception as e:
                 retry_count += 1
                 self.logger.error(f"Error in RFID reader loop: {e}")
@@ -130,8 +198,14 @@ class RFIDHandler:
                     self.logger.critical(f"RFID reader failed after {max_retries} retries, stopping.")
                     self.running = False
                     break
-                # Wait before retrying, with exponential backoff
-                time.sleep(0.5 * (2 ** retry_count))
+                # Wait before reopening the reader, with exponential backoff
+                if self._stop_event.wait(0.5 * (2 ** retry_count)):
+                    break
+                try:
+                    self.driver.close()
+                    self.driver.open()
+                except Exception as reopen_error:
+                    self.logger.error(f"Failed to reopen RFID reader: {reopen_error}")
     
     def simulate_tag_read(self, tag_id: str) -> Dict[str, Any]:
         """
@@ -148,28 +222,20 @@ class RFIDHandler:
         self.logger.info(f"RFID tag read: {tag_id}")
         
         try:
-            # Validate the tag
-            rfid_data = self.database.validate_rfid(tag_id)
+            # Validate the tag against the in-memory index
+            rfid_data = self._get_active_card(tag_id)
             
             # Log the access attempt
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO rfid_access_log (tag_id, action, success, details)
-                VALUES (?, 'read', ?, ?)
-                """,
-                (tag_id, rfid_data is not None, "Tag validation" if rfid_data else "Invalid tag")
-            )
+            read_at = self._db_timestamp()
+            self._write_behind(ACCESS_LOG_SQL, (tag_id, 'read', rfid_data is not None,
+                                                "Tag validation" if rfid_data else "Invalid tag", read_at))
             
             # Update last used timestamp if tag is valid
             if rfid_data:
-                cursor.execute(
-                    "UPDATE rfid_cards SET last_used_at = CURRENT_TIMESTAMP WHERE tag_id = ?",
-                    (tag_id,)
+                self._write_behind(
+                    "UPDATE rfid_cards SET last_used_at = ? WHERE tag_id = ?",
+                    (read_at, tag_id)
                 )
-                
-            conn.commit()
             
             result = {
                 "tagId": tag_id,
@@ -201,42 +267,44 @@ class RFIDHandler:
             return {"success": False, "error": "Invalid tag format"}
             
         try:
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            
-            # Check if tag already exists
-            cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                self.logger.warning(f"RFID tag {tag_id} already registered")
-                return {"success": False, "error": "Tag already registered"}
-                
-            # Insert new tag with better defaults
-            cursor.execute(
-                """
-                INSERT INTO rfid_cards (tag_id, name, status, permission_level, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (tag_id, name or f"Card-{tag_id[-6:]}", "active", permission_level, datetime.now(), datetime.now())
-            )
-            
-            # Log the registration
-            cursor.execute(
-                """
-                INSERT INTO rfid_access_log (tag_id, action, success, details)
-                VALUES (?, 'register', ?, ?)
-                """,
-                (tag_id, True, f"Registered with name: {name or f'Card-{tag_id[-6:]}'}")
-            )
-            
-            conn.commit()
+            with self.database.writer() as conn:
+                cursor = conn.cursor()
+                
+                # Check if tag already exists
+                cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
+                existing = cursor.fetchone()
+                
+                if existing:
+                    self.logger.warning(f"RFID tag {tag_id} already registered")
+                    return {"success": False, "error": "Tag already registered"}
+                
+                # Insert new tag with better defaults
+                display_name = name or f"Card-{tag_id[-6:]}"
+                cursor.execute(
+                    """
+                    INSERT INTO rfid_cards (tag_id, name, status, permission_level, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (tag_id, display_name, "active", permission_level, datetime.now(), datetime.now())
+                )
+                
+                # Log the registration
+                cursor.execute(
+                    """
+                    INSERT INTO rfid_access_log (tag_id, action, success, details)
+                    VALUES (?, 'register', ?, ?)
+                    """,
+                    (tag_id, True, f"Registered with name: {display_name}")
+                )
+                
+            # Index the card once the registration is committed
+            self.card_index.put_card(tag_id, display_name, "active", permission_level)
             self.logger.info(f"Registered new RFID card: {tag_id}")
-            
+                
             return {
                 "success": True, 
                 "tagId": tag_id,
-                "name": name or f"Card-{tag_id[-6:]}",
+                "name": display_name,
                 "status": "active",
                 "permissionLevel": permission_level
             }
@@ -245,6 +313,27 @@ class RFIDHandler:
             self.logger.exception(f"Error registering RFID card: {e}")
             return {"success": False, "error": str(e)}
             
+    def bulk_register_cards(self, records: Iterable[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """Register many cards in one transaction, e.g. from data_transfer.read_file()
+        
+        Records carry tag_id and optionally name, status and permission_level.
+        The result reports the outcome of every row; see provision_cards.
+        """
+        try:
+            with self.database.writer() as conn:
+                result = provision_cards(conn, records, self.logger, dry_run)
+            
+            # Index the cards once the batch is committed
+            if not dry_run:
+                for card in result["cards"]:
+                    self.card_index.put_card(card["tagId"], card["name"], card["status"], card["permissionLevel"])
+            
+            return result
+            
+        except Exception as e:
+            self.logger.exception(f"Error bulk registering RFID cards: {e}")
+            return {"success": False, "error": str(e)}
+            
     def deactivate_card(self, tag_id: str) -> Dict[str, Any]:
         """Deactivate an RFID card with enhanced error handling and logging"""
         if not tag_id or not isinstance(tag_id, str):
@@ -252,30 +341,29 @@ class RFIDHandler:
             return {"success": False, "error": "Invalid tag format"}
             
         try:
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
-            if not cursor.fetchone():
-                self.logger.warning(f"Cannot deactivate: RFID card not found: {tag_id}")
-                return {"success": False, "error": "Card not found"}
+            with self.database.writer() as conn:
+                cursor = conn.cursor()
                 
-            cursor.execute(
-                "UPDATE rfid_cards SET status = 'inactive', updated_at = ? WHERE tag_id = ?",
-                (datetime.now(), tag_id)
-            )
+                cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
+                if not cursor.fetchone():
+                    self.logger.warning(f"Cannot deactivate: RFID card not found: {tag_id}")
+                    return {"success": False, "error": "Card not found"}
+                
+                cursor.execute(
+                    "UPDATE rfid_cards SET status = 'inactive', updated_at = ? WHERE tag_id = ?",
+                    (datetime.now(), tag_id)
+                )
+                deactivated = cursor.rowcount > 0
             
+            if deactivated:
+                self.card_index.set_status(tag_id, "inactive")
+                self.token_cache.evict_tag(tag_id)  # revoke issued tokens immediately
+                
             # Log the deactivation
-            cursor.execute(
-                """
-                INSERT INTO rfid_access_log (tag_id, action, success, details)
-                VALUES (?, 'deactivate', ?, ?)
-                """,
-                (tag_id, cursor.rowcount > 0, "Card deactivated")
-            )
-            
-            if cursor.rowcount > 0:
-                conn.commit()
+            self._write_behind(ACCESS_LOG_SQL, (tag_id, 'deactivate', deactivated, "Card deactivated",
+                                                self._db_timestamp()))
+                
+            if deactivated:
                 self.logger.info(f"Deactivated RFID card: {tag_id}")
                 return {"success": True}
             else:
@@ -293,54 +381,28 @@ class RFIDHandler:
             return {"success": False, "error": "Invalid tag format"}
             
         try:
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            
-            # First check if the card exists
-            cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
-            if not cursor.fetchone():
-                return {"success": False, "error": "Card not found"}
-            
-            # Get card information
-            cursor.execute("SELECT * FROM rfid_cards WHERE tag_id = ?", (tag_id,))
-            card_info = dict(cursor.fetchone())
-            
-            # Get session history
-            cursor.execute(
-                """
-                SELECT * FROM sessions 
-                WHERE rfid_tag = ? 
-                ORDER BY start_time DESC
-                LIMIT ?
-                """,
-                (tag_id, limit)
-            )
-            
-            sessions = []
-            for row in cursor.fetchall():
-                sessions.append(dict(row))
-                
-            # Get access log history
-            cursor.execute(
-                """
-                SELECT * FROM rfid_access_log
-                WHERE tag_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-                """,
-                (tag_id, limit)
-            )
-            
-            access_logs = []
-            for row in cursor.fetchall():
-                access_logs.append(dict(row))
+            with self.database.reader() as conn:
+                cursor = conn.cursor()
                 
-            return {
-                "success": True,
-                "card": card_info,
-                "sessions": sessions,
-                "accessLogs": access_logs
-            }
+                # First check if the card exists
+                cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
+                if not cursor.fetchone():
+                    return {"success": False, "error": "Card not found"}
+                
+                # Get card information
+                cursor.execute("SELECT * FROM rfid_cards WHERE tag_id = ?", (tag_id,))
+                card_info = dict(cursor.fetchone())
+                
+                # Session and access history, reaching into the monthly archives when needed
+                sessions = self.database.get_session_history(rfid_tag=tag_id, limit=limit)
+                access_logs = self.database.get_access_history(tag_id=tag_id, limit=limit)
+                
+                return {
+                    "success": True,
+                    "card": card_info,
+                    "sessions": sessions,
+                    "accessLogs": access_logs
+                }
             
         except Exception as e:
             self.logger.exception(f"Error getting card history: {e}")
@@ -352,28 +414,28 @@ class RFIDHandler:
             return {"success": False, "error": "Invalid tag or game ID"}
             
         try:
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            
-            # Verify card exists
-            cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
-            if not cursor.fetchone():
-                return {"success": False, "error": "RFID card not found"}
-                
-            # Upsert permission
-            cursor.execute(
-                """
-                INSERT INTO rfid_game_permissions (tag_id, game_id, permission_type)
-                VALUES (?, ?, ?)
-                ON CONFLICT(tag_id, game_id) DO UPDATE SET
-                permission_type = excluded.permission_type
-                """,
-                (tag_id, game_id, permission_type)
-            )
-            
-            conn.commit()
+            with self.database.writer() as conn:
+                cursor = conn.cursor()
+                
+                # Verify card exists
+                cursor.execute("SELECT tag_id FROM rfid_cards WHERE tag_id = ?", (tag_id,))
+                if not cursor.fetchone():
+                    return {"success": False, "error": "RFID card not found"}
+                
+                # Upsert permission
+                cursor.execute(
+                    """
+                    INSERT INTO rfid_game_permissions (tag_id, game_id, permission_type)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(tag_id, game_id) DO UPDATE SET
+                    permission_type = excluded.permission_type
+                    """,
+                    (tag_id, game_id, permission_type)
+                )
+                
+            self.card_index.set_permission(tag_id, game_id, permission_type)
             self.logger.info(f"Set {permission_type} permission for card {tag_id} on game {game_id}")
-            
+                
             return {"success": True}
             
         except Exception as e:
@@ -386,16 +448,8 @@ class RFIDHandler:
             return {"authorized": False, "error": "Invalid tag or game ID"}
             
         try:
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            
             # First check if card is active
-            cursor.execute(
-                "SELECT status FROM rfid_cards WHERE tag_id = ?",
-                (tag_id,)
-            )
-            card = cursor.fetchone()
-            
+            card = self._get_card(tag_id)
             if not card:
                 return {"authorized": False, "error": "Card not found"}
                 
@@ -403,34 +457,21 @@ class RFIDHandler:
                 return {"authorized": False, "error": "Card is not active"}
                 
             # Check for specific game permission
-            cursor.execute(
-                """
-                SELECT permission_type FROM rfid_game_permissions
-                WHERE tag_id = ? AND game_id = ?
-                """,
-                (tag_id, game_id)
-            )
-            permission = cursor.fetchone()
+            permission = self.card_index.get_permission(tag_id, game_id)
             
             # If no specific permission is set, allow by default
             if not permission:
                 return {"authorized": True, "permissionType": "default"}
                 
-            authorized = permission["permission_type"] == "allow"
+            authorized = permission == "allow"
             
             # Log the authorization check
-            cursor.execute(
-                """
-                INSERT INTO rfid_access_log (tag_id, action, success, details)
-                VALUES (?, 'game_access', ?, ?)
-                """,
-                (tag_id, authorized, f"Game access check for game: {game_id}")
-            )
-            conn.commit()
+            self._write_behind(ACCESS_LOG_SQL, (tag_id, 'game_access', authorized,
+                                                f"Game access check for game: {game_id}", self._db_timestamp()))
             
             return {
                 "authorized": authorized,
-                "permissionType": permission["permission_type"]
+                "permissionType": permission
             }
             
         except Exception as e:
@@ -441,14 +482,7 @@ class RFIDHandler:
         """Generate a JWT token for RFID authentication"""
         try:
             # Check if card exists and is active
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM rfid_cards WHERE tag_id = ? AND status = 'active'",
-                (tag_id,)
-            )
-            card = cursor.fetchone()
-            
+            card = self._get_active_card(tag_id)
             if not card:
                 return {"success": False, "error": "Invalid or inactive card"}
                 
@@ -461,9 +495,9 @@ class RFIDHandler:
                 "exp": exp_time.timestamp(),
                 "iat": datetime.now().timestamp()
             }
-            
+                
             token = jwt.encode(payload, self.jwt_secret, algorithm="HS256")
-            
+                
             return {
                 "success": True,
                 "token": token,
@@ -477,29 +511,33 @@ class RFIDHandler:
             
     def verify_auth_token(self, token: str) -> Dict[str, Any]:
         """Verify a JWT token for RFID authentication"""
+        # Tokens already verified are served from the cache until they expire;
+        # reloading the card index after another process's changes clears it
+        cached = self.token_cache.get(token)
+        if cached is not None:
+            return cached
+        
         try:
             payload = jwt.decode(token, self.jwt_secret, algorithms=["HS256"])
             tag_id = payload.get("sub")
             
             # Verify card is still active
-            conn = self.database._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM rfid_cards WHERE tag_id = ? AND status = 'active'",
-                (tag_id,)
-            )
-            card = cursor.fetchone()
-            
-            if not card:
+            if not self._get_active_card(tag_id):
                 return {"valid": False, "error": "Card no longer active"}
                 
-            return {
+            result = {
                 "valid": True,
                 "tagId": tag_id,
                 "name": payload.get("name"),
                 "permissionLevel": payload.get("permission_level"),
                 "expiresAt": datetime.fromtimestamp(payload.get("exp")).isoformat()
             }
+            if payload.get("exp"):
+                self.token_cache.put(token, tag_id, payload["exp"], result)
+                # A deactivation that raced with this check must not leave the token cached
+                if not self.card_index.get_active(tag_id):
+                    self.token_cache.evict_tag(tag_id)
+            return result
             
         except jwt.ExpiredSignatureError:
             return {"valid": False, "error": "Token expired"}
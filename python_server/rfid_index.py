@@ -0,0 +1,127 @@
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Set
+
+# Card fields kept in memory; usage timestamps stay in the database
+CARD_FIELDS = ("tag_id", "name", "status", "permission_level")
+MISSING_LIMIT = 4096  # unknown tags remembered, so repeated taps of them skip the database
+
+
+class RFIDCardIndex:
+    """In-memory index of RFID cards and per-game permissions
+    
+    Loaded once from the database and then updated by RFIDHandler after each
+    committed change, so validating a tap or a game permission is a dict
+    lookup. Card records are frozen mappings replaced as a whole; lookups
+    take no lock. Changes made by another process (e.g. admin_utility) are
+    picked up by load(), and tags missing from the index by load_card().
+    """
+    
+    def __init__(self, logger):
+        self.logger = logger
+        self.cards: Dict[str, Mapping[str, Any]] = {}
+        self.permissions: Dict[str, Mapping[str, str]] = {}  # tag_id -> {game_id: permission_type}
+        self.lock = threading.Lock()  # serializes writers
+        self.missing: Set[str] = set()  # tags load_card() found unregistered
+        self.loaded_at: Optional[float] = None
+    
+    def load(self, database):
+        """Load all cards and permissions from the database"""
+        start = time.perf_counter()
+        
+        # Held while reading, so a change indexed after its commit is applied after the swap
+        with self.lock:
+            with database.reader() as conn:
+                card_rows = conn.execute(f"SELECT {', '.join(CARD_FIELDS)} FROM rfid_cards").fetchall()
+                permission_rows = conn.execute(
+                    "SELECT tag_id, game_id, permission_type FROM rfid_game_permissions"
+                ).fetchall()
+        
+            cards = {row[0]: MappingProxyType(dict(zip(CARD_FIELDS, row))) for row in card_rows}
+            permissions: Dict[str, Dict[str, str]] = {}
+            for tag_id, game_id, permission_type in permission_rows:
+                permissions.setdefault(tag_id, {})[game_id] = permission_type
+            
+            self.cards = cards
+            self.permissions = {tag_id: MappingProxyType(games) for tag_id, games in permissions.items()}
+            self.missing = set()
+            self.loaded_at = time.time()
+        
+        self.logger.info(
+            f"Loaded RFID index: {len(cards)} cards, {len(permission_rows)} game permissions "
+            f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+    
+    def load_card(self, database, tag_id: str) -> Optional[Mapping[str, Any]]:
+        """Index one card and its permissions from the database, for a tag missing from the index"""
+        with database.reader() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(CARD_FIELDS)} FROM rfid_cards WHERE tag_id = ?", (tag_id,)
+            ).fetchone()
+            if row is None:
+                with self.lock:
+                    if len(self.missing) >= MISSING_LIMIT:
+                        self.missing.clear()
+                    self.missing.add(tag_id)
+                return None
+            permission_rows = conn.execute(
+                "SELECT game_id, permission_type FROM rfid_game_permissions WHERE tag_id = ?", (tag_id,)
+            ).fetchall()
+        
+        with self.lock:
+            # Keep what a concurrent change or reload indexed meanwhile
+            card = self.cards.setdefault(tag_id, MappingProxyType(dict(zip(CARD_FIELDS, row))))
+            if permission_rows:
+                self.permissions.setdefault(tag_id, MappingProxyType({row[0]: row[1] for row in permission_rows}))
+        return card
+    
+    def get(self, tag_id: str) -> Optional[Mapping[str, Any]]:
+        """Get a card record by tag"""
+        return self.cards.get(tag_id)
+    
+    def is_missing(self, tag_id: str) -> bool:
+        """Tell whether load_card() already found a tag unregistered"""
+        return tag_id in self.missing
+    
+    def get_active(self, tag_id: str) -> Optional[Mapping[str, Any]]:
+        """Get a card record only if the card is active"""
+        card = self.cards.get(tag_id)
+        return card if card is not None and card["status"] == "active" else None
+    
+    def get_permission(self, tag_id: str, game_id: str) -> Optional[str]:
+        """Get the permission type set for a card on a game, or None when unset"""
+        games = self.permissions.get(tag_id)
+        return games.get(game_id) if games else None
+    
+    def put_card(self, tag_id: str, name: Optional[str], status: str, permission_level: Optional[str]):
+        """Add or replace a card record"""
+        record = MappingProxyType({
+            "tag_id": tag_id,
+            "name": name,
+            "status": status,
+            "permission_level": permission_level
+        })
+        with self.lock:
+            self.cards[tag_id] = record
+            self.missing.discard(tag_id)
+    
+    def set_status(self, tag_id: str, status: str):
+        """Change a card's status"""
+        with self.lock:
+            card = self.cards.get(tag_id)
+            if card is not None:
+                self.cards[tag_id] = MappingProxyType({**card, "status": status})
+    
+    def set_permission(self, tag_id: str, game_id: str, permission_type: str):
+        """Set a card's permission on a game"""
+        with self.lock:
+            games = dict(self.permissions.get(tag_id, {}))
+            games[game_id] = permission_type
+            self.permissions[tag_id] = MappingProxyType(games)
+    
+    def __len__(self) -> int:
+        return len(self.cards)
+    
+    def __contains__(self, tag_id: str) -> bool:
+        return tag_id in self.cards
@@ -0,0 +1,126 @@
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CARD_STATUSES = ("active", "inactive")
+TAG_PATTERN = re.compile(r"^[^\s\x00-\x1f]{1,64}$")  # printable, no whitespace
+LOOKUP_CHUNK = 500  # tag ids per existence query, below SQLite's variable limit
+
+
+def validate_card(record: Dict[str, Any]) -> Tuple[Optional[Tuple[str, str, str, str]], Optional[str]]:
+    """Check one input record; returns ((tag_id, name, status, permission_level), None) or (None, error)"""
+    tag_id = record.get("tag_id")
+    if not isinstance(tag_id, str) or not TAG_PATTERN.match(tag_id.strip()):
+        return None, "tag_id must be 1-64 printable characters without spaces"
+    tag_id = tag_id.strip()
+    
+    name = record.get("name")
+    if name is not None and not isinstance(name, str):
+        return None, "name must be a string"
+    name = (name or "").strip() or f"Card-{tag_id[-6:]}"
+    
+    status = record.get("status") or "active"
+    if status not in CARD_STATUSES:
+        return None, f"status must be one of {', '.join(CARD_STATUSES)}"
+    
+    permission_level = record.get("permission_level") or "user"
+    if not isinstance(permission_level, str):
+        return None, "permission_level must be a string"
+    
+    return (tag_id, name, status, permission_level.strip()), None
+
+
+def _existing_tags(conn: sqlite3.Connection, tag_ids: List[str]) -> set:
+    """Get the tags among tag_ids that are already registered"""
+    existing = set()
+    for i in range(0, len(tag_ids), LOOKUP_CHUNK):
+        chunk = tag_ids[i:i + LOOKUP_CHUNK]
+        rows = conn.execute(
+            f"SELECT tag_id FROM rfid_cards WHERE tag_id IN ({', '.join('?' for _ in chunk)})", chunk
+        )
+        existing.update(row[0] for row in rows)
+    return existing
+
+
+def provision_cards(conn: sqlite3.Connection, records: Iterable[Dict[str, Any]], logger,
+                    dry_run: bool = False) -> Dict[str, Any]:
+    """Register many RFID cards in the caller's transaction and report the outcome of every input row
+    
+    Rows are validated and checked for duplicates, within the input and
+    against registered cards, before anything is written. The valid new
+    cards and their access log rows are then inserted with executemany; with
+    dry_run nothing is written. The caller commits, or rolls back when this
+    raises. Each row is reported as created (valid in a dry run), invalid,
+    duplicate or exists.
+    """
+    rows: List[Dict[str, Any]] = []
+    cards: List[Tuple[str, str, str, str]] = []
+    first_row: Dict[str, int] = {}
+    
+    for row_number, record in enumerate(records, 1):
+        card, error = validate_card(record)
+        if error:
+            rows.append({"row": row_number, "tagId": record.get("tag_id"), "result": "invalid", "error": error})
+            continue
+        
+        tag_id = card[0]
+        if tag_id in first_row:
+            rows.append({"row": row_number, "tagId": tag_id, "result": "duplicate",
+                         "error": f"Same tag as row {first_row[tag_id]}"})
+            continue
+        
+        first_row[tag_id] = row_number
+        rows.append({"row": row_number, "tagId": tag_id, "result": "created"})
+        cards.append(card)
+    
+    existing = _existing_tags(conn, [card[0] for card in cards])
+    if existing:
+        for row in rows:
+            if row["result"] == "created" and row["tagId"] in existing:
+                row["result"] = "exists"
+                row["error"] = "Tag already registered"
+        cards = [card for card in cards if card[0] not in existing]
+    
+    if dry_run:
+        for row in rows:
+            if row["result"] == "created":
+                row["result"] = "valid"
+    elif cards:
+        now = datetime.now()
+        conn.executemany(
+            """
+            INSERT INTO rfid_cards (tag_id, name, status, permission_level, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [(tag_id, name, status, level, now, now) for tag_id, name, status, level in cards]
+        )
+        conn.executemany(
+            """
+            INSERT INTO rfid_access_log (tag_id, action, success, details)
+            VALUES (?, 'register', 1, ?)
+            """,
+            [(tag_id, f"Bulk registered with name: {name}") for tag_id, name, _, _ in cards]
+        )
+    
+    counts = {result: 0 for result in ("created", "valid", "invalid", "duplicate", "exists")}
+    for row in rows:
+        counts[row["result"]] += 1
+    
+    logger.info(
+        f"{'Checked' if dry_run else 'Provisioned'} {len(rows)} RFID card rows: "
+        f"{counts['valid'] if dry_run else counts['created']} {'valid' if dry_run else 'created'}, "
+        f"{counts['invalid']} invalid, {counts['duplicate']} duplicate, {counts['exists']} already registered"
+    )
+    
+    return {
+        "success": True,
+        "dryRun": dry_run,
+        "total": len(rows),
+        **counts,
+        "cards": [
+            {"tagId": tag_id, "name": name, "status": status, "permissionLevel": level}
+            for tag_id, name, status, level in cards
+        ],
+        "rows": rows
+    }
@@ -0,0 +1,306 @@
+import os
+import re
+import select
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BAUDRATE = 9600
+LINE_SEPARATORS = re.compile(rb"[\r\n\x03]")  # readers end a tag with CR, LF or ETX
+FRAME_CHARS = "\x02 \t"  # STX and padding around the tag
+
+
+class ReaderDriver(ABC):
+    """Source of RFID tag reads for RFIDHandler's reader thread
+    
+    read_tag() blocks until a tag is read and returns None once the driver
+    has been interrupted or has no more input. interrupt() may be called from
+    another thread to wake a blocked read_tag().
+    """
+    
+    name = "driver"
+    
+    def open(self):
+        """Open the underlying device"""
+    
+    @abstractmethod
+    def read_tag(self) -> Optional[str]:
+        """Block until the next tag is read"""
+    
+    def interrupt(self):
+        """Wake a blocked read_tag(), which then returns None"""
+    
+    def close(self):
+        """Release the underlying device"""
+
+
+class LineReaderDriver(ReaderDriver):
+    """Reads newline-terminated tag IDs from a file descriptor
+    
+    This is how serial readers and USB readers in serial (CDC) mode deliver
+    tags. The reader thread sleeps in select() until data or an interrupt
+    arrives, so an idle reader costs no wakeups. POSIX only.
+    """
+    
+    name = "line"
+    
+    def __init__(self, logger):
+        self.logger = logger
+        self.fd: Optional[int] = None
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+        self._buffer = b""
+        self._lines: List[str] = []
+        self._lock = threading.Lock()
+    
+    @abstractmethod
+    def _open_fd(self) -> int:
+        """Open and configure the descriptor to read from"""
+    
+    def open(self):
+        """Open the device and the pipe used to interrupt reads"""
+        fd = self._open_fd()
+        wake_r, wake_w = os.pipe()
+        with self._lock:
+            self.fd, self._wake_r, self._wake_w = fd, wake_r, wake_w
+            self._buffer = b""
+            self._lines = []
+    
+    def read_tag(self) -> Optional[str]:
+        """Block until a complete line arrives and return it as a tag"""
+        while not self._lines:
+            with self._lock:
+                fd, wake_r = self.fd, self._wake_r
+            if fd is None:
+                return None  # closed
+            
+            readable, _, _ = select.select([fd, wake_r], [], [])
+            if wake_r in readable:
+                return None
+            
+            data = os.read(fd, 4096)
+            if not data:
+                raise EOFError(f"{self.name} reader disconnected")
+            
+            *complete, self._buffer = LINE_SEPARATORS.split(self._buffer + data)
+            for raw in complete:
+                tag = raw.decode("ascii", errors="ignore").strip(FRAME_CHARS)
+                if tag:
+                    self._lines.append(tag)
+        
+        return self._lines.pop(0)
+    
+    def interrupt(self):
+        """Wake the reader thread through the wake pipe"""
+        with self._lock:
+            if self._wake_w is not None:
+                os.write(self._wake_w, b"\0")
+    
+    def close(self):
+        """Close the device and the wake pipe"""
+        with self._lock:
+            for fd in (self.fd, self._wake_r, self._wake_w):
+                if fd is not None:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+            self.fd = self._wake_r = self._wake_w = None
+
+
+class SerialReaderDriver(LineReaderDriver):
+    """Line reader on a serial device such as /dev/ttyUSB0"""
+    
+    name = "serial"
+    
+    def __init__(self, path: str, logger, baudrate: int = DEFAULT_BAUDRATE):
+        super().__init__(logger)
+        self.path = path
+        self.baudrate = baudrate
+    
+    def _open_fd(self) -> int:
+        """Open the device in raw mode at the configured baud rate"""
+        import termios
+        import tty
+        
+        speed = getattr(termios, f"B{self.baudrate}", None)
+        if speed is None:
+            raise ValueError(f"Unsupported baud rate {self.baudrate}")
+        
+        fd = os.open(self.path, os.O_RDONLY | os.O_NOCTTY)
+        try:
+            tty.setraw(fd)
+            attrs = termios.tcgetattr(fd)
+            attrs[4] = attrs[5] = speed
+            termios.tcsetattr(fd, termios.TCSANOW, attrs)
+            termios.tcflush(fd, termios.TCIFLUSH)  # drop reads buffered before we opened
+        except Exception:
+            os.close(fd)
+            raise
+        
+        self.logger.info(f"Opened RFID reader {self.path} at {self.baudrate} baud")
+        return fd
+
+
+class PtyReaderDriver(LineReaderDriver):
+    """Line reader on a pseudo-terminal, for running without hardware
+    
+    Writing "TAG\\n" to slave_path behaves like a serial reader reporting a
+    tag, e.g. `echo 04A1B2C3 > /dev/pts/5`.
+    """
+    
+    name = "pty"
+    
+    def __init__(self, logger):
+        super().__init__(logger)
+        self.slave_fd: Optional[int] = None
+        self.slave_path: Optional[str] = None
+    
+    def _open_fd(self) -> int:
+        """Create the pty pair; the slave end stays open so the master never sees EOF"""
+        import pty
+        import tty
+        
+        master_fd, self.slave_fd = pty.openpty()
+        tty.setraw(self.slave_fd)
+        self.slave_path = os.ttyname(self.slave_fd)
+        self.logger.info(f"Pseudo-terminal RFID reader listening on {self.slave_path}")
+        return master_fd
+    
+    def close(self):
+        """Close both ends of the pty"""
+        super().close()
+        if self.slave_fd is not None:
+            try:
+                os.close(self.slave_fd)
+            except OSError:
+                pass
+            self.slave_fd = None
+
+
+def read_trace(path: str) -> List[Tuple[float, str]]:
+    """Read a tap trace: one "<seconds since start> <tag_id>" per line, # starts a comment"""
+    taps = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                offset, tag_id = line.split(None, 1)
+                taps.append((float(offset), tag_id.strip()))
+            except ValueError as e:
+                raise ValueError(f"{path} line {line_number} is not '<seconds> <tag_id>'") from e
+    taps.sort(key=lambda tap: tap[0])
+    return taps
+
+
+def write_trace(path: str, taps: Iterable[Tuple[float, str]]) -> int:
+    """Write a tap trace readable by read_trace; returns the number of taps"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for offset, tag_id in taps:
+            f.write(f"{offset:.3f} {tag_id}\n")
+            count += 1
+    return count
+
+
+class ReplayReaderDriver(ReaderDriver):
+    """Replays a recorded tap trace with its original timing
+    
+    speed scales the timing (2.0 replays twice as fast, 0 as fast as
+    possible). read_tag() returns None at the end of the trace.
+    """
+    
+    name = "replay"
+    
+    def __init__(self, path: str, logger, speed: float = 1.0):
+        self.path = path
+        self.logger = logger
+        self.speed = speed
+        self.taps: List[Tuple[float, str]] = []
+        self.position = 0
+        self.started_at: Optional[float] = None
+        self._wake = threading.Event()
+    
+    def open(self):
+        """Load the trace and start its clock"""
+        self.taps = read_trace(self.path)
+        self.position = 0
+        self.started_at = time.monotonic()
+        self._wake.clear()
+        self.logger.info(f"Replaying {len(self.taps)} RFID taps from {self.path} at {self.speed}x")
+    
+    def read_tag(self) -> Optional[str]:
+        """Wait until the next tap is due and return it"""
+        if self.position >= len(self.taps):
+            return None
+        
+        offset, tag_id = self.taps[self.position]
+        if self.speed > 0:
+            delay = self.started_at + offset / self.speed - time.monotonic()
+            if delay > 0 and self._wake.wait(delay):
+                return None
+        elif self._wake.is_set():
+            return None
+        
+        self.position += 1
+        return tag_id
+    
+    def interrupt(self):
+        """Stop waiting for the next tap"""
+        self._wake.set()
+
+
+class TagDebouncer:
+    """Drops repeat reads of a tag that is held on the reader
+    
+    A read is accepted when the same tag has not been seen for window_ms.
+    Every read, accepted or not, restarts the window, so a card resting on
+    the reader counts as one tap however long it stays there.
+    """
+    
+    def __init__(self, window_ms: int = 1000):
+        self.window = window_ms / 1000.0
+        self.last_seen: Dict[str, float] = {}
+        self.dropped = 0
+    
+    def accept(self, tag_id: str, now: Optional[float] = None) -> bool:
+        """Record a read and tell whether it counts as a new tap"""
+        now = time.monotonic() if now is None else now
+        last = self.last_seen.get(tag_id)
+        self.last_seen[tag_id] = now
+        
+        if len(self.last_seen) > 1024:
+            # Forget tags that left the reader long ago
+            self.last_seen = {tag: seen for tag, seen in self.last_seen.items() if now - seen < self.window}
+        
+        if last is not None and now - last < self.window:
+            self.dropped += 1
+            return False
+        return True
+
+
+def create_driver(spec: str, logger) -> Optional[ReaderDriver]:
+    """Create a driver from an RFID_READER value
+    
+    "serial:/dev/ttyUSB0[@9600]", "pty" or "replay:trace.txt[@speed]";
+    empty or "none" means tags only arrive through simulate_tag_read.
+    """
+    spec = (spec or "").strip()
+    if not spec or spec.lower() == "none":
+        return None
+    
+    kind, _, argument = spec.partition(":")
+    kind = kind.lower()
+    if kind == "pty":
+        return PtyReaderDriver(logger)
+    
+    target, _, option = argument.rpartition("@") if "@" in argument else (argument, "", "")
+    if kind == "serial" and target:
+        return SerialReaderDriver(target, logger, int(option) if option else DEFAULT_BAUDRATE)
+    if kind == "replay" and target:
+        return ReplayReaderDriver(target, logger, float(option) if option else 1.0)
+    
+    raise ValueError(f"Unsupported RFID_READER {spec}, expected serial:<device>, pty or replay:<trace file>")
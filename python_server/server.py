@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 import asyncio
-import json
 import logging
 import os
 import signal
 import sys
+import time
 from datetime import datetime
-from typing import Dict, Set, Any, Optional, List
+from typing import Dict, Set, Any, Optional, List, Union
 import ipaddress
 
 import websockets
@@ -17,6 +17,9 @@ from game_manager import GameManager
 from session_manager import SessionManager
 from system_monitor import SystemMonitor
 from database import Database
+from status_events import StatusEventBus
+from message_codec import MessageDecodeError, get_available_codecs, get_codec
+from game_catalog import CatalogWatcher
 
 # Load environment variables
 load_dotenv()
@@ -37,9 +40,27 @@ HOST = os.getenv("VR_SERVER_HOST", "0.0.0.0")
 PORT = int(os.getenv("VR_SERVER_PORT", "8081"))
 GAMES_CONFIG_PATH = os.getenv("VR_GAMES_CONFIG", "games.json")
 DATABASE_PATH = os.getenv("VR_DATABASE", "vr_kiosk.db")
-STATUS_BROADCAST_INTERVAL = int(os.getenv("VR_STATUS_INTERVAL", "5"))  # seconds
+STATUS_BROADCAST_INTERVAL = int(os.getenv("VR_STATUS_INTERVAL", "15"))  # keepalive interval in seconds
+STATUS_DEBOUNCE_MS = int(os.getenv("VR_STATUS_DEBOUNCE_MS", "50"))  # coalesce state changes within this window
 MAX_CLIENTS = int(os.getenv("VR_MAX_CLIENTS", "10"))
 ALLOWED_HOSTS = os.getenv("VR_ALLOWED_HOSTS", "").split(",")  # comma-separated list of allowed IPs
+STATUS_DELTA_ENABLED = os.getenv("VR_STATUS_DELTA", "true").lower() in ("1", "true", "yes")  # send only changed status fields
+CLIENT_SEND_TIMEOUT = float(os.getenv("VR_CLIENT_SEND_TIMEOUT", "2.0"))  # seconds before a stalled client is dropped
+SLOW_CLIENT_POLICY = os.getenv("VR_SLOW_CLIENT_POLICY", "coalesce").lower()  # drop, skip or coalesce
+CATALOG_POLL_INTERVAL = float(os.getenv("VR_CATALOG_POLL_INTERVAL", "2"))  # seconds between games config checks, 0 disables
+SETTINGS_POLL_INTERVAL = float(os.getenv("VR_SETTINGS_POLL_INTERVAL", "2"))  # seconds between checks for settings changed by other processes, 0 disables
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("VR_ARCHIVE_INTERVAL_HOURS", "24"))  # hours between history rollovers, 0 disables
+
+# Status topics clients can subscribe to, and the minimum seconds between updates of each
+STATUS_TOPICS = ("session", "game", "system_metrics", "alerts")
+STATUS_TOPIC_INTERVALS = {"session": 1.0, "game": 0.0, "system_metrics": 5.0, "alerts": 5.0}
+for _entry in os.getenv("VR_STATUS_TOPIC_INTERVALS", "").split(","):  # e.g. "session=1,system_metrics=10"
+    if "=" in _entry:
+        _topic, _interval = _entry.split("=", 1)
+        if _topic.strip() in STATUS_TOPIC_INTERVALS:
+            STATUS_TOPIC_INTERVALS[_topic.strip()] = float(_interval)
+# Topics that change without anybody publishing an event; they are re-checked at their interval
+STATUS_POLLED_TOPICS = ("system_metrics", "alerts")
 
 
 class WebSocketServer:
@@ -49,11 +70,19 @@ class WebSocketServer:
         self.clients: Set[websockets.WebSocketServerProtocol] = set()
         self.database = Database(DATABASE_PATH, logger)
         self.system_monitor = SystemMonitor(logger)
+        self.status_events = StatusEventBus(logger, STATUS_DEBOUNCE_MS)
         self.game_manager = GameManager(GAMES_CONFIG_PATH, self.database, logger)
-        self.session_manager = SessionManager(logger, self.broadcast_status)
+        self.session_manager = SessionManager(logger, self.status_events.publisher("session"))
+        
+        # Game and session managers publish state changes from their own threads
+        self.game_manager.set_status_callback(self.status_events.publisher("game"))
         
-        # Set up game manager status callback
-        self.game_manager.set_status_callback(self.broadcast_status)
+        # Alert thresholds follow the alert_thresholds setting, including later changes
+        self.system_monitor.apply_alert_thresholds(self.database.get_setting("alert_thresholds", {}))
+        self.database.settings.subscribe(
+            "alert_thresholds",
+            lambda key, value: self.system_monitor.apply_alert_thresholds(value)
+        )
         
         self.command_handler = CommandHandler(
             self.game_manager, 
@@ -62,9 +91,24 @@ class WebSocketServer:
             self.database,
             logger
         )
+        self.command_handler.set_status_provider(self)
         self.running = False
         self.status_task = None
+        self.catalog_task = None
+        self.archive_task = None
+        self.settings_task = None
+        self.catalog_watcher = CatalogWatcher(GAMES_CONFIG_PATH, logger, CATALOG_POLL_INTERVAL)
         self.client_info = {}  # Store client connection information
+        self.codecs = get_available_codecs()  # Frame encodings offered as WebSocket subprotocols
+        
+        # Delta status state: latest value of every status field and the
+        # sequence number at which each field last changed
+        self.status_seq = 0
+        self.status_fields: Dict[str, Any] = {}
+        self.status_versions: Dict[str, int] = {}
+        self.status_field_topics: Dict[str, str] = {}  # status field -> topic it belongs to
+        self.topic_checked_at: Dict[str, float] = {}  # topic -> monotonic time it was last recomputed
+        self.deferred_status_handle: Optional[asyncio.TimerHandle] = None
 
     async def register_client(self, websocket: websockets.WebSocketServerProtocol):
         """Register a new client connection"""
@@ -122,9 +166,17 @@ class WebSocketServer:
             'connected_at': datetime.now(),
             'messages_received': 0,
             'messages_sent': 0,
+            'codec': get_codec(websocket.subprotocol, self.codecs),
+            'status_versions': {},  # status field -> seq last sent to this client
+            'topics': None,  # subscribed status topics, None means all
+            'topic_sent_at': {},  # topic -> monotonic time of the last update sent
+            'send_task': None,  # in-flight broadcast send
+            'status_pending': False,  # a coalesced status update is waiting
+            'closing': None,  # close task once the client is being dropped
+            'frames_skipped': 0,
         }
         
-        logger.info(f"Client connected: {client_info}")
+        logger.info(f"Client connected: {client_info} ({self.client_info[websocket]['codec'].name} encoding)")
         
         # Send initial welcome message and status
         await self.send_welcome_message(websocket)
@@ -138,20 +190,26 @@ class WebSocketServer:
         # Remove client info
         if websocket in self.client_info:
             info = self.client_info[websocket]
+            if info['send_task'] and not info['send_task'].done():
+                info['send_task'].cancel()
             connected_duration = datetime.now() - info['connected_at']
             logger.info(f"Client {client_info} disconnected after {connected_duration.total_seconds():.1f}s, " +
-                       f"messages: {info['messages_received']} received, {info['messages_sent']} sent")
+                       f"messages: {info['messages_received']} received, {info['messages_sent']} sent, " +
+                       f"{info['frames_skipped']} status frames skipped")
             del self.client_info[websocket]
         else:
             logger.info(f"Client disconnected: {client_info}")
 
     async def send_welcome_message(self, websocket: websockets.WebSocketServerProtocol):
         """Send welcome message with server status to new client"""
+        snapshot = self.get_status_snapshot(websocket)
         response = {
             "id": self.generate_id(),
             "status": "success",
             "data": {
-                "status": self.get_server_status(),
+                "status": snapshot["status"],
+                "statusSeq": snapshot["statusSeq"],
+                "delta": False,
                 "message": "Connected to VR Command Center",
                 "serverVersion": "1.1.0",
                 "serverTime": datetime.now().isoformat()
@@ -163,54 +221,358 @@ class WebSocketServer:
     async def send_message_to_client(self, websocket: websockets.WebSocketServerProtocol, message: Dict[str, Any]):
         """Send a message to a specific client with proper error handling"""
         try:
-            message_str = json.dumps(message)
-            await websocket.send(message_str)
+            payload = self.get_client_codec(websocket).encode(message)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Error encoding message for client: {e}")
+            return
+        
+        await self.send_raw_to_client(websocket, payload)
+
+    def get_client_codec(self, websocket: websockets.WebSocketServerProtocol):
+        """Get the frame codec negotiated with a client"""
+        info = self.client_info.get(websocket)
+        return info['codec'] if info else get_codec(None)
+
+    async def send_raw_to_client(self, websocket: websockets.WebSocketServerProtocol, payload: Union[str, bytes]) -> bool:
+        """Send an already encoded message to a specific client"""
+        try:
+            await websocket.send(payload)
             
             # Update message counter
             if websocket in self.client_info:
                 self.client_info[websocket]['messages_sent'] += 1
+            return True
                 
         except websockets.exceptions.ConnectionClosed:
             logger.debug(f"Client connection closed while sending message")
         except Exception as e:
             logger.error(f"Error sending message to client: {e}")
+        return False
 
-    async def broadcast_status(self):
-        """Broadcast system status to all connected clients"""
-        if not self.clients:
-            return
+    def refresh_status_fields(self, topics=STATUS_TOPICS) -> int:
+        """Recompute the status of the given topics and record which fields changed"""
+        self.status_seq += 1
+        now = time.monotonic()
+        
+        for topic in topics:
+            status = self.get_topic_status(topic)
+            self.topic_checked_at[topic] = now
             
-        status_data = {
+            for key, value in status.items():
+                self.status_field_topics[key] = topic
+                if key not in self.status_fields or self.status_fields[key] != value:
+                    self.status_fields[key] = value
+                    self.status_versions[key] = self.status_seq
+            
+            # Fields the topic no longer reports (e.g. vrRuntimeStatus) are cleared with null
+            for key, field_topic in self.status_field_topics.items():
+                if field_topic == topic and key not in status and self.status_fields[key] is not None:
+                    self.status_fields[key] = None
+                    self.status_versions[key] = self.status_seq
+        
+        return self.status_seq
+
+    def get_client_topics(self, websocket: websockets.WebSocketServerProtocol) -> Set[str]:
+        """Get the status topics a client is subscribed to"""
+        topics = self.client_info[websocket]['topics']
+        return set(STATUS_TOPICS) if topics is None else topics
+
+    def get_pending_status_fields(self, websocket: websockets.WebSocketServerProtocol, topics) -> List[str]:
+        """Get the fields of the given topics that changed since they were last sent to a client"""
+        if not STATUS_DELTA_ENABLED:
+            return [key for key, topic in self.status_field_topics.items() if topic in topics]
+        
+        known_versions = self.client_info[websocket]['status_versions']
+        return [
+            key for key, version in self.status_versions.items()
+            if version > known_versions.get(key, 0) and self.status_field_topics[key] in topics
+        ]
+
+    def mark_status_sent(self, websocket: websockets.WebSocketServerProtocol, fields, seq: Optional[int] = None):
+        """Record that a client holds the given fields as of status seq (default: the current one)"""
+        if websocket not in self.client_info:
+            return
+        info = self.client_info[websocket]
+        now = time.monotonic()
+        seq = self.status_seq if seq is None else seq
+        for key in fields:
+            info['status_versions'][key] = seq
+            info['topic_sent_at'][self.status_field_topics[key]] = now
+
+    def get_status_snapshot(self, websocket: websockets.WebSocketServerProtocol) -> Dict[str, Any]:
+        """Get a full status snapshot for a client and reset its delta baseline"""
+        self.refresh_status_fields()
+        self.mark_status_sent(websocket, self.status_fields)
+        return {
+            "status": {"connected": True, **self.status_fields},
+            "statusSeq": self.status_seq
+        }
+
+    def subscribe_client(self, websocket: websockets.WebSocketServerProtocol, topics: List[str]) -> Dict[str, Any]:
+        """Subscribe a client to status topics and return their current values"""
+        unknown = [topic for topic in topics if topic not in STATUS_TOPICS]
+        if unknown:
+            raise ValueError(f"Unknown status topics: {', '.join(unknown)}")
+        
+        info = self.client_info[websocket]
+        # The first explicit subscription replaces the implicit "all topics"
+        subscribed = set() if info['topics'] is None else info['topics']
+        subscribed.update(topics)
+        info['topics'] = subscribed
+        
+        self.refresh_status_fields(topics)
+        fields = [key for key, topic in self.status_field_topics.items() if topic in topics]
+        self.mark_status_sent(websocket, fields)
+        
+        logger.info(f"Client {info['ip']}:{info['port']} subscribed to: {', '.join(sorted(subscribed))}")
+        return {
+            "topics": sorted(subscribed),
+            "status": {key: self.status_fields[key] for key in fields},
+            "statusSeq": self.status_seq
+        }
+
+    def unsubscribe_client(self, websocket: websockets.WebSocketServerProtocol, topics: List[str]) -> Dict[str, Any]:
+        """Unsubscribe a client from status topics"""
+        unknown = [topic for topic in topics if topic not in STATUS_TOPICS]
+        if unknown:
+            raise ValueError(f"Unknown status topics: {', '.join(unknown)}")
+        
+        info = self.client_info[websocket]
+        info['topics'] = self.get_client_topics(websocket) - set(topics)
+        
+        logger.info(f"Client {info['ip']}:{info['port']} unsubscribed from: {', '.join(sorted(topics))}")
+        return {"topics": sorted(info['topics'])}
+
+    def schedule_deferred_status(self, delay: float):
+        """Wake the broadcaster again once a rate-limited topic is due"""
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        handle = self.deferred_status_handle
+        if handle and not handle.cancelled() and handle.when() <= when:
+            return
+        if handle:
+            handle.cancel()
+        self.deferred_status_handle = loop.call_at(when, self.status_events.publish, "deferred")
+
+    def build_status_message(self, fields) -> Dict[str, Any]:
+        """Build a status message carrying the current value of the given fields"""
+        return {
             "id": self.generate_id(),
             "status": "success",
             "data": {
-                "status": self.get_server_status()
+                "status": {key: self.status_fields[key] for key in fields},
+                "statusSeq": self.status_seq,
+                "delta": STATUS_DELTA_ENABLED
             },
             "timestamp": int(datetime.now().timestamp() * 1000)
         }
+
+    async def broadcast_status(self, sources: Optional[Set[str]] = None):
+        """Broadcast system status to all connected clients
         
-        logger.debug(f"Broadcasting status to {len(self.clients)} clients: {status_data['data']['status']}")
+        Topics whose rate limit has not expired yet are held back, and the
+        broadcaster wakes up again once the earliest held-back topic is due.
+        
+        In delta mode each client only receives the fields that changed since
+        the last status it was sent. Clients holding the same baseline share a
+        single message, which is encoded once and sent to all of them
+        concurrently.
+        """
+        if not self.clients:
+            return
         
-        # Send to all clients
-        disconnected_clients = set()
+        # Work out which subscribed topics are due for each client under its rate limit
+        now = time.monotonic()
+        due_topics: Dict[websockets.WebSocketServerProtocol, Set[str]] = {}
+        next_due: Optional[float] = None
         for client in self.clients.copy():
+            if client not in self.client_info:
+                continue
+            topic_sent_at = self.client_info[client]['topic_sent_at']
+            for topic in self.get_client_topics(client):
+                wait = topic_sent_at.get(topic, 0.0) + STATUS_TOPIC_INTERVALS[topic] - now
+                if wait <= 0:
+                    due_topics.setdefault(client, set()).add(topic)
+                elif next_due is None or wait < next_due:
+                    next_due = wait
+        
+        if next_due is not None:
+            self.schedule_deferred_status(next_due)
+        
+        # Only compute the topics somebody is waiting for
+        refresh_topics = set().union(*due_topics.values())
+        if not refresh_topics:
+            return
+        self.refresh_status_fields(refresh_topics)
+        
+        # Group clients by the set of fields they are missing
+        groups: Dict[frozenset, List[websockets.WebSocketServerProtocol]] = {}
+        for client, topics in due_topics.items():
+            fields = self.get_pending_status_fields(client, topics)
+            if fields:
+                groups.setdefault(frozenset(fields), []).append(client)
+        
+        if not groups:
+            return
+        
+        logger.debug(f"Broadcasting status seq {self.status_seq} to {len(self.clients)} clients " +
+                     f"in {len(groups)} groups")
+        
+        for fields, clients in groups.items():
+            message = self.build_status_message(fields)
+            payloads: Dict[str, Union[str, bytes]] = {}  # encoded once per codec
+            for client in clients:
+                codec = self.get_client_codec(client)
+                if codec.name not in payloads:
+                    payloads[codec.name] = codec.encode(message)
+                self.queue_status_frame(client, payloads[codec.name], fields)
+
+    def queue_status_frame(self, websocket: websockets.WebSocketServerProtocol, payload: Union[str, bytes], fields):
+        """Start sending a status frame to a client without waiting for it
+        
+        A client that is still busy with the previous frame is handled by the
+        slow-consumer policy: ``drop`` disconnects it, ``skip`` drops the frame
+        (the delta baseline is untouched, so the next frame carries the missed
+        changes) and ``coalesce`` sends one catch-up frame with the latest
+        status as soon as the in-flight send completes.
+        """
+        info = self.client_info.get(websocket)
+        if info is None or info['closing']:
+            return
+        
+        send_task = info['send_task']
+        if send_task and not send_task.done():
+            info['frames_skipped'] += 1
+            if SLOW_CLIENT_POLICY == "drop":
+                logger.warning(f"Dropping slow client {info['ip']}:{info['port']}")
+                info['closing'] = asyncio.create_task(websocket.close(1008, "Client too slow"))
+            elif SLOW_CLIENT_POLICY == "coalesce":
+                info['status_pending'] = True
+            return
+        
+        info['send_task'] = asyncio.create_task(self.send_status_frame(websocket, payload, fields, self.status_seq))
+
+    async def send_status_frame(self, websocket: websockets.WebSocketServerProtocol, payload: Union[str, bytes], fields, seq: int):
+        """Send a status frame with a timeout, then flush any coalesced update
+        
+        The client's delta baseline only moves to ``seq``, the status seq the
+        frame was built at, once the frame was actually sent.
+        """
+        while payload is not None:
             try:
-                await self.send_message_to_client(client, status_data)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected_clients.add(client)
+                sent = await asyncio.wait_for(self.send_raw_to_client(websocket, payload), CLIENT_SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Status send timed out after {CLIENT_SEND_TIMEOUT}s, dropping client")
+                info = self.client_info.get(websocket)
+                if info:
+                    info['closing'] = asyncio.current_task()
+                await websocket.close(1008, "Client too slow")
+                return
+            
+            if not sent:
+                return
+            self.mark_status_sent(websocket, fields, seq)
+            
+            payload = None
+            info = self.client_info.get(websocket)
+            if info and info['status_pending']:
+                info['status_pending'] = False
+                fields = self.get_pending_status_fields(websocket, self.get_client_topics(websocket))
+                if fields:
+                    seq = self.status_seq
+                    payload = info['codec'].encode(self.build_status_message(fields))
+
+    async def broadcast_event(self, event: str, data: Dict[str, Any]):
+        """Push an event message to every connected client"""
+        if not self.clients:
+            return
+        
+        message = {
+            "id": self.generate_id(),
+            "status": "success",
+            "event": event,
+            "data": data,
+            "timestamp": int(datetime.now().timestamp() * 1000)
+        }
+        payloads: Dict[str, Union[str, bytes]] = {}  # encoded once per codec
+        sends = []
+        for client in self.clients.copy():
+            codec = self.get_client_codec(client)
+            if codec.name not in payloads:
+                payloads[codec.name] = codec.encode(message)
+            sends.append(asyncio.wait_for(self.send_raw_to_client(client, payloads[codec.name]), CLIENT_SEND_TIMEOUT))
+        
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        failed = sum(1 for result in results if result is not True)
+        if failed:
+            logger.warning(f"Event {event} was not delivered to {failed} clients")
+
+    async def reload_catalog(self):
+        """Reload the game catalog from its config file and notify clients"""
+        success, result = await self.command_handler.run_blocking(self.game_manager.reload_catalog)
+        if not success:
+            return
         
-        # Remove disconnected clients
-        for client in disconnected_clients:
-            if client in self.clients:
-                await self.unregister_client(client)
+        catalog = self.game_manager.get_catalog()
+        await self.broadcast_event("catalogUpdated", {
+            "catalogVersion": catalog.version,
+            "games": catalog.to_client()
+        })
+
+    async def archive_loop(self):
+        """Move old history into the monthly archives at startup and then every ARCHIVE_INTERVAL_HOURS"""
+        while self.running:
+            try:
+                moved = await self.command_handler.run_blocking(self.database.roll_over_history)
+                if any(moved.values()):
+                    logger.info(f"History rollover moved {moved}")
+                await asyncio.sleep(ARCHIVE_INTERVAL_HOURS * 3600)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in history rollover: {e}")
+                await asyncio.sleep(60)
+
+    async def settings_loop(self):
+        """Pick up settings written by other processes, such as admin_utility, every SETTINGS_POLL_INTERVAL"""
+        while self.running:
+            try:
+                await asyncio.sleep(SETTINGS_POLL_INTERVAL)
+                changed = await self.command_handler.run_blocking(self.database.settings.refresh)
+                if changed:
+                    logger.info(f"Settings changed by another process: {', '.join(sorted(changed))}")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error checking for settings changes: {e}")
+
+    def get_status_wait(self) -> float:
+        """Get the seconds until the next keepalive or polled topic check is due"""
+        now = time.monotonic()
+        wait = float(STATUS_BROADCAST_INTERVAL)
+        for client, info in list(self.client_info.items()):
+            for topic in self.get_client_topics(client).intersection(STATUS_POLLED_TOPICS):
+                interval = STATUS_TOPIC_INTERVALS[topic]
+                if interval <= 0:
+                    continue  # no cadence configured, the keepalive covers it
+                last = max(info['topic_sent_at'].get(topic, 0.0), self.topic_checked_at.get(topic, 0.0))
+                wait = min(wait, last + interval - now)
+        return max(wait, 0.0)
 
     async def status_broadcast_loop(self):
-        """Periodically broadcast system status to all clients"""
+        """Push status to all clients when state changes
+        
+        Bursts of state changes are coalesced by the event bus. Polled topics
+        such as system_metrics are re-checked at their STATUS_TOPIC_INTERVALS
+        interval, and when nothing changes a keepalive status is still sent
+        every STATUS_BROADCAST_INTERVAL seconds.
+        """
         while self.running:
             try:
-                await self.broadcast_status()
-                await asyncio.sleep(STATUS_BROADCAST_INTERVAL)
+                sources = await self.status_events.wait_for_changes(self.get_status_wait())
+                if sources:
+                    logger.debug(f"Status changed by: {', '.join(sorted(sources))}")
+                await self.broadcast_status(sources)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -229,8 +591,11 @@ class WebSocketServer:
                     if websocket in self.client_info:
                         self.client_info[websocket]['messages_received'] += 1
                     
-                    # Parse the message
-                    command = json.loads(message)
+                    # Parse the message with the codec negotiated for this client
+                    command = self.get_client_codec(websocket).decode(message)
+                    if not isinstance(command, dict):
+                        await self.send_error(websocket, None, "Invalid command format")
+                        continue
                     logger.info(f"Received command: {command.get('type')} (id: {command.get('id')})")
                     
                     command_id = command.get('id')
@@ -250,9 +615,10 @@ class WebSocketServer:
                     if response:
                         await self.send_message_to_client(websocket, response)
                         
-                except json.JSONDecodeError:
-                    logger.error(f"Invalid JSON received: {message}")
-                    await self.send_error(websocket, None, "Invalid JSON format")
+                except MessageDecodeError as e:
+                    codec_name = self.get_client_codec(websocket).name
+                    logger.error(f"Invalid {codec_name} message received: {message[:200]!r} ({e})")
+                    await self.send_error(websocket, None, f"Invalid {codec_name} format")
                 except asyncio.CancelledError:
                     raise  # Allow cancellation to propagate
                 except Exception as e:
@@ -277,34 +643,52 @@ class WebSocketServer:
 
     def get_server_status(self) -> Dict[str, Any]:
         """Get the current server status"""
-        game_status = self.game_manager.get_status()
-        
-        status = {
-            "connected": True,
-            "activeGame": self.game_manager.get_current_game_title(),
-            "gameRunning": game_status.get("running", False),
-            "demoMode": game_status.get("demo_mode", False),
-            "processRunning": game_status.get("process_running", False),
-            "isPaused": self.session_manager.is_paused(),
-            "timeRemaining": self.session_manager.get_time_remaining(),
-            "cpuUsage": self.system_monitor.get_cpu_usage(),
-            "memoryUsage": self.system_monitor.get_memory_usage(),
-            "diskSpace": self.system_monitor.get_disk_space(),
-            "serverUptime": self.system_monitor.get_system_uptime(),
-            "connectedClients": len(self.clients),
-            "alerts": self.system_monitor.get_recent_alerts(3)  # Get last 3 alerts
-        }
+        status = {"connected": True}
+        for topic in STATUS_TOPICS:
+            status.update(self.get_topic_status(topic))
+        return status
+
+    def get_topic_status(self, topic: str) -> Dict[str, Any]:
+        """Get the status fields that belong to one status topic"""
+        if topic == "session":
+            return {
+                "isPaused": self.session_manager.is_paused,
+                "timeRemaining": self.session_manager.get_time_remaining()
+            }
         
-        # Add VR runtime status if game failed to start
-        if game_status.get("demo_mode"):
-            status["vrRuntimeStatus"] = "not_available"
-            status["alerts"] = status.get("alerts", []) + [{
-                "type": "warning",
-                "message": "VR runtime not available - running in demo mode",
-                "timestamp": datetime.now().isoformat()
-            }]
+        if topic == "game":
+            game_status = self.game_manager.get_status()
+            status = {
+                "activeGame": self.game_manager.get_current_game_title(),
+                "gameRunning": game_status.get("running", False),
+                "demoMode": game_status.get("demo_mode", False),
+                "processRunning": game_status.get("process_running", False)
+            }
+            # Add VR runtime status if game failed to start
+            if game_status.get("demo_mode"):
+                status["vrRuntimeStatus"] = "not_available"
+            return status
         
-        return status
+        if topic == "system_metrics":
+            return {
+                "cpuUsage": self.system_monitor.get_cpu_usage(),
+                "memoryUsage": self.system_monitor.get_memory_usage(),
+                "diskSpace": self.system_monitor.get_disk_space(),
+                "serverUptime": self.system_monitor.get_system_uptime(),
+                "connectedClients": len(self.clients)
+            }
+        
+        if topic == "alerts":
+            alerts = self.system_monitor.get_recent_alerts(3)  # Get last 3 alerts
+            if self.game_manager.is_demo_mode():
+                alerts = alerts + [{
+                    "type": "warning",
+                    "message": "VR runtime not available - running in demo mode",
+                    "timestamp": datetime.now().isoformat()
+                }]
+            return {"alerts": alerts}
+        
+        raise ValueError(f"Unknown status topic: {topic}")
 
     def generate_id(self) -> str:
         """Generate a unique ID for messages"""
@@ -315,15 +699,30 @@ class WebSocketServer:
     async def start(self):
         """Start the WebSocket server"""
         self.running = True
+        self.status_events.bind(asyncio.get_running_loop())
+        self.game_manager.set_event_loop(asyncio.get_running_loop())
         self.system_monitor.start()
         
         # Start the status broadcast task
         self.status_task = asyncio.create_task(self.status_broadcast_loop())
         
+        # Watch the games config so titles can be added without a restart
+        if CATALOG_POLL_INTERVAL > 0:
+            self.catalog_task = asyncio.create_task(self.catalog_watcher.run(self.reload_catalog))
+        
+        # Keep the live database small by archiving old months
+        if ARCHIVE_INTERVAL_HOURS > 0:
+            self.archive_task = asyncio.create_task(self.archive_loop())
+        
+        # Apply settings changed by admin tools without a restart
+        if SETTINGS_POLL_INTERVAL > 0:
+            self.settings_task = asyncio.create_task(self.settings_loop())
+        
         # Start the websocket server
         async with websockets.serve(self.handle_client, HOST, PORT,
                                    ping_interval=30,  # Send ping every 30 seconds
                                    ping_timeout=10,   # Wait 10 seconds for pong
+                                   subprotocols=list(self.codecs),  # Frame encoding negotiation
                                    max_size=1048576,  # Max message size: 1MB
                                    max_queue=32):     # Max pending messages
             logger.info(f"Server started on ws://{HOST}:{PORT}")
@@ -337,17 +736,19 @@ class WebSocketServer:
         logger.info("Shutting down server...")
         self.running = False
         
-        # Stop the status broadcast task
-        if self.status_task:
-            self.status_task.cancel()
-            try:
-                await self.status_task
-            except asyncio.CancelledError:
-                pass
+        # Stop the status broadcast, catalog watcher, archive and settings tasks
+        for task in (self.status_task, self.catalog_task, self.archive_task, self.settings_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         
-        # End any active game session
+        # End any active game session without blocking the event loop
         if self.game_manager.is_game_running():
-            self.game_manager.end_game()
+            await self.command_handler.run_game_call(self.game_manager.end_game)
+        self.command_handler.shutdown()
         
         # Stop the system monitor
         self.system_monitor.stop()
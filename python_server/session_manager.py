@@ -6,12 +6,16 @@ from typing import Dict, Any, Optional, Callable
 from datetime import datetime, timedelta
 import uuid
 
+# Seconds between timer checks; each check while the session runs publishes a status tick
+TIMER_INTERVAL = 1.0
+
 class SessionManager:
     """Manages VR gaming sessions with timing and state tracking"""
     
     def __init__(self, logger, status_callback: Optional[Callable] = None):
         self.logger = logger
         self.status_callback = status_callback
+        self.end_callback: Optional[Callable[[str], None]] = None
         self.current_session: Optional[Dict[str, Any]] = None
         self.session_start_time: Optional[float] = None
         self.session_duration: int = 0
@@ -29,6 +33,10 @@ class SessionManager:
             self.logger.warning("Supabase sync not available - running in local mode only")
             self.supabase_sync = None
     
+    def set_end_callback(self, callback: Callable[[str], None]):
+        """Set callback(session_id), called whenever a session ends, including on timeout"""
+        self.end_callback = callback
+    
     def start_session(self, game_id: str, duration_seconds: int, rfid_tag: Optional[str] = None, venue_id: Optional[str] = None) -> str:
         """Start a new gaming session"""
         # End any existing session first
@@ -101,6 +109,12 @@ class SessionManager:
         self.pause_time = None
         self.total_pause_duration = 0
         
+        if self.end_callback:
+            try:
+                self.end_callback(session_id)
+            except Exception as e:
+                self.logger.exception(f"Error in session end callback: {e}")
+        
         # Notify status callback
         if self.status_callback:
             self.status_callback()
@@ -184,7 +198,7 @@ class SessionManager:
             self.timer_thread.join(timeout=1)
     
     def _timer_loop(self):
-        """Timer loop that checks for session timeout"""
+        """Timer loop that checks for session timeout and publishes a status tick every second"""
         while self.timer_running and self.current_session:
             try:
                 remaining = self.get_time_remaining()
@@ -195,7 +209,11 @@ class SessionManager:
                     break
                 
                 # Check every second
-                time.sleep(1)
+                time.sleep(TIMER_INTERVAL)
+                
+                # Push the new time remaining to clients while the clock runs
+                if self.timer_running and self.current_session and not self.is_paused and self.status_callback:
+                    self.status_callback()
                 
             except Exception as e:
                 self.logger.error(f"Error in timer loop: {e}")
@@ -0,0 +1,196 @@
+import copy
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+SettingsCallback = Callable[[str, Any], None]
+
+
+def encode_setting(value: Any) -> str:
+    """Serialize a setting value the way it is stored in the settings table"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def decode_setting(raw: str) -> Any:
+    """Parse a stored setting value, falling back to the raw string"""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+
+class SettingsStore:
+    """In-memory copy of the settings table with change notifications
+    
+    All rows are loaded once; reads are served from memory and writes go to
+    the database first, then to the cache. Components can subscribe to keys
+    and are called with (key, value) after a change is committed. Changes
+    made by other processes (e.g. admin_utility) are picked up by refresh(),
+    which the server polls.
+    """
+    
+    def __init__(self, database, logger):
+        self.database = database
+        self.logger = logger
+        self.values: Dict[str, Any] = {}
+        self.loaded = False
+        self.data_version: Optional[int] = None  # database data_version the cache was loaded at
+        self.lock = threading.RLock()
+        self.subscribers: Dict[str, List[SettingsCallback]] = {}
+    
+    def _read_all(self) -> Dict[str, Any]:
+        """Read every setting from the database"""
+        with self.database.reader() as conn:
+            rows = conn.execute("SELECT key, value FROM settings").fetchall()
+        return {row[0]: decode_setting(row[1]) for row in rows}
+    
+    def load(self):
+        """Load all settings into memory"""
+        # Read before the rows, so a commit made during the load triggers another
+        version = self.database.data_version()
+        try:
+            values = self._read_all()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error loading settings: {e}")
+            return
+        with self.lock:
+            self.values = values
+            self.loaded = True
+            self.data_version = version
+        self.logger.debug(f"Loaded {len(values)} settings")
+    
+    def reload(self) -> List[str]:
+        """Re-read the settings table, notify subscribers of changed keys and return them"""
+        # Hold off set() so no write lands between reading the rows and swapping the cache
+        with self.database.writer(), self.lock:
+            previous = self.values
+            self.load()
+            changed = [
+                key for key in set(previous) | set(self.values)
+                if previous.get(key) != self.values.get(key)
+            ]
+        
+        for key in changed:
+            self._notify(key, self.get(key))
+        return changed
+    
+    def refresh(self) -> List[str]:
+        """Reload when another process has committed since the last load; returns the changed keys"""
+        if self.loaded and self.database.data_version() == self.data_version:
+            return []
+        return self.reload()
+    
+    def get(self, key: str, default_value: Any = None) -> Any:
+        """Get a setting value from memory"""
+        if not self.loaded:
+            self.load()
+        
+        value = self.values.get(key, default_value)
+        # Hand out copies of containers so callers cannot change the cache
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+    
+    def get_int(self, key: str, default_value: int = 0) -> int:
+        """Get a setting as an int, or the default when missing or not numeric"""
+        try:
+            return int(self.get(key, default_value))
+        except (TypeError, ValueError):
+            self.logger.warning(f"Setting {key} is not an integer, using {default_value}")
+            return default_value
+    
+    def get_float(self, key: str, default_value: float = 0.0) -> float:
+        """Get a setting as a float, or the default when missing or not numeric"""
+        try:
+            return float(self.get(key, default_value))
+        except (TypeError, ValueError):
+            self.logger.warning(f"Setting {key} is not a number, using {default_value}")
+            return default_value
+    
+    def get_bool(self, key: str, default_value: bool = False) -> bool:
+        """Get a setting as a bool; stored values like "True", "1" and "yes" count as true"""
+        value = self.get(key, default_value)
+        if isinstance(value, str):
+            return value.strip().lower() in ("true", "1", "yes", "on")
+        return bool(value)
+    
+    def set(self, key: str, value: Any) -> bool:
+        """Write a setting through to the database and notify subscribers"""
+        if not self.loaded:
+            self.load()
+        
+        raw = encode_setting(value)
+        try:
+            # Always take the write lock before the cache lock
+            with self.database.writer() as conn:
+                self.write_row(conn, key, value)
+                
+                # Cache what a fresh load would return, e.g. "5" for 5 reads back as 5
+                with self.lock:
+                    previous = self.values.get(key)
+                    self.values[key] = decode_setting(raw)
+                    changed = previous != self.values[key]
+        
+        except sqlite3.Error as e:
+            self.logger.error(f"Error setting setting {key}: {e}")
+            self.load()  # the write was rolled back; resync the cache
+            return False
+        
+        if changed:
+            self._notify(key, self.get(key))
+        return True
+    
+    def write_row(self, conn: sqlite3.Connection, key: str, value: Any):
+        """Write a setting inside the caller's transaction without touching the cache
+        
+        For settings written as part of a larger transaction; call
+        update_cache() once that transaction has committed.
+        """
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO settings (key, value, updated_at)
+            VALUES (?, ?, ?)
+            """,
+            (key, encode_setting(value), datetime.now())
+        )
+    
+    def update_cache(self, key: str, value: Any):
+        """Cache a committed setting value and notify subscribers if it changed"""
+        with self.lock:
+            previous = self.values.get(key)
+            self.values[key] = decode_setting(encode_setting(value))
+            changed = previous != self.values[key]
+        
+        if changed:
+            self._notify(key, self.get(key))
+    
+    def subscribe(self, keys: Union[str, Iterable[str]], callback: SettingsCallback) -> Callable[[], None]:
+        """Call callback(key, value) whenever one of the keys changes; returns an unsubscribe function"""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        with self.lock:
+            for key in keys:
+                self.subscribers.setdefault(key, []).append(callback)
+        
+        def unsubscribe():
+            with self.lock:
+                for key in keys:
+                    callbacks = self.subscribers.get(key, [])
+                    if callback in callbacks:
+                        callbacks.remove(callback)
+        
+        return unsubscribe
+    
+    def _notify(self, key: str, value: Any):
+        """Call the subscribers of a key, outside the lock"""
+        with self.lock:
+            callbacks = list(self.subscribers.get(key, []))
+        
+        for callback in callbacks:
+            try:
+                callback(key, value)
+            except Exception as e:
+                self.logger.exception(f"Error in settings subscriber for {key}: {e}")
@@ -0,0 +1,71 @@
+import asyncio
+import functools
+import logging
+from typing import Callable, Optional, Set
+
+
+class StatusEventBus:
+    """Collects state-change notifications from any thread and wakes the status broadcaster"""
+
+    def __init__(self, logger, debounce_ms: int = 50):
+        self.logger = logger
+        self.debounce_sec = debounce_ms / 1000.0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.changed: Optional[asyncio.Event] = None
+        self.pending_sources: Set[str] = set()
+        self.events_published = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the bus to the event loop that runs the broadcaster"""
+        self.loop = loop
+        self.changed = asyncio.Event()
+
+    def publish(self, source: str = "unknown"):
+        """Publish a state change; safe to call from any thread"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            self._mark_changed(source)
+            return
+
+        try:
+            loop.call_soon_threadsafe(self._mark_changed, source)
+        except RuntimeError:
+            # Loop was closed between the check and the call (shutdown)
+            self.logger.debug(f"Dropped status event from {source}: event loop closed")
+
+    def publisher(self, source: str) -> Callable[[], None]:
+        """Get a no-argument callback that publishes changes from the given source"""
+        return functools.partial(self.publish, source)
+
+    def _mark_changed(self, source: str):
+        """Record a change on the event loop thread"""
+        self.pending_sources.add(source)
+        self.events_published += 1
+        self.changed.set()
+
+    async def wait_for_changes(self, timeout: float) -> Set[str]:
+        """Wait for state changes and return their sources once the burst settles
+
+        Changes published within the debounce window after the first one are
+        coalesced into a single wake-up. Returns an empty set when the timeout
+        passes without any change.
+        """
+        try:
+            await asyncio.wait_for(self.changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return set()
+
+        if self.debounce_sec > 0:
+            await asyncio.sleep(self.debounce_sec)
+
+        sources, self.pending_sources = self.pending_sources, set()
+        self.changed.clear()
+        return sources
@@ -34,6 +34,10 @@ class SystemMonitor:
         self.alerts = []
         self.max_alerts = 100  # Maximum number of alerts to store
     
+        # Resource accounting for the running game's process tree
+        self.tracked_game: Optional[Dict[str, Any]] = None
+        self.tracking_lock = threading.Lock()  # tracking changes on command threads, sampling on the monitor thread
+    
     def start(self):
         """Start monitoring system resources"""
         if self.running:
@@ -57,6 +61,7 @@ class SystemMonitor:
         try:
             while self.running:
                 self._update_stats()
+                self._sample_game_processes()
                 self._check_alerts()
                 time.sleep(self.update_interval_sec)
         except Exception as e:
@@ -104,6 +109,130 @@ class SystemMonitor:
         except Exception as e:
             self.logger.exception(f"Error updating system stats: {e}")
     
+    def track_process(self, pid: int, session_id: Optional[str], game_id: Optional[str] = None):
+        """Start accounting CPU, memory, I/O and threads for a game process and its children"""
+        try:
+            root = psutil.Process(pid)
+            root.cpu_percent(None)  # prime the CPU counter for the first sample
+        except psutil.Error as e:
+            self.logger.warning(f"Cannot track game process {pid}: {e}")
+            return
+        
+        with self.tracking_lock:
+            self.tracked_game = {
+                'pid': pid,
+                'session_id': session_id,
+                'game_id': game_id,
+                'started_at': datetime.now().isoformat(),
+                'processes': {pid: root},
+                'io': {},
+                'samples': 0,
+                'cpu_total': 0.0,
+                'rss_total': 0,
+                'peak_cpu_percent': 0.0,
+                'peak_rss': 0,
+                'peak_threads': 0,
+                'peak_processes': 0,
+                'current': None
+            }
+        self.logger.info(f"Tracking resources of game process {pid} for session {session_id}")
+    
+    def untrack_process(self, pid: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Stop accounting the game process tree and return its usage summary
+        
+        With pid, only stops when that process is the one being tracked.
+        """
+        with self.tracking_lock:
+            tracked = self.tracked_game
+            if tracked and pid is not None and tracked['pid'] != pid:
+                return None
+            self.tracked_game = None
+        return self._summarize_game_usage(tracked) if tracked else None
+    
+    def _sample_game_processes(self):
+        """Sample the tracked game process and all of its children"""
+        with self.tracking_lock:
+            tracked = self.tracked_game
+            if not tracked:
+                return
+            
+            try:
+                root = tracked['processes'].get(tracked['pid']) or psutil.Process(tracked['pid'])
+                tree = [root] + root.children(recursive=True)
+            except psutil.NoSuchProcess:
+                return  # The game has exited; keep the totals until the session ends
+            except psutil.Error as e:
+                self.logger.warning(f"Error listing game processes: {e}")
+                return
+            
+            cpu = 0.0
+            rss = 0
+            threads = 0
+            alive = {}
+            for proc in tree:
+                # Reuse Process objects so cpu_percent measures since the previous sample
+                proc = tracked['processes'].get(proc.pid, proc)
+                try:
+                    with proc.oneshot():
+                        cpu += proc.cpu_percent(None)
+                        rss += proc.memory_info().rss
+                        threads += proc.num_threads()
+                        if hasattr(proc, 'io_counters'):
+                            io = proc.io_counters()
+                            tracked['io'][proc.pid] = (io.read_bytes, io.write_bytes)
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    continue
+                except psutil.AccessDenied:
+                    pass
+                alive[proc.pid] = proc
+            
+            if not alive:
+                return  # Only zombies left; the game has exited
+            
+            tracked['processes'] = alive
+            tracked['samples'] += 1
+            tracked['cpu_total'] += cpu
+            tracked['rss_total'] += rss
+            tracked['peak_cpu_percent'] = max(tracked['peak_cpu_percent'], cpu)
+            tracked['peak_rss'] = max(tracked['peak_rss'], rss)
+            tracked['peak_threads'] = max(tracked['peak_threads'], threads)
+            tracked['peak_processes'] = max(tracked['peak_processes'], len(alive))
+            tracked['current'] = {
+                'cpu_percent': round(cpu, 1),
+                'rss_mb': round(rss / (1024 * 1024), 1),
+                'threads': threads,
+                'processes': len(alive)
+            }
+    
+    def _summarize_game_usage(self, tracked: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a usage summary from a tracked game's accumulated samples"""
+        samples = tracked['samples']
+        # Exited children keep their last reported I/O totals
+        io_read = sum(read for read, _ in tracked['io'].values())
+        io_write = sum(write for _, write in tracked['io'].values())
+        return {
+            'pid': tracked['pid'],
+            'session_id': tracked['session_id'],
+            'game_id': tracked['game_id'],
+            'started_at': tracked['started_at'],
+            'samples': samples,
+            'avg_cpu_percent': round(tracked['cpu_total'] / samples, 1) if samples else 0.0,
+            'peak_cpu_percent': round(tracked['peak_cpu_percent'], 1),
+            'avg_rss_mb': round(tracked['rss_total'] / samples / (1024 * 1024), 1) if samples else 0.0,
+            'peak_rss_mb': round(tracked['peak_rss'] / (1024 * 1024), 1),
+            'peak_threads': tracked['peak_threads'],
+            'peak_processes': tracked['peak_processes'],
+            'io_read_bytes': io_read,
+            'io_write_bytes': io_write,
+            'current': tracked['current']
+        }
+    
+    def get_game_usage(self) -> Optional[Dict[str, Any]]:
+        """Get resource usage of the tracked game process tree so far"""
+        with self.tracking_lock:
+            tracked = self.tracked_game
+            return self._summarize_game_usage(tracked) if tracked else None
+    
     def _check_alerts(self):
         """Check for alert conditions"""
         try:
@@ -204,6 +333,11 @@ class SystemMonitor:
                 'write_count': self.io_counters.write_count
             }
         
+        # Add the running game's process tree usage if tracked
+        game_usage = self.get_game_usage()
+        if game_usage:
+            metrics['game_process'] = game_usage
+        
         # Add network counters if available
         if hasattr(self, 'network_counters') and self.network_counters:
             metrics['network'] = {
@@ -228,3 +362,15 @@ class SystemMonitor:
         else:
             self.logger.warning(f"Unknown alert metric: {metric_name}")
             return False
+
+    def apply_alert_thresholds(self, thresholds: Dict[str, float]):
+        """Apply alert thresholds from the alert_thresholds setting"""
+        if not isinstance(thresholds, dict):
+            self.logger.warning(f"Ignoring alert_thresholds setting that is not an object: {thresholds!r}")
+            return
+        
+        for metric_name, value in thresholds.items():
+            try:
+                self.set_alert_threshold(metric_name, float(value))
+            except (TypeError, ValueError):
+                self.logger.warning(f"Ignoring non-numeric alert threshold for {metric_name}: {value!r}")
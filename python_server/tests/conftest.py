@@ -0,0 +1,32 @@
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("vr-server-tests")
+
+
+@pytest.fixture
+def games_config(tmp_path, monkeypatch):
+    path = tmp_path / "games.json"
+    monkeypatch.setenv("VR_GAMES_CONFIG", str(path))
+    return path
+
+
+@pytest.fixture
+def database(tmp_path, games_config, logger, monkeypatch):
+    import database as database_module
+    from database import Database
+    
+    # Tests call check_for_changes() themselves instead of racing the polling thread
+    monkeypatch.setattr(database_module, "CHANGE_POLL_MS", 0)
+    monkeypatch.chdir(tmp_path)
+    database = Database(str(tmp_path / "kiosk.db"), logger)
+    yield database
+    database.close()
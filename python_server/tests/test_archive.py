@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from archive import archive_cutoff, list_partitions, query_partitions
+
+
+def add_session(database, session_id, start_time, status="completed", rfid_tag="TAG1"):
+    with database.writer() as conn:
+        conn.execute(
+            "INSERT INTO sessions (id, game_id, start_time, status, rfid_tag) VALUES (?, 'g0', ?, ?, ?)",
+            (session_id, start_time, status, rfid_tag)
+        )
+
+
+def test_archive_cutoff_counts_the_current_month():
+    now = datetime(2024, 2, 10)
+    assert archive_cutoff(1, now) == "2024-02"
+    assert archive_cutoff(3, now) == "2023-12"
+
+
+def test_roll_over_moves_closed_sessions_into_monthly_files(database):
+    add_session(database, "old-1", "2020-01-05 10:00:00")
+    add_session(database, "old-2", "2020-01-20 10:00:00")
+    add_session(database, "older", "2019-12-31 23:00:00")
+    add_session(database, "stuck", "2020-01-06 10:00:00", status="active")
+    add_session(database, "new", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    
+    moved = database.roll_over_history()
+    assert moved["sessions"] == 3
+    assert list_partitions(database.archive_dir) == ["2019-12", "2020-01"]
+    
+    with database.reader() as conn:
+        live = sorted(row[0] for row in conn.execute("SELECT id FROM sessions"))
+    assert live == ["new", "stuck"]
+    
+    # A second run finds nothing left to move
+    assert database.roll_over_history()["sessions"] == 0
+    
+    archived = query_partitions(database.archive_dir, "sessions", start="2020-01-01", end="2020-02-01")
+    assert [row["id"] for row in archived] == ["old-2", "old-1"]
+    
+    history = database.get_session_history(rfid_tag="TAG1", limit=None)
+    assert [row["id"] for row in history] == ["new", "old-2", "stuck", "old-1", "older"]
+    assert [row["id"] for row in database.get_session_history(limit=2)] == ["new", "old-2"]
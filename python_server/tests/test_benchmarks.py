@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def run_benchmark(name, *args, cwd):
+    env = {**os.environ, "VR_GAMES_CONFIG": os.path.join(str(cwd), "none.json")}
+    return subprocess.run(
+        [sys.executable, os.path.join(BENCHMARKS, name), *args],
+        cwd=str(cwd), env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+def test_rfid_tap_benchmark_saves_and_replays_a_trace(tmp_path):
+    trace = str(tmp_path / "taps.txt")
+    generated = run_benchmark("bench_rfid_taps.py", "--taps", "200", "--cards", "50", "--save-trace", trace,
+                              cwd=tmp_path)
+    assert generated.returncode == 0, generated.stderr
+    assert "taps: 200" in generated.stdout
+    for operation in ("simulate_tag_read", "check_game_permission", "generate_auth_token"):
+        assert operation in generated.stdout
+    
+    replayed = run_benchmark("bench_rfid_taps.py", "--trace", trace, cwd=tmp_path)
+    assert replayed.returncode == 0, replayed.stderr
+    assert replayed.stdout.splitlines()[0] == generated.stdout.splitlines()[0]
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+
+from command_handler import CommandHandler
+from session_manager import SessionManager
+
+
+class SlowGameManager:
+    """Game manager stub whose launch and end block their thread like a stubborn process"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+        self.lock = threading.Lock()
+    
+    def _call(self, name):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.calls.append(name)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+    
+    def launch_game(self, game_id):
+        self._call("launch")
+        return True, {}
+    
+    def end_game(self):
+        self._call("end")
+        return True
+    
+    def get_current_pid(self):
+        return None
+    
+    def set_exit_callback(self, callback):
+        self.exit_callback = callback
+
+
+class StubSessionManager:
+    def set_end_callback(self, callback):
+        self.end_callback = callback
+    
+    def start_session(self, game_id, duration):
+        return True
+    
+    def end_session(self):
+        return True
+
+
+class StubSystemMonitor:
+    """Tracks one process and hands out its usage once"""
+    
+    def __init__(self, pid=None, session_id=None):
+        self.tracked = {"pid": pid, "session_id": session_id, "game_id": "g1", "samples": 3} if pid else None
+    
+    def untrack_process(self, pid=None):
+        if not self.tracked or (pid is not None and self.tracked["pid"] != pid):
+            return None
+        usage, self.tracked = self.tracked, None
+        return usage
+
+
+class StubDatabase:
+    def __init__(self):
+        self.usage = []
+    
+    def get_game(self, game_id):
+        return {"id": game_id, "title": "Test", "min_duration_seconds": 60, "max_duration_seconds": 600}
+    
+    def start_session(self, game_id, duration):
+        return 1
+    
+    def end_session(self, session_id, rating=None):
+        return True
+    
+    def record_session_resource_usage(self, session_id, game_id, usage):
+        self.usage.append((session_id, game_id, usage["samples"]))
+        return True
+
+
+class StubWebSocket:
+    """Stands in for a client connection; middleware keys per-client state on it"""
+
+
+def make_handler(logger, delay):
+    game_manager = SlowGameManager(delay)
+    handler = CommandHandler(game_manager, StubSessionManager(), StubSystemMonitor(), StubDatabase(), logger)
+    return handler, game_manager
+
+
+def test_heartbeat_answers_during_slow_end_game(logger):
+    handler, _ = make_handler(logger, delay=0.5)
+    
+    client = StubWebSocket()
+    
+    async def scenario():
+        end = asyncio.create_task(handler.handle_command(client, "endSession", {}, "end-1"))
+        await asyncio.sleep(0.05)  # end_game is now blocking a pool thread
+        
+        latencies = []
+        for i in range(5):
+            start = time.perf_counter()
+            response = await handler.handle_command(client, "heartbeat", {}, f"hb-{i}")
+            latencies.append(time.perf_counter() - start)
+            assert response["status"] == "success"
+        
+        assert not end.done()
+        assert (await end)["status"] == "success"
+        return latencies
+    
+    try:
+        latencies = asyncio.run(scenario())
+    finally:
+        handler.shutdown()
+    assert max(latencies) < 0.02
+
+
+def test_timed_out_end_does_not_overlap_next_launch(logger):
+    handler, game_manager = make_handler(logger, delay=0.3)
+    handler.commands["endSession"].timeout = 0.05
+    
+    client = StubWebSocket()
+    
+    async def scenario():
+        response = await handler.handle_command(client, "endSession", {}, "end-1")
+        assert response["status"] == "error" and "timed out" in response["error"]
+        
+        # game_lock is free again, but end_game is still running in its thread
+        return await handler.handle_command(client, "launchGame", {"gameId": "g1", "sessionDuration": 120}, "launch-1")
+    
+    try:
+        response = asyncio.run(scenario())
+    finally:
+        handler.shutdown()
+    assert response["status"] == "success"
+    assert game_manager.calls == ["end", "launch"]
+    assert game_manager.max_active == 1
+
+
+def test_usage_is_stored_when_the_session_times_out(logger):
+    database = StubDatabase()
+    session_manager = SessionManager(logger)
+    handler = CommandHandler(SlowGameManager(0), session_manager, StubSystemMonitor(42, 7), database, logger)
+    try:
+        session_manager.start_session("g1", 600)
+        session_manager.end_session()  # what the session timer does when time runs out
+    finally:
+        handler.shutdown()
+    assert database.usage == [(7, "g1", 3)]
+
+
+def test_usage_is_stored_when_the_tracked_game_exits(logger):
+    database = StubDatabase()
+    handler = CommandHandler(SlowGameManager(0), StubSessionManager(), StubSystemMonitor(42, 7), database, logger)
+    
+    async def scenario():
+        handler._on_game_exit("g1", 41, 0)  # an older process; still tracking 42
+        handler._on_game_exit("g1", 42, 1)
+    
+    try:
+        asyncio.run(scenario())
+    finally:
+        handler.shutdown()
+    assert database.usage == [(7, "g1", 3)]
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+from data_transfer import export_table, import_table
+
+
+def make_db(path, cards):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE rfid_cards (tag_id TEXT PRIMARY KEY, name TEXT, status TEXT NOT NULL)")
+    with conn:
+        conn.executemany("INSERT INTO rfid_cards VALUES (?, ?, ?)", cards)
+    return conn
+
+
+@pytest.mark.parametrize("extension", ["ndjson", "csv"])
+def test_export_then_import_round_trips_a_table(tmp_path, logger, extension):
+    cards = [(f"TAG{i:04d}", f"Card {i}" if i % 3 else None, "active") for i in range(25)]
+    source = make_db(str(tmp_path / "source.db"), cards)
+    path = str(tmp_path / f"cards.{extension}")
+    assert export_table(source, "rfid_cards", path, logger, batch_size=4) == 25
+    source.close()
+    
+    target = make_db(str(tmp_path / "target.db"), [("TAG0001", "Stale", "inactive"), ("EXTRA", None, "active")])
+    assert import_table(target, "rfid_cards", path, logger, batch_size=4) == 25
+    
+    rows = target.execute("SELECT * FROM rfid_cards WHERE tag_id != 'EXTRA' ORDER BY tag_id").fetchall()
+    assert rows == cards
+    target.close()
+
+
+def test_bad_record_leaves_the_table_unchanged(tmp_path, logger):
+    path = tmp_path / "cards.ndjson"
+    path.write_text('{"tag_id": "A", "status": "active"}\n{"tag_id": "B"}\n', encoding="utf-8")
+    conn = make_db(str(tmp_path / "kiosk.db"), [])
+    
+    with pytest.raises(sqlite3.IntegrityError):
+        import_table(conn, "rfid_cards", str(path), logger)
+    assert conn.execute("SELECT COUNT(*) FROM rfid_cards").fetchone()[0] == 0
+    conn.close()
+
+
+def test_unknown_table_is_rejected(tmp_path, logger):
+    conn = make_db(str(tmp_path / "kiosk.db"), [])
+    with pytest.raises(ValueError):
+        export_table(conn, "settings", str(tmp_path / "out.ndjson"), logger)
+    conn.close()
@@ -0,0 +1,125 @@
+import json
+import sqlite3
+import threading
+import time
+
+from database import GAMES_IMPORT_STATE_KEY
+
+
+def write_games(path, *titles):
+    games = [
+        {"id": f"g{i}", "title": title, "min_duration_seconds": 60, "max_duration_seconds": 600}
+        for i, title in enumerate(titles)
+    ]
+    path.write_text(json.dumps({"games": games}), encoding="utf-8")
+
+
+def stored_setting(db_path, key):
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row else None
+
+
+def test_import_state_is_committed_before_subscribers_run(database, games_config, tmp_path):
+    seen = []
+    database.settings.subscribe(
+        GAMES_IMPORT_STATE_KEY,
+        lambda key, value: seen.append((value, stored_setting(str(tmp_path / "kiosk.db"), key)))
+    )
+    
+    write_games(games_config, "Beat Saber")
+    assert database.import_games(str(games_config))
+    
+    assert len(seen) == 1
+    value, stored = seen[0]
+    assert stored == value
+    assert database.get_setting(GAMES_IMPORT_STATE_KEY) == stored
+    assert [game["title"] for game in database.get_games()] == ["Beat Saber"]
+
+
+def test_failed_import_leaves_games_and_state_untouched(database, games_config):
+    write_games(games_config, "Beat Saber")
+    assert database.import_games(str(games_config))
+    state = database.get_setting(GAMES_IMPORT_STATE_KEY)
+    
+    with database.writer() as conn:
+        conn.execute(
+            f"""
+            CREATE TRIGGER fail_import BEFORE INSERT ON settings WHEN NEW.key = '{GAMES_IMPORT_STATE_KEY}'
+            BEGIN SELECT RAISE(ABORT, 'import failed'); END
+            """
+        )
+    
+    write_games(games_config, "Beat Saber", "Superhot")
+    assert not database.import_games(str(games_config))
+    assert database.get_setting(GAMES_IMPORT_STATE_KEY) == state
+    
+    with database.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 1
+
+
+def test_catalog_reloads_after_another_process_writes_games(database, games_config, tmp_path):
+    write_games(games_config, "Beat Saber")
+    assert database.import_games(str(games_config))
+    assert [game["title"] for game in database.get_games()] == ["Beat Saber"]
+    
+    # In-process writes do not move the data version, so the cache is kept
+    catalog = database.get_catalog()
+    database.start_session("g0", 300)
+    assert database.get_catalog() is catalog
+    
+    assert not database.check_for_changes()
+    assert database.get_catalog() is catalog
+    
+    conn = sqlite3.connect(str(tmp_path / "kiosk.db"))
+    with conn:
+        conn.execute("UPDATE games SET title = 'Beat Saber 2' WHERE id = 'g0'")
+    conn.close()
+    
+    assert database.check_for_changes()  # what the polling thread does every VR_DB_CHANGE_POLL_MS
+    assert database.get_game("g0")["title"] == "Beat Saber 2"
+
+
+def test_catalog_reads_do_not_wait_for_writers(database, games_config):
+    write_games(games_config, "Beat Saber")
+    assert database.import_games(str(games_config))
+    database.get_catalog()
+    
+    locked = threading.Event()
+    release = threading.Event()
+    
+    def hold_writer():
+        with database.writer():
+            locked.set()
+            release.wait(5)
+    
+    thread = threading.Thread(target=hold_writer)
+    thread.start()
+    locked.wait(5)
+    try:
+        start = time.perf_counter()
+        assert database.get_game("g0")["title"] == "Beat Saber"
+        assert time.perf_counter() - start < 0.1
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_polling_thread_runs_change_callbacks(tmp_path, games_config, logger, monkeypatch):
+    import database as database_module
+    
+    monkeypatch.setattr(database_module, "CHANGE_POLL_MS", 10)
+    database = database_module.Database(str(tmp_path / "polled.db"), logger)
+    changed = threading.Event()
+    database.add_change_callback(changed.set)
+    try:
+        conn = sqlite3.connect(str(tmp_path / "polled.db"))
+        with conn:
+            conn.execute("INSERT INTO settings (key, value) VALUES ('external', '1')")
+        conn.close()
+        assert changed.wait(2)
+    finally:
+        database.close()
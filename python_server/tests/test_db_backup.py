@@ -0,0 +1,63 @@
+import sqlite3
+from datetime import datetime
+
+import db_backup
+from db_backup import backup, list_chains, restore_backup
+
+
+def make_db(path, rows):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS log (value TEXT)")
+        conn.executemany("INSERT INTO log (value) VALUES (?)", [(f"row {i}",) for i in range(rows)])
+    conn.close()
+
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM log").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_incremental_chain_restores_the_latest_state(tmp_path, logger):
+    db_path = str(tmp_path / "kiosk.db")
+    backup_dir = str(tmp_path / "backups")
+    make_db(db_path, 100)
+    
+    assert backup(db_path, backup_dir, logger, incremental=True)["type"] == "full"
+    make_db(db_path, 50)
+    result = backup(db_path, backup_dir, logger, incremental=True)
+    assert result["type"] == "incremental"
+    assert result["pages"] < result["total_pages"]
+    
+    restored = str(tmp_path / "restored.db")
+    restore_backup(backup_dir, restored, logger)
+    assert count_rows(restored) == 150
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 5, 1, 12, 0, 0)
+
+
+def test_rotation_keeps_plain_backups_and_separates_same_time_chains(tmp_path, logger, monkeypatch):
+    monkeypatch.setattr(db_backup, "datetime", FrozenDatetime)
+    db_path = str(tmp_path / "kiosk.db")
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    make_db(db_path, 10)
+    
+    # A copy made by the plain --backup-db of earlier versions
+    plain = backup_dir / "vr_kiosk_backup_20200101_000000.db"
+    plain.write_bytes(b"")
+    
+    paths = [backup(db_path, str(backup_dir), logger, keep_chains=2)["path"] for _ in range(4)]
+    assert len(set(paths)) == 4
+    assert paths[-1].endswith("vr_kiosk_chain_20240501_120000_000000_4.db")
+    
+    chains = list_chains(str(backup_dir))
+    assert [str(backup_dir / name) for name in chains] == paths[-2:]
+    assert plain.exists()
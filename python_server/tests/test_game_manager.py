@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+import game_manager as game_manager_module
+from game_catalog import GameCatalog
+from game_manager import GameManager
+
+
+class StubDatabase:
+    def __init__(self, game):
+        self.game = game
+    
+    def get_catalog(self):
+        return GameCatalog([])
+    
+    def get_game(self, game_id):
+        return self.game if game_id == self.game["id"] else None
+
+
+@pytest.fixture
+def manager(tmp_path, logger, monkeypatch):
+    executable = tmp_path / "game.sh"
+    executable.write_bytes(b"#!/bin/sh\n" + b"#" * 4096 + b"\n")
+    executable.chmod(0o755)
+    monkeypatch.setattr(game_manager_module, "VR_RUNTIME_PROCESSES", ["vrserver"])
+    
+    game = {"id": "g1", "title": "Test Game", "executable_path": str(executable),
+            "working_directory": str(tmp_path), "arguments": ""}
+    manager = GameManager(str(tmp_path / "games.json"), StubDatabase(game), logger)
+    
+    manager.runtime_probes = 0
+    def check_runtime():
+        manager.runtime_probes += 1
+        return True, []
+    manager.check_runtime = check_runtime
+    return manager
+
+
+def test_executable_is_prewarmed_once_per_version(manager):
+    path = manager.database.game["executable_path"]
+    
+    _, first = manager.prepare_game("g1")
+    _, second = manager.prepare_game("g1")
+    assert first["prewarmed_bytes"] == os.path.getsize(path)
+    assert second["prewarmed_bytes"] == 0
+    
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    _, updated = manager.prepare_game("g1")
+    assert updated["prewarmed_bytes"] == os.path.getsize(path)
+
+
+def test_launch_reuses_recent_staged_readiness(manager):
+    manager.prepare_game("g1")
+    assert manager.runtime_probes == 1
+    
+    # The supervisor is not bound to a loop, so the spawn itself fails after the probe step
+    manager.launch_game("g1")
+    assert manager.runtime_probes == 1
+
+
+def test_launch_reprobes_stale_staged_readiness(manager, monkeypatch):
+    manager.prepare_game("g1")
+    monkeypatch.setattr(game_manager_module, "STAGED_READINESS_MAX_AGE", 0.0)
+    
+    manager.launch_game("g1")
+    assert manager.runtime_probes == 2
@@ -0,0 +1,56 @@
+import pytest
+
+import message_codec
+from command_handler import ResponseStatus
+from message_codec import CborCodec, JsonCodec, MessageDecodeError, MessagePackCodec, get_available_codecs, get_codec
+
+MESSAGE = {
+    "id": "1",
+    "status": "success",
+    "data": {"status": {"timeRemaining": 90, "cpuUsage": 12.5, "activeGame": None, "alerts": []}, "delta": True},
+    "timestamp": 1621234567890,
+}
+
+
+def installed(codec_class, module_name):
+    return pytest.param(
+        codec_class,
+        marks=pytest.mark.skipif(getattr(message_codec, module_name) is None, reason=f"{module_name} not installed")
+    )
+
+
+ALL_CODECS = [JsonCodec, installed(MessagePackCodec, "msgpack"), installed(CborCodec, "cbor2")]
+BINARY_CODECS = [installed(MessagePackCodec, "msgpack"), installed(CborCodec, "cbor2")]
+
+
+@pytest.mark.parametrize("codec_class", ALL_CODECS)
+def test_messages_round_trip(codec_class):
+    codec = codec_class()
+    assert codec.decode(codec.encode(MESSAGE)) == MESSAGE
+
+
+@pytest.mark.parametrize("codec_class", ALL_CODECS)
+def test_response_status_is_sent_as_its_value(codec_class):
+    codec = codec_class()
+    decoded = codec.decode(codec.encode({"status": ResponseStatus.ERROR}))
+    assert decoded == {"status": "error"}
+    assert ResponseStatus(decoded["status"]) is ResponseStatus.ERROR
+
+
+@pytest.mark.parametrize("codec_class", BINARY_CODECS)
+def test_binary_codecs_reject_text_frames(codec_class):
+    with pytest.raises(MessageDecodeError):
+        codec_class().decode('{"id": "1"}')
+
+
+@pytest.mark.parametrize("codec_class", ALL_CODECS)
+def test_corrupt_frames_raise_decode_errors(codec_class):
+    with pytest.raises(MessageDecodeError):
+        codec_class().decode(b"\xc1\xff")
+
+
+def test_json_is_used_without_a_negotiated_subprotocol():
+    codecs = get_available_codecs()
+    assert get_codec(None, codecs).name == "json"
+    assert get_codec("vr-unknown", codecs).name == "json"
+    assert list(codecs)[-1] == JsonCodec.subprotocol
@@ -0,0 +1,40 @@
+import asyncio
+import sys
+
+from process_supervisor import ProcessSupervisor
+
+
+def python_command(code: str):
+    return [sys.executable, "-c", code]
+
+
+def test_restarts_count_only_launches_after_a_crash(logger):
+    supervisor = ProcessSupervisor(logger)
+    exits = []
+    supervisor.set_exit_callback(lambda game_id, pid, code: exits.append(code))
+    
+    async def scenario():
+        supervisor.bind(asyncio.get_running_loop())
+        
+        # A clean exit and a terminated run are not crashes
+        await supervisor.spawn("g1", python_command("pass"))
+        await supervisor.waiters[supervisor.process.pid]
+        await supervisor.spawn("g1", python_command("import time; time.sleep(30)"))
+        pid = supervisor.process.pid
+        waiter = supervisor.waiters[pid]
+        assert await supervisor.terminate(timeout=5.0)
+        await waiter
+        
+        await supervisor.spawn("g1", python_command("raise SystemExit(3)"))
+        await supervisor.waiters[supervisor.process.pid]
+        await supervisor.spawn("g1", python_command("pass"))
+        await supervisor.waiters[supervisor.process.pid]
+    
+    asyncio.run(scenario())
+    
+    stats = supervisor.get_stats()["g1"]
+    assert stats["launches"] == 4
+    assert stats["crashes"] == 1
+    assert stats["restarts"] == 1
+    assert stats["last_exit_code"] == 0
+    assert exits[2] == 3
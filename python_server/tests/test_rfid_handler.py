@@ -0,0 +1,116 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from rfid_handler import RFIDHandler
+
+
+@pytest.fixture
+def handler(database, logger):
+    return RFIDHandler(database, logger, driver=None)
+
+
+def external_write(tmp_path, sql, params=()):
+    """Commit a change the way admin_utility does, from another connection"""
+    conn = sqlite3.connect(str(tmp_path / "kiosk.db"))
+    with conn:
+        conn.execute(sql, params)
+    conn.close()
+
+
+def test_deactivation_by_another_process_revokes_the_card(handler, database, tmp_path):
+    assert handler.register_new_card("TAG1", "Alice")["success"]
+    token = handler.generate_auth_token("TAG1")["token"]
+    assert handler.verify_auth_token(token)["valid"]  # now cached
+    
+    external_write(tmp_path, "UPDATE rfid_cards SET status = 'inactive' WHERE tag_id = 'TAG1'")
+    assert database.check_for_changes()  # what the polling thread does every VR_DB_CHANGE_POLL_MS
+    
+    assert not handler.verify_auth_token(token)["valid"]  # the reload cleared the cached result
+    assert not handler.simulate_tag_read("TAG1")["valid"]
+    assert not handler.check_game_permission("TAG1", "g0")["authorized"]
+
+
+def test_cards_missing_from_the_index_are_read_from_the_database(handler, database):
+    with database.writer() as conn:
+        conn.execute("INSERT INTO rfid_cards (tag_id, name, status) VALUES ('TAG2', 'Bob', 'active')")
+        conn.execute(
+            "INSERT INTO rfid_game_permissions (tag_id, game_id, permission_type) VALUES ('TAG2', 'g0', 'deny')"
+        )
+    assert "TAG2" not in handler.card_index
+    
+    assert handler.simulate_tag_read("TAG2")["valid"]
+    assert "TAG2" in handler.card_index
+    assert handler.check_game_permission("TAG2", "g0") == {"authorized": False, "permissionType": "deny"}
+    assert not handler.simulate_tag_read("UNKNOWN")["valid"]
+    assert handler.card_index.is_missing("UNKNOWN")
+
+
+def test_unknown_tags_are_looked_up_once_until_cards_change(handler, database, tmp_path, monkeypatch):
+    lookups = []
+    load_card = handler.card_index.load_card
+    monkeypatch.setattr(handler.card_index, "load_card", lambda *args: lookups.append(args) or load_card(*args))
+    
+    for _ in range(3):
+        assert not handler.simulate_tag_read("TAG5")["valid"]
+    assert len(lookups) == 1
+    
+    external_write(tmp_path, "INSERT INTO rfid_cards (tag_id, name, status) VALUES ('TAG5', 'Eve', 'active')")
+    assert database.check_for_changes()
+    assert handler.simulate_tag_read("TAG5")["valid"]
+
+
+def test_own_writes_do_not_reload_the_index(handler, database):
+    assert handler.register_new_card("TAG3")["success"]
+    loaded_at = handler.card_index.loaded_at
+    
+    assert handler.deactivate_card("TAG3")["success"]
+    assert not database.check_for_changes()
+    assert not handler.simulate_tag_read("TAG3")["valid"]
+    assert handler.card_index.loaded_at == loaded_at
+
+
+@contextmanager
+def writer_held(database):
+    """Hold the write lock in another thread, like a long write-behind flush or history rollover"""
+    locked = threading.Event()
+    release = threading.Event()
+    
+    def hold_writer():
+        with database.writer():
+            locked.set()
+            release.wait(5)
+    
+    thread = threading.Thread(target=hold_writer)
+    thread.start()
+    locked.wait(5)
+    try:
+        yield
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_cached_token_verification_does_not_wait_for_writers(handler, database):
+    assert handler.register_new_card("TAG4")["success"]
+    token = handler.generate_auth_token("TAG4")["token"]
+    assert handler.verify_auth_token(token)["valid"]
+    
+    with writer_held(database):
+        start = time.perf_counter()
+        assert handler.verify_auth_token(token)["valid"]
+        assert time.perf_counter() - start < 0.1
+
+
+def test_taps_do_not_wait_for_writers(handler, database):
+    assert handler.register_new_card("TAG6")["success"]
+    
+    with writer_held(database):
+        start = time.perf_counter()
+        assert handler.simulate_tag_read("TAG6")["valid"]
+        assert handler.check_game_permission("TAG6", "g0")["authorized"]
+        assert handler.generate_auth_token("TAG6")["success"]
+        assert time.perf_counter() - start < 0.1
@@ -0,0 +1,48 @@
+import pytest
+
+from rfid_handler import RFIDHandler
+from rfid_provisioning import provision_cards
+
+
+@pytest.fixture
+def handler(database, logger):
+    return RFIDHandler(database, logger, driver=None)
+
+
+def card_count(database):
+    with database.reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM rfid_cards").fetchone()[0]
+
+
+def test_rows_are_reported_and_valid_cards_registered(handler, database):
+    assert handler.register_new_card("OLD")["success"]
+    records = [
+        {"tag_id": "A1", "name": "Alice"},
+        {"tag_id": "bad tag"},
+        {"tag_id": "A1"},
+        {"tag_id": "OLD"},
+        {"tag_id": "B2", "status": "inactive"},
+    ]
+    
+    result = handler.bulk_register_cards(records)
+    assert [row["result"] for row in result["rows"]] == ["created", "invalid", "duplicate", "exists", "created"]
+    assert (result["created"], result["invalid"], result["duplicate"], result["exists"]) == (2, 1, 1, 1)
+    assert card_count(database) == 3
+    assert handler.simulate_tag_read("A1")["valid"]
+    assert not handler.simulate_tag_read("B2")["valid"]
+
+
+def test_dry_run_writes_nothing(handler, database):
+    result = handler.bulk_register_cards([{"tag_id": "A1"}], dry_run=True)
+    assert result["valid"] == 1 and result["created"] == 0
+    assert card_count(database) == 0
+
+
+def test_cards_are_written_in_the_callers_transaction(database, logger):
+    with pytest.raises(RuntimeError):
+        with database.writer() as conn:
+            result = provision_cards(conn, [{"tag_id": "A1"}, {"tag_id": "B2"}], logger)
+            assert result["created"] == 2
+            raise RuntimeError("a later step of the same transaction failed")
+    
+    assert card_count(database) == 0
@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from rfid_reader import (
+    LineReaderDriver, PtyReaderDriver, ReaderDriver, ReplayReaderDriver, SerialReaderDriver, TagDebouncer,
+    create_driver, read_trace, write_trace
+)
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="pty drivers need POSIX")
+
+
+def test_drivers_must_implement_reading():
+    with pytest.raises(TypeError):
+        ReaderDriver()
+    with pytest.raises(TypeError):
+        LineReaderDriver(None)
+
+
+@posix_only
+def test_pty_driver_reads_framed_tags_and_can_be_interrupted(logger):
+    driver = PtyReaderDriver(logger)
+    driver.open()
+    try:
+        os.write(driver.slave_fd, b"04A1B2C3\r\n\x02 TAG2\x03\n")
+        assert driver.read_tag() == "04A1B2C3"
+        assert driver.read_tag() == "TAG2"
+        
+        threading.Timer(0.05, driver.interrupt).start()
+        assert driver.read_tag() is None
+    finally:
+        driver.close()
+    
+    driver.interrupt()  # a no-op once closed
+    assert driver.read_tag() is None
+
+
+def test_replay_driver_plays_a_trace_back(tmp_path, logger):
+    path = str(tmp_path / "trace.txt")
+    assert write_trace(path, [(0.5, "B"), (0.0, "A")]) == 2
+    assert read_trace(path) == [(0.0, "A"), (0.5, "B")]
+    
+    driver = ReplayReaderDriver(path, logger, speed=0)
+    driver.open()
+    assert [driver.read_tag(), driver.read_tag(), driver.read_tag()] == ["A", "B", None]
+
+
+def test_debouncer_counts_a_held_card_as_one_tap():
+    debouncer = TagDebouncer(window_ms=1000)
+    assert debouncer.accept("A", now=0.0)
+    assert not debouncer.accept("A", now=0.5)
+    assert not debouncer.accept("A", now=1.4)  # each read restarts the window
+    assert debouncer.accept("B", now=1.5)
+    assert debouncer.accept("A", now=2.5)
+    assert debouncer.dropped == 2
+
+
+def test_create_driver_parses_reader_specs(logger):
+    assert create_driver("", logger) is None
+    assert create_driver("none", logger) is None
+    
+    serial = create_driver("serial:/dev/ttyUSB0@19200", logger)
+    assert isinstance(serial, SerialReaderDriver)
+    assert (serial.path, serial.baudrate) == ("/dev/ttyUSB0", 19200)
+    
+    replay = create_driver("replay:trace.txt@2", logger)
+    assert isinstance(replay, ReplayReaderDriver) and replay.speed == 2.0
+    
+    with pytest.raises(ValueError):
+        create_driver("usb:1", logger)
@@ -0,0 +1,44 @@
+import threading
+import time
+
+import session_manager as session_manager_module
+from session_manager import SessionManager
+
+
+def counting_callback():
+    calls = []
+    lock = threading.Lock()
+    
+    def callback():
+        with lock:
+            calls.append(time.monotonic())
+    
+    return calls, callback
+
+
+def test_running_session_publishes_a_tick_every_interval(logger, monkeypatch):
+    monkeypatch.setattr(session_manager_module, "TIMER_INTERVAL", 0.05)
+    calls, callback = counting_callback()
+    manager = SessionManager(logger, callback)
+    
+    manager.start_session("g0", 600)
+    time.sleep(0.3)
+    manager.end_session()
+    
+    # One publish for the start, one for the end, and a tick per timer interval in between
+    assert len(calls) >= 5
+
+
+def test_paused_session_publishes_no_ticks(logger, monkeypatch):
+    monkeypatch.setattr(session_manager_module, "TIMER_INTERVAL", 0.05)
+    calls, callback = counting_callback()
+    manager = SessionManager(logger, callback)
+    
+    manager.start_session("g0", 600)
+    manager.pause_session()
+    time.sleep(0.1)
+    published = len(calls)
+    time.sleep(0.2)
+    
+    assert len(calls) == published
+    manager.end_session()
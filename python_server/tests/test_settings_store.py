@@ -0,0 +1,30 @@
+import sqlite3
+
+
+def test_refresh_picks_up_settings_written_by_another_process(database, tmp_path):
+    settings = database.settings
+    assert settings.set("alert_thresholds", {"cpu": 90})
+    assert settings.refresh() == []  # this process's own writes need no reload
+    
+    seen = []
+    settings.subscribe("alert_thresholds", lambda key, value: seen.append(value))
+    
+    conn = sqlite3.connect(str(tmp_path / "kiosk.db"))
+    with conn:
+        conn.execute("UPDATE settings SET value = '{\"cpu\": 75}' WHERE key = 'alert_thresholds'")
+    conn.close()
+    
+    assert settings.refresh() == ["alert_thresholds"]
+    assert settings.get("alert_thresholds") == {"cpu": 75}
+    assert seen == [{"cpu": 75}]
+    assert settings.refresh() == []
+
+
+def test_set_notifies_only_on_change(database):
+    seen = []
+    database.settings.subscribe("kiosk_name", lambda key, value: seen.append(value))
+    
+    assert database.set_setting("kiosk_name", "Lobby")
+    assert database.set_setting("kiosk_name", "Lobby")
+    assert database.get_setting("kiosk_name") == "Lobby"
+    assert seen == ["Lobby"]
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from status_events import StatusEventBus
+
+
+class StubClient:
+    """Stands in for a client connection and records the status frames it receives"""
+    
+    def __init__(self, port, delay=0.0):
+        self.remote_address = ("127.0.0.1", port)
+        self.subprotocol = None
+        self.delay = delay
+        self.fail = False
+        self.frames = []
+        self.received_at = []
+        self.closed = []
+    
+    async def send(self, payload):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise OSError("connection reset")
+        self.frames.append(json.loads(payload))
+        self.received_at.append(time.monotonic())
+    
+    async def close(self, code=1000, reason=""):
+        self.closed.append((code, reason))
+
+
+class StubSessionManager:
+    is_paused = False
+    
+    def __init__(self):
+        self.remaining = 0
+    
+    def get_time_remaining(self):
+        return self.remaining
+
+
+class StubGameManager:
+    def get_status(self):
+        return {"running": False, "demo_mode": False, "process_running": False}
+    
+    def get_current_game_title(self):
+        return None
+    
+    def is_demo_mode(self):
+        return False
+
+
+class StubSystemMonitor:
+    """Reports a CPU usage that moves on every read, like a live system"""
+    
+    def __init__(self):
+        self.cpu = 0.0
+    
+    def get_cpu_usage(self):
+        self.cpu += 1.0
+        return self.cpu
+    
+    def get_memory_usage(self):
+        return 40.0
+    
+    def get_disk_space(self):
+        return 70.0
+    
+    def get_system_uptime(self):
+        return 100.0
+    
+    def get_recent_alerts(self, limit=10):
+        return []
+
+
+@pytest.fixture
+def server_module(tmp_path, monkeypatch):
+    # server logs to vr_server.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    import server
+    return server
+
+
+def make_server(server_module, logger):
+    """Build a server with stub managers and no database or listening socket"""
+    server = server_module.WebSocketServer.__new__(server_module.WebSocketServer)
+    server.clients = set()
+    server.client_info = {}
+    server.codecs = server_module.get_available_codecs()
+    server.status_events = StatusEventBus(logger, 0)
+    server.session_manager = StubSessionManager()
+    server.game_manager = StubGameManager()
+    server.system_monitor = StubSystemMonitor()
+    server.running = False
+    server.status_seq = 0
+    server.status_fields = {}
+    server.status_versions = {}
+    server.status_field_topics = {}
+    server.topic_checked_at = {}
+    server.deferred_status_handle = None
+    return server
+
+
+async def connect(server, port, delay=0.0):
+    client = StubClient(port, delay)
+    assert await server.register_client(client)
+    return client
+
+
+def test_polled_topic_is_pushed_at_its_interval(server_module, logger, monkeypatch):
+    monkeypatch.setattr(server_module, "STATUS_BROADCAST_INTERVAL", 30)
+    monkeypatch.setitem(server_module.STATUS_TOPIC_INTERVALS, "system_metrics", 0.2)
+    server = make_server(server_module, logger)
+    
+    async def scenario():
+        server.status_events.bind(asyncio.get_running_loop())
+        client = await connect(server, 1001)
+        server.subscribe_client(client, ["system_metrics"])
+        
+        server.running = True
+        task = asyncio.create_task(server.status_broadcast_loop())
+        await asyncio.sleep(1.1)
+        server.running = False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return client
+    
+    client = asyncio.run(scenario())
+    
+    # Nothing publishes system_metrics, yet it arrives every 0.2s instead of with the 30s keepalive
+    updates = client.received_at[1:]
+    assert 4 <= len(updates) <= 6
+    assert all("cpuUsage" in frame["data"]["status"] for frame in client.frames[1:])
+    gaps = [later - earlier for earlier, later in zip(updates, updates[1:])]
+    assert min(gaps) >= 0.15
+
+
+async def settle(server, client):
+    task = server.client_info[client]['send_task']
+    if task:
+        await task
+
+
+def time_remaining_updates(client):
+    return [frame["data"]["status"]["timeRemaining"] for frame in client.frames[1:]]
+
+
+def run_slow_client(server_module, logger, monkeypatch, policy):
+    """Change the session three times while the first status frame is still being sent"""
+    monkeypatch.setattr(server_module, "SLOW_CLIENT_POLICY", policy)
+    monkeypatch.setitem(server_module.STATUS_TOPIC_INTERVALS, "session", 0.0)
+    server = make_server(server_module, logger)
+    
+    async def scenario():
+        client = await connect(server, 1001)
+        server.subscribe_client(client, ["session"])
+        client.delay = 0.1
+        for remaining in (10, 9, 8):
+            server.session_manager.remaining = remaining
+            await server.broadcast_status({"session"})
+        await settle(server, client)
+        await asyncio.sleep(0)
+        return client
+    
+    client = asyncio.run(scenario())
+    return server, client
+
+
+def test_skip_policy_drops_frames_and_keeps_the_baseline(server_module, logger, monkeypatch):
+    server, client = run_slow_client(server_module, logger, monkeypatch, "skip")
+    
+    assert time_remaining_updates(client) == [10]
+    assert server.client_info[client]['frames_skipped'] == 2
+    assert client.closed == []
+    
+    # The skipped change is still pending, so the next broadcast carries it
+    assert server.get_pending_status_fields(client, {"session"}) == ["timeRemaining"]
+
+
+def test_coalesce_policy_sends_one_catch_up_frame(server_module, logger, monkeypatch):
+    server, client = run_slow_client(server_module, logger, monkeypatch, "coalesce")
+    
+    assert time_remaining_updates(client) == [10, 8]
+    assert server.client_info[client]['frames_skipped'] == 2
+    assert server.get_pending_status_fields(client, {"session"}) == []
+
+
+def test_drop_policy_closes_a_slow_client_once(server_module, logger, monkeypatch):
+    server, client = run_slow_client(server_module, logger, monkeypatch, "drop")
+    
+    assert time_remaining_updates(client) == [10]
+    assert client.closed == [(1008, "Client too slow")]
+    assert server.client_info[client]['closing'].done()
+
+
+def test_failed_send_leaves_the_fields_pending(server_module, logger, monkeypatch):
+    monkeypatch.setitem(server_module.STATUS_TOPIC_INTERVALS, "session", 0.0)
+    server = make_server(server_module, logger)
+    
+    async def scenario():
+        client = await connect(server, 1001)
+        client.fail = True
+        server.session_manager.remaining = 10
+        await server.broadcast_status({"session"})
+        await settle(server, client)
+        assert server.get_pending_status_fields(client, {"session"}) == ["timeRemaining"]
+        
+        client.fail = False
+        await server.broadcast_status({"session"})
+        await settle(server, client)
+        return client
+    
+    client = asyncio.run(scenario())
+    assert time_remaining_updates(client) == [10]
+
+
+def test_welcome_is_a_full_baseline_and_broadcasts_carry_only_changes(server_module, logger, monkeypatch):
+    monkeypatch.setitem(server_module.STATUS_TOPIC_INTERVALS, "session", 0.0)
+    server = make_server(server_module, logger)
+    
+    async def scenario():
+        client = await connect(server, 1001)
+        
+        # Nothing changed since the welcome snapshot
+        await server.broadcast_status({"game"})
+        await settle(server, client)
+        
+        for remaining in (10, 9):
+            server.session_manager.remaining = remaining
+            await server.broadcast_status({"session"})
+            await settle(server, client)
+        return client
+    
+    client = asyncio.run(scenario())
+    
+    welcome = client.frames[0]["data"]
+    assert welcome["delta"] is False
+    assert {"connected", "timeRemaining", "activeGame", "cpuUsage", "alerts"} <= set(welcome["status"])
+    
+    updates = [frame["data"] for frame in client.frames[1:]]
+    assert [update["status"] for update in updates] == [{"timeRemaining": 10}, {"timeRemaining": 9}]
+    assert all(update["delta"] for update in updates)
+    
+    seqs = [welcome["statusSeq"]] + [update["statusSeq"] for update in updates]
+    assert seqs == sorted(set(seqs))
+
+
+def test_snapshot_resyncs_a_client_that_missed_changes(server_module, logger, monkeypatch):
+    monkeypatch.setitem(server_module.STATUS_TOPIC_INTERVALS, "session", 0.0)
+    server = make_server(server_module, logger)
+    
+    async def scenario():
+        client = await connect(server, 1001)
+        client.fail = True
+        server.session_manager.remaining = 10
+        server.game_manager.get_current_game_title = lambda: "Beat Saber"
+        await server.broadcast_status({"session", "game"})
+        await settle(server, client)
+        client.fail = False
+        
+        # getStatus answers with the full status and resets the client's baseline
+        snapshot = server.get_status_snapshot(client)
+        await server.broadcast_status({"session", "game"})
+        await settle(server, client)
+        
+        server.session_manager.remaining = 9
+        await server.broadcast_status({"session"})
+        await settle(server, client)
+        return client, snapshot
+    
+    client, snapshot = asyncio.run(scenario())
+    
+    assert snapshot["status"]["timeRemaining"] == 10
+    assert snapshot["status"]["activeGame"] == "Beat Saber"
+    update = client.frames[-1]["data"]
+    assert len(client.frames) == 2
+    assert update["status"] == {"timeRemaining": 9}
+    assert update["statusSeq"] > snapshot["statusSeq"]
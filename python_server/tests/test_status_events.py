@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+from status_events import StatusEventBus
+
+
+def test_burst_from_worker_threads_wakes_the_broadcaster_once(logger):
+    bus = StatusEventBus(logger, debounce_ms=100)
+    
+    async def scenario():
+        bus.bind(asyncio.get_running_loop())
+        
+        def burst(source):
+            for _ in range(5):
+                bus.publish(source)
+        
+        workers = [threading.Thread(target=burst, args=(source,)) for source in ("game", "session")]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        
+        first = await bus.wait_for_changes(1.0)
+        second = await bus.wait_for_changes(0.2)
+        return first, second
+    
+    first, second = asyncio.run(scenario())
+    
+    assert first == {"game", "session"}
+    assert second == set()
+    assert bus.events_published == 10
+
+
+def test_change_inside_the_debounce_window_joins_the_same_wakeup(logger):
+    bus = StatusEventBus(logger, debounce_ms=200)
+    
+    async def scenario():
+        bus.bind(asyncio.get_running_loop())
+        bus.publish("game")
+        late = threading.Timer(0.05, bus.publish, args=("session",))
+        late.start()
+        sources = await bus.wait_for_changes(1.0)
+        late.join()
+        return sources, await bus.wait_for_changes(0.1)
+    
+    sources, after = asyncio.run(scenario())
+    
+    assert sources == {"game", "session"}
+    assert after == set()
+
+
+def test_publish_before_bind_is_ignored(logger):
+    bus = StatusEventBus(logger)
+    bus.publish("game")
+    assert bus.events_published == 0
@@ -0,0 +1,56 @@
+import time
+
+from token_cache import TokenCache
+
+
+def test_evicts_least_recently_used_tokens():
+    cache = TokenCache(max_entries=2)
+    expires_at = time.time() + 60
+    cache.put("a", "TAG1", expires_at, {"valid": True})
+    cache.put("b", "TAG2", expires_at, {"valid": True})
+    assert cache.get("a") == {"valid": True}
+    
+    cache.put("c", "TAG3", expires_at, {"valid": True})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.get_stats()["evicted"] == 1
+    assert "TAG2" not in cache.by_tag
+
+
+def test_expired_tokens_are_not_served(monkeypatch):
+    cache = TokenCache()
+    now = time.time()
+    cache.put("a", "TAG1", now + 10, {"valid": True})
+    cache.put("stale", "TAG1", now - 1, {"valid": True})
+    
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.get("stale") is None
+    assert cache.get_stats()["expired"] == 1
+    assert cache.by_tag == {}
+
+
+def test_evict_tag_drops_every_token_of_a_card():
+    cache = TokenCache()
+    expires_at = time.time() + 60
+    cache.put("a", "TAG1", expires_at, {"valid": True})
+    cache.put("b", "TAG1", expires_at, {"valid": True})
+    cache.put("c", "TAG2", expires_at, {"valid": True})
+    
+    assert cache.evict_tag("TAG1") == 2
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_cached_results_cannot_be_changed_by_callers():
+    cache = TokenCache()
+    cache.put("a", "TAG1", time.time() + 60, {"valid": True})
+    cache.get("a")["valid"] = False
+    assert cache.get("a") == {"valid": True}
+
+
+def test_zero_entries_disables_the_cache():
+    cache = TokenCache(max_entries=0)
+    cache.put("a", "TAG1", time.time() + 60, {"valid": True})
+    assert cache.get("a") is None
+    assert cache.get_stats()["entries"] == 0
@@ -0,0 +1,64 @@
+import sqlite3
+from contextlib import contextmanager
+
+from write_behind import WriteBehindQueue
+
+INSERT = "INSERT INTO log (value) VALUES (?)"
+
+
+class FlakyDatabase:
+    """Database stand-in whose first ``failures`` transactions fail"""
+    
+    def __init__(self, failures=0):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE log (value INTEGER NOT NULL CHECK (value >= 0))")
+        self.failures = failures
+    
+    @contextmanager
+    def writer(self):
+        try:
+            if self.failures:
+                self.failures -= 1
+                raise sqlite3.OperationalError("database is locked")
+            yield self.conn
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+    
+    def values(self):
+        return [row[0] for row in self.conn.execute("SELECT value FROM log ORDER BY value")]
+
+
+def test_flush_retries_a_failed_batch(logger):
+    database = FlakyDatabase(failures=1)
+    queue = WriteBehindQueue(database, logger)
+    for value in range(3):
+        assert queue.enqueue(INSERT, (value,))
+    
+    assert queue.flush() == 3
+    assert database.values() == [0, 1, 2]
+    assert queue.get_stats()["failed"] == 0
+
+
+def test_flush_drops_only_rows_that_fail_on_their_own(logger):
+    database = FlakyDatabase()
+    queue = WriteBehindQueue(database, logger)
+    for value in (1, -1, 2):
+        assert queue.enqueue(INSERT, (value,))
+    
+    assert queue.flush() == 2
+    assert database.values() == [1, 2]
+    
+    stats = queue.get_stats()
+    assert stats["written"] == 2
+    assert stats["failed"] == 1
+    assert stats["pending"] == 0
+
+
+def test_enqueue_rejects_rows_beyond_max_pending(logger):
+    queue = WriteBehindQueue(FlakyDatabase(), logger, max_pending=2)
+    assert queue.enqueue(INSERT, (1,))
+    assert queue.enqueue(INSERT, (2,))
+    assert not queue.enqueue(INSERT, (3,))
+    assert queue.get_stats()["rejected"] == 1
@@ -0,0 +1,100 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+class TokenCache:
+    """Bounded LRU cache of verified auth tokens
+    
+    Entries are keyed by the token's SHA-256 digest, so raw tokens are not
+    kept, and expire at the token's own exp. Entries are also indexed by tag
+    so revoking a card evicts all of its tokens at once. max_entries=0
+    disables the cache.
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[bytes, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self.by_tag: Dict[str, Set[bytes]] = {}
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "revoked": 0}
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        """Get the cache key of a token"""
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get the cached verification result for a token, or None"""
+        if not self.max_entries:
+            return None
+        
+        key = self._key(token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            
+            expires_at, tag_id, result = entry
+            if expires_at <= time.time():
+                self._remove(key, tag_id)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return dict(result)
+    
+    def put(self, token: str, tag_id: str, expires_at: float, result: Dict[str, Any]):
+        """Cache a successful verification until expires_at"""
+        if not self.max_entries or expires_at <= time.time():
+            return
+        
+        key = self._key(token)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.entries[key] = (expires_at, tag_id, dict(result))
+            self.by_tag.setdefault(tag_id, set()).add(key)
+            
+            while len(self.entries) > self.max_entries:
+                old_key, (_, old_tag, _) = self.entries.popitem(last=False)
+                self._unindex(old_key, old_tag)
+                self.stats["evicted"] += 1
+    
+    def evict_tag(self, tag_id: str) -> int:
+        """Drop every cached token of a card; returns the number dropped"""
+        with self.lock:
+            keys = self.by_tag.pop(tag_id, set())
+            for key in keys:
+                self.entries.pop(key, None)
+            self.stats["revoked"] += len(keys)
+            return len(keys)
+    
+    def clear(self):
+        """Drop all cached tokens"""
+        with self.lock:
+            self.entries.clear()
+            self.by_tag.clear()
+    
+    def _remove(self, key: bytes, tag_id: str):
+        """Remove one entry; the lock must be held"""
+        self.entries.pop(key, None)
+        self._unindex(key, tag_id)
+    
+    def _unindex(self, key: bytes, tag_id: str):
+        """Remove an entry from the tag index; the lock must be held"""
+        keys = self.by_tag.get(tag_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_tag[tag_id]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss and eviction counts"""
+        with self.lock:
+            return {**self.stats, "entries": len(self.entries), "max_entries": self.max_entries}
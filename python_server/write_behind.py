@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+
+class WriteBehindQueue:
+    """Batches append-only writes into one transaction every few milliseconds
+    
+    Statements are queued with enqueue() and written by a background thread
+    when ``max_batch`` rows are waiting or ``flush_interval_ms`` has passed
+    since the oldest one was queued. Consecutive rows for the same statement
+    are written with executemany. The queue holds at most ``max_pending`` rows;
+    enqueue() returns False when it is full so the caller can write directly
+    or slow down. A failed batch is retried once and then written row by
+    row, so only rows that fail on their own are dropped.
+    """
+    
+    def __init__(self, database, logger, flush_interval_ms: int = 50, max_batch: int = 500,
+                 max_pending: int = 10000):
+        self.database = database
+        self.logger = logger
+        self.flush_interval_sec = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.pending: Deque[Tuple[str, Sequence[Any]]] = deque()
+        self.oldest_queued_at: Optional[float] = None
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()  # one flush at a time, in queue order
+        self.running = False
+        self.flush_thread: Optional[threading.Thread] = None
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "rejected": 0,
+            "failed": 0,
+            "batches": 0,
+            "last_batch_rows": 0,
+            "last_flush_ms": 0.0
+        }
+    
+    def start(self):
+        """Start the background flush thread"""
+        if self.running:
+            return
+        
+        self.running = True
+        self.flush_thread = threading.Thread(target=self._flush_loop, name="write-behind")
+        self.flush_thread.daemon = True
+        self.flush_thread.start()
+    
+    def close(self):
+        """Stop the flush thread and write everything still queued"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.flush_thread:
+            self.flush_thread.join(timeout=5.0)
+            self.flush_thread = None
+        self.flush()
+    
+    def enqueue(self, sql: str, params: Sequence[Any]) -> bool:
+        """Queue a write; returns False when the queue is full"""
+        with self.condition:
+            if len(self.pending) >= self.max_pending:
+                self.stats["rejected"] += 1
+                return False
+            
+            first = not self.pending
+            if first:
+                self.oldest_queued_at = time.monotonic()
+            self.pending.append((sql, params))
+            self.stats["queued"] += 1
+            
+            # Wake the flush thread to start the age timer, or to write a full batch now
+            if first or len(self.pending) >= self.max_batch:
+                self.condition.notify()
+        return True
+    
+    def _flush_loop(self):
+        """Background thread that writes batches on size or age"""
+        while True:
+            with self.condition:
+                while self.running:
+                    if len(self.pending) >= self.max_batch:
+                        break
+                    if self.pending:
+                        wait = self.oldest_queued_at + self.flush_interval_sec - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self.condition.wait(wait)
+                    else:
+                        self.condition.wait()
+                
+                if not self.running:
+                    return
+            
+            self.flush()
+    
+    def flush(self) -> int:
+        """Write all queued rows in one transaction; returns the number written"""
+        with self.flush_lock:
+            with self.condition:
+                batch: List[Tuple[str, Sequence[Any]]] = list(self.pending)
+                self.pending.clear()
+                self.oldest_queued_at = None
+            
+            if not batch:
+                return 0
+            
+            start = time.perf_counter()
+            try:
+                self._write_batch(batch)
+                written = len(batch)
+            except Exception as e:
+                # Often transient (e.g. a busy database); the rows are still worth keeping
+                self.logger.exception(f"Write-behind flush of {len(batch)} rows failed, retrying: {e}")
+                try:
+                    self._write_batch(batch)
+                    written = len(batch)
+                except Exception as e:
+                    self.logger.exception(f"Write-behind retry failed, writing {len(batch)} rows one by one: {e}")
+                    written = self._write_rows(batch)
+            
+            dropped = len(batch) - written
+            if dropped:
+                self.stats["failed"] += dropped
+                self.logger.error(f"Write-behind flush dropped {dropped} of {len(batch)} rows")
+            
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stats["written"] += written
+            self.stats["batches"] += 1
+            self.stats["last_batch_rows"] = written
+            self.stats["last_flush_ms"] = round(elapsed_ms, 3)
+            return written
+    
+    def _write_batch(self, batch: List[Tuple[str, Sequence[Any]]]):
+        """Write a batch in one transaction"""
+        with self.database.writer() as conn:
+            # Consecutive rows for the same statement go through executemany
+            run_start = 0
+            for index in range(1, len(batch) + 1):
+                if index == len(batch) or batch[index][0] != batch[run_start][0]:
+                    conn.executemany(batch[run_start][0], [params for _, params in batch[run_start:index]])
+                    run_start = index
+    
+    def _write_rows(self, batch: List[Tuple[str, Sequence[Any]]]) -> int:
+        """Write rows in their own transactions so one bad row only loses itself; returns the number written"""
+        written = 0
+        for sql, params in batch:
+            try:
+                with self.database.writer() as conn:
+                    conn.execute(sql, params)
+                written += 1
+            except Exception as e:
+                self.logger.error(f"Dropping write-behind row: {e}")
+        return written
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and flush statistics"""
+        with self.condition:
+            return {**self.stats, "pending": len(self.pending)}